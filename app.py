@@ -1,13 +1,21 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, abort, send_from_directory
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
+import time
 import firebase_admin
 from firebase_admin import credentials, firestore
 from google.cloud import firestore as google_firestore
 import google.auth
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
+import http_cache
+from availability import load_availability
+from date_views import load_views
+from price_cache import PriceCache
+from storage import STORAGE_BACKEND, as_storage, open_storage
+from werkzeug.security import safe_join
 
 app = Flask(__name__)
 CORS(app)
@@ -18,11 +26,39 @@ CRED_PATH = "service-account.json"
 
 @app.after_request
 def add_header(response):
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '-1'
+    # Routes that picked a policy (http_cache.conditional / set_policy) keep it; errors and everything else are never stored
+    policy = http_cache.policy()
+    # Pages link their assets through asset_url (immutable). Plain /static only serves the service worker, which must keep
+    # a stable URL, and files no page references (script.js, style.css, golf_clubs.json), so it gets the short policy
+    if request.endpoint == 'static':
+        policy = http_cache.REVALIDATE if request.path.endswith('service-worker.js') else http_cache.STATIC
+    if policy is None or response.status_code >= 400:
+        response.headers['Cache-Control'] = http_cache.NO_STORE
+        response.headers['Pragma'] = 'no-cache'
+        response.headers['Expires'] = '-1'
+    else:
+        response.headers['Cache-Control'] = policy
     return response
 
+def _static_path(filename):
+    path = safe_join(app.static_folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return path
+
+@app.template_global()
+def asset_url(filename):
+    """Content-fingerprinted URL for a static file (served immutable, so a new deploy changes the URL)."""
+    return f"/assets/{http_cache.fingerprint(_static_path(filename))}/{filename}"
+
+@app.route("/assets/<version>/<path:filename>")
+def assets(version, filename):
+    path = _static_path(filename)
+    # An old fingerprint still gets the current file, just not cached as immutable
+    current = version == http_cache.fingerprint(path)
+    http_cache.set_policy(http_cache.IMMUTABLE if current else http_cache.STATIC)
+    return send_from_directory(app.static_folder, filename)
+
 # Initialize Firestore
 def init_firestore():
     if os.path.exists(CRED_PATH):
@@ -33,7 +69,24 @@ def init_firestore():
         credentials, project = google.auth.default()
         return google_firestore.Client(project=PROJECT_ID, credentials=credentials, database="teetime")
 
-db = init_firestore()
+# STORAGE_BACKEND=sqlite serves from the embedded SQLite replica without touching GCP
+db = init_firestore() if STORAGE_BACKEND == "firestore" else None
+
+def get_store():
+    return as_storage(db) if db is not None else open_storage(STORAGE_BACKEND)
+
+# Per-date results, invalidated by the generation the ingest job publishes to change_feed/head
+PRICE_CACHE = PriceCache()
+# Concurrent per-date / range reads for /api/prices
+PRICE_FETCH_WORKERS = int(os.environ.get("PRICE_FETCH_WORKERS", 8))
+_FETCH_POOL = ThreadPoolExecutor(max_workers=PRICE_FETCH_WORKERS, thread_name_prefix="prices")
+# Club selections up to this size are pushed down as chunked 'in' queries instead of reading the whole date
+PRICE_PUSHDOWN_MAX_CLUBS = int(os.environ.get("PRICE_PUSHDOWN_MAX_CLUBS", 30))
+# Fields transferred for a pushed-down query (projection)
+TEE_FIELDS = ["club_name", "date", "time", "hour", "price", "source", "prices"]
+STATS_FIELDS = ["club_name", "hour", "min_price"]
+# (feed generation, availability manifest) — re-read only when ingest publishes a new generation
+_AVAILABILITY = {"generation": None, "dates": None, "at": 0.0}
 
 # Load Club Data for Regions
 GOLF_CLUBS = []
@@ -51,121 +104,289 @@ def get_region(address):
 
 @app.route("/")
 def index():
-    return render_template("index.html")
+    # The page embeds fingerprinted asset URLs, so it changes whenever the template or an asset does
+    template = os.path.join(app.root_path, app.template_folder, "index.html")
+    etag = http_cache.etag_for(http_cache.fingerprint(template), asset_url("manifest.json"))
+    return http_cache.conditional(lambda: render_template("index.html"), http_cache.REVALIDATE, etag=etag)
+
+# The club list only changes with a deploy
+CLUBS_ETAG = http_cache.etag_for(json.dumps(GOLF_CLUBS, sort_keys=True, ensure_ascii=False))
 
 @app.route("/api/clubs", methods=["GET"])
 def get_clubs():
-    # Group clubs by region
-    grouped = defaultdict(list)
-    for club in GOLF_CLUBS:
-        region = get_region(club.get("address", ""))
-        grouped[region].append({
-            "name": club["name"],
-            "address": club.get("address", "")
-        })
-    return jsonify(grouped)
+    def build():
+        # Group clubs by region
+        grouped = defaultdict(list)
+        for club in GOLF_CLUBS:
+            region = get_region(club.get("address", ""))
+            grouped[region].append({
+                "name": club["name"],
+                "address": club.get("address", "")
+            })
+        return jsonify(grouped)
+    return http_cache.conditional(build, http_cache.CLUBS, etag=CLUBS_ETAG)
+
+def _availability(store):
+    """{date: {"count", "min_price", "clubs"}} from the ingest manifest (one read, cached per feed generation), or None."""
+    generation = PRICE_CACHE.head(store)["generation"]
+    if generation and _AVAILABILITY["generation"] == generation \
+            and time.monotonic() - _AVAILABILITY["at"] < PRICE_CACHE.max_age:
+        return _AVAILABILITY["dates"]
+    dates = load_availability(store)
+    if generation and dates is not None:
+        _AVAILABILITY.update(generation=generation, dates=dates, at=time.monotonic())
+    return dates
+
+def _next_days():
+    today = datetime.now().date()
+    return [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(14)]
+
+def _cache_epoch():
+    """Start (epoch seconds) of the current PRICE_CACHE.max_age window.
+    Validators include it so a generation that stops moving (e.g. a failed feed publish) cannot pin a 304 forever."""
+    return int(time.time() // PRICE_CACHE.max_age * PRICE_CACHE.max_age)
+
+def _date_validator(store):
+    """ETag for the date endpoints: the last ingest generation plus today (the 14-day window moves at midnight)."""
+    generation = PRICE_CACHE.head(store)["generation"]
+    return http_cache.etag_for(generation, datetime.now().date(), _cache_epoch()) if generation else None
 
 @app.route("/api/available_dates", methods=["GET"])
 def get_available_dates():
     """Check next 14 days and return dates that have tee times."""
-    available = []
-    today = datetime.now().date()
+    store = get_store()
+    etag = _date_validator(store)
+
+    def build():
+        manifest = _availability(store)
+        if manifest is not None:
+            return jsonify([d for d in _next_days() if manifest.get(d, {}).get("count")])
+
+        # No manifest yet: check each of the next 14 days
+        available = []
+        for check_date in _next_days():
+            # Limit 1 is enough to know if data exists
+            if store.has_tee_times(check_date):
+                available.append(check_date)
+
+        return jsonify(available)
+    return http_cache.conditional(build, http_cache.DATES if etag else http_cache.REVALIDATE, etag=etag)
+
+@app.route("/api/availability", methods=["GET"])
+def get_availability():
+    """Tee-time count, club count and cheapest price per available date (for the date picker)."""
+    store = get_store()
+    etag = _date_validator(store)
+
+    def build():
+        manifest = _availability(store) or {}
+        summary = {}
+        for d in _next_days():
+            entry = manifest.get(d)
+            if entry and entry.get("count"):
+                summary[d] = {"count": entry["count"], "min_price": entry.get("min_price"),
+                              "clubs": len(entry.get("clubs") or {})}
+        return jsonify(summary)
+    return http_cache.conditional(build, http_cache.DATES if etag else http_cache.REVALIDATE, etag=etag)
+
+def _query_date(store, date, history_date_str, clubs=None, hours=None):
+    """
+    Tee times and 7-day-ago baseline for one date, read document by document.
+    With clubs (and hours), only the matching documents are read, with the fields get_prices needs.
+    """
+    if clubs is not None:
+        history_map = _history_map(store.find('daily_stats', history_date_str, clubs, hours, STATS_FIELDS))
+        docs = [item for _, item in store.find('tee_times', date, clubs, hours, TEE_FIELDS)]
+        return docs, history_map
+
+    # Fetch all daily_stats for the history date
+    # This might return ~100-200 docs, which is 1 read op per doc returned + 1 query op.
+    # If we have 50 items to show, N+1 approach is 50 reads.
+    # If we have 200 stats but only show 5 items, this might be more expensive?
+    # However, usually users see many items. And "Entity Reads" are cheap enough that 
+    # reducing latency of N round-trips is also worth it.
+    # Small club selections take the clubs branch above instead (chunked 'in' queries).
+    # Given the use case (showing many tee times), fetching all stats for the day is safer/simpler.
     
-    # Check next 14 days
-    for i in range(14):
-        check_date = (today + timedelta(days=i)).strftime("%Y-%m-%d")
-        # Limit 1 is enough to know if data exists
-        docs = db.collection('tee_times').where('date', '==', check_date).limit(1).stream()
-        if any(docs):
-            available.append(check_date)
-            
-    return jsonify(available)
+    history_map = _history_map(store.daily_stats(history_date_str))
 
-@app.route("/api/prices", methods=["POST"])
-def get_prices():
-    try:
-        data = request.get_json()
-        dates = data.get("dates", []) # List of "YYYY-MM-DD"
-        times = data.get("times", []) # List of hour strings "06", "07"
-        clubs = data.get("clubs", []) # List of club names
-        
-        if not dates or not clubs:
-            return jsonify([])
+    # 2. Fetch Current Data
+    docs = [item for _, item in store.tee_times(date)]
+    return docs, history_map
 
-        results = []
+def _history_map(hist_docs):
+    history_map = {} # (club_name, hour) -> min_price
+    for _, h_data in hist_docs:
+        # Key: (Club, Hour)
+        # Ensure types match. h_data['hour'] is likely int from archive_history.
+        h_club = h_data.get('club_name')
+        h_hour = h_data.get('hour')
+        h_price = h_data.get('min_price')
         
-        # Optimization: Query by date, then filter by club and time
-        for date in dates:
-            # 1. Pre-fetch History (7 days ago) for this date
-            # Instead of N+1 reads, we do 1 read (query) per date.
-            history_date_obj = datetime.strptime(date, "%Y-%m-%d") - timedelta(days=7)
-            history_date_str = history_date_obj.strftime("%Y-%m-%d")
+        if h_club and h_hour is not None:
+            history_map[(h_club, str(h_hour))] = h_price
+            # Also store as int just in case
+            history_map[(h_club, int(h_hour))] = h_price
+    return history_map
+
+def _history_date(date):
+    return (datetime.strptime(date, "%Y-%m-%d") - timedelta(days=7)).strftime("%Y-%m-%d")
+
+def _contiguous(dates):
+    days = sorted(datetime.strptime(d, "%Y-%m-%d") for d in dates)
+    return len(days) > 1 and (days[-1] - days[0]).days == len(days) - 1
+
+def _query_range(store, dates):
+    """Consecutive dates in two range queries (tee_times and their baselines) running at the same time."""
+    start, end = min(dates), max(dates)
+    stats_future = _FETCH_POOL.submit(lambda: list(store.daily_stats_range(_history_date(start), _history_date(end))))
+    docs_by_date = defaultdict(list)
+    for _, item in store.tee_times_range(start, end):
+        docs_by_date[item.get('date')].append(item)
+    stats_by_date = defaultdict(list)
+    for doc in stats_future.result():
+        stats_by_date[doc[1].get('date')].append(doc)
+    return {d: (docs_by_date.get(d, []), _history_map(stats_by_date.get(_history_date(d), []))) for d in dates}
+
+def _plan(clubs):
+    """'pushdown' for small club selections (filtered by the store, not cached), 'scan' for whole dates."""
+    return "pushdown" if len(clubs) <= PRICE_PUSHDOWN_MAX_CLUBS else "scan"
+
+def _fetch_dates(store, dates, generations, clubs, hours):
+    """
+    Yields (date, docs, history_map) as each date's data becomes available:
+    cache hits first, then packed views (one batched read for all dates), then the rest.
+    Small club selections are queried per date with the filters pushed down; otherwise whole dates
+    are read, as one range query when the dates are consecutive or as concurrent per-date queries.
+    """
+    stamps = {d: PRICE_CACHE.stamp(generations, d, _history_date(d)) for d in dates}
+    pushdown = _plan(clubs) == "pushdown"
+    # Pushed-down results only hold the selection, so they are cached under the selection as well as the date
+    selection = (frozenset(clubs), None if hours is None else frozenset(hours))
+    missing = []
+    for date in dates:
+        cached = PRICE_CACHE.get(date, stamps[date])
+        if cached is None and pushdown:
+            cached = PRICE_CACHE.get((date, selection), stamps[date])
+        if cached is not None:
+            yield (date, *cached)
+        else:
+            missing.append(date)
+    if not missing:
+        return
+
+    def fetched(date, docs, history_map):
+        PRICE_CACHE.put(date, stamps[date], docs, history_map)
+        return date, docs, history_map
+
+    # Packed date views published by ingest: tee times + baseline for every date in 1-2 batched reads
+    views = load_views(store, missing)
+    rest = []
+    for date in missing:
+        if views[date] is not None:
+            yield fetched(date, *views[date])
+        else:
+            rest.append(date)
+
+    if not rest:
+        return
+    if pushdown:
+        futures = {_FETCH_POOL.submit(_query_date, store, d, _history_date(d), clubs, hours): d for d in rest}
+        for future in as_completed(futures):
+            date, (docs, history_map) = futures[future], future.result()
+            PRICE_CACHE.put((date, selection), stamps[date], docs, history_map)
+            yield date, docs, history_map
+    elif len(rest) == 1:
+        yield fetched(rest[0], *_query_date(store, rest[0], _history_date(rest[0])))
+    elif _contiguous(rest):
+        for date, (docs, history_map) in _query_range(store, rest).items():
+            yield fetched(date, docs, history_map)
+    else:
+        futures = {_FETCH_POOL.submit(_query_date, store, d, _history_date(d)): d for d in rest}
+        for future in as_completed(futures):
+            yield fetched(futures[future], *future.result())
+
+def _split(values):
+    return [v for value in values for v in value.split(",") if v]
+
+def _price_params():
+    """(dates, times, clubs) from a JSON body, or from the query string (?dates=..&times=..&clubs=..)."""
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        return data.get("dates", []), data.get("times", []), data.get("clubs", [])
+    # Club names are passed one per parameter; dates and hours may also be comma separated
+    args = request.args
+    return _split(args.getlist("dates")), _split(args.getlist("times")), args.getlist("clubs")
+
+def _price_rows(store, dates, generations, club_set, hour_set):
+    results = []
+
+    # Optimization: Query by date, then filter by club and time
+    # All dates (and their 7-day-ago history) are fetched together; each is filtered as soon as it arrives.
+    for date, docs, history_map in _fetch_dates(store, dates, generations, club_set, hour_set):
+        for item in docs:
+            
+            # Filter by Club
+            if item['club_name'] not in club_set:
+                continue
             
-            history_map = {} # (club_name, hour) -> min_price
+            # Filter by Time (Hour)
+            item_hour = item.get('hour') # int or str
             
-            # Fetch all daily_stats for the history date
-            # This might return ~100-200 docs, which is 1 read op per doc returned + 1 query op.
-            # If we have 50 items to show, N+1 approach is 50 reads.
-            # If we have 200 stats but only show 5 items, this might be more expensive?
-            # However, usually users see many items. And "Entity Reads" are cheap enough that 
-            # reducing latency of N round-trips is also worth it.
-            # Also, we can filter history query by clubs if list is small, but 'in' query limit is 10.
-            # Given the use case (showing many tee times), fetching all stats for the day is safer/simpler.
+            if hour_set is not None and int(item_hour) not in hour_set:
+                continue
+
+            # 3. Lookup History from Map
+            # item['hour'] comes from ingest_data, which is int.
+            hist_price = history_map.get((item['club_name'], item_hour))
             
-            hist_docs = db.collection('daily_stats').where('date', '==', history_date_str).stream()
-            for h_doc in hist_docs:
-                h_data = h_doc.to_dict()
-                # Key: (Club, Hour)
-                # Ensure types match. h_data['hour'] is likely int from archive_history.
-                h_club = h_data.get('club_name')
-                h_hour = h_data.get('hour')
-                h_price = h_data.get('min_price')
-                
-                if h_club and h_hour is not None:
-                    history_map[(h_club, str(h_hour))] = h_price
-                    # Also store as int just in case
-                    history_map[(h_club, int(h_hour))] = h_price
-
-            # 2. Fetch Current Data
-            docs = db.collection('tee_times').where('date', '==', date).stream()
+            diff = 0
+            if hist_price:
+                diff = item['price'] - hist_price
             
-            for doc in docs:
-                item = doc.to_dict()
-                
-                # Filter by Club
-                if item['club_name'] not in clubs:
-                    continue
-                
-                # Filter by Time (Hour)
-                item_hour = item.get('hour') # int or str
-                
-                if times:
-                    normalized_times = [str(int(t)) for t in times] # "06" -> "6"
-                    if str(int(item_hour)) not in normalized_times:
-                        continue
-
-                # 3. Lookup History from Map
-                # item['hour'] comes from ingest_data, which is int.
-                hist_price = history_map.get((item['club_name'], item_hour))
-                
-                diff = 0
-                if hist_price:
-                    diff = item['price'] - hist_price
-                
-                results.append({
-                    "club_name": item['club_name'],
-                    "date": item['date'],
-                    "time": item['time'], # "06:12"
-                    "price": item['price'],
-                    "diff": diff,
-                    "source": item.get('source', 'Unknown'),
-                    "history_price": hist_price
-                })
-
-        # Sort by Price
-        results.sort(key=lambda x: x['price'])
+            results.append({
+                "club_name": item['club_name'],
+                "date": item['date'],
+                "time": item['time'], # "06:12"
+                "price": item['price'],
+                "diff": diff,
+                "source": item.get('source', 'Unknown'),
+                "prices": item.get('prices') or {item.get('source', 'Unknown'): item['price']},
+                "history_price": hist_price
+            })
+
+    # Sort by Price
+    results.sort(key=lambda x: x['price'])
+    return results
+
+@app.route("/api/prices", methods=["GET", "POST"])
+def get_prices():
+    try:
+        dates, times, clubs = _price_params() # "YYYY-MM-DD" / hour strings "06", "07" / club names
         
-        return jsonify(results)
+        if not dates or not clubs:
+            return jsonify([])
+
+        store = get_store()
+        generations = PRICE_CACHE.generations(store)
+        dates = list(dict.fromkeys(dates))
+        club_set = set(clubs)
+        hour_set = {int(t) for t in times} if times else None # "06" -> 6
+
+        # The answer only changes when one of the requested dates (or its baseline date) gets a new generation
+        etag = last_modified = None
+        if generations is not None:
+            stamps = [PRICE_CACHE.stamp(generations, d, _history_date(d)) for d in dates]
+            epoch = _cache_epoch()
+            etag = http_cache.etag_for(stamps, sorted(dates), sorted(club_set), sorted(hour_set or ()), epoch)
+            published_at = PRICE_CACHE.head(store)["published_at"]
+            if published_at:
+                last_modified = datetime.fromtimestamp(max(published_at, epoch), timezone.utc)
+
+        # Prices are always revalidated; POST responses are never stored
+        policy = http_cache.REVALIDATE if request.method == "GET" else http_cache.NO_STORE
+        return http_cache.conditional(lambda: jsonify(_price_rows(store, dates, generations, club_set, hour_set)),
+                                      policy, etag=etag, last_modified=last_modified)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -1,12 +1,17 @@
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials
 import datetime
 import os
+import sys
 from collections import defaultdict
+from history_aggregator import HistoryAggregator, daily_add, daily_stats_doc
+from storage import STORAGE_BACKEND, as_storage, open_storage
 
 # Configuration
 PROJECT_ID = "golf-ai-480805"
 CRED_PATH = "service-account.json"
+# Recompute price_history from every future tee time instead of relying on ingest's incremental snapshots
+ARCHIVE_FULL_SCAN = os.environ.get("ARCHIVE_FULL_SCAN", "0") == "1"
 
 def init_firestore():
     # Use google.cloud.firestore directly
@@ -23,166 +28,100 @@ def init_firestore():
         credentials, project = google.auth.default()
         return firestore.Client(project=PROJECT_ID, credentials=credentials, database="teetime")
 
-def archive_history():
-    db = init_firestore()
+def archive_history(full=ARCHIVE_FULL_SCAN, rebuild_daily=False):
+    """
+    price_history snapshots are written incrementally by ingest_data (only groups whose stats moved).
+    With full=True, every future tee time is read and each date is recomputed against the stored
+    group state; this rebuilds snapshots when ingest ran with INGEST_HISTORY=0 or its state was lost.
+    """
+    db = open_storage(STORAGE_BACKEND, init_firestore)
     if not db:
         return
 
-    print("Fetching current tee times for aggregation...")
-    
-    # Query all tee times (or filter by date range if dataset is huge)
-    # For now, we fetch all valid future tee times
-    today_str = datetime.date.today().strftime("%Y-%m-%d")
-    docs = db.collection('tee_times').where('date', '>=', today_str).stream()
-    
-    # Aggregation structure: data[club][date][hour] = [prices...]
-    aggregated = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
-    
-    count = 0
-    for doc in docs:
-        d = doc.to_dict()
-        club = d.get('club_name')
-        date = d.get('date')
-        hour = d.get('hour')
-        price = d.get('price')
+    if full:
+        print("Fetching current tee times for aggregation...")
         
-        if club and date and hour is not None and price:
-            aggregated[club][date][hour].append(price)
-            count += 1
-            
-    print(f"Processed {count} tee times. Creating snapshots...")
-    
-    batch = db.batch()
-    batch_count = 0
-    snapshot_time = datetime.datetime.now()
-    
-    for club, dates in aggregated.items():
-        for date, hours in dates.items():
-            for hour, prices in hours.items():
-                min_price = min(prices)
-                avg_price = sum(prices) / len(prices)
+        # For now, we fetch all valid future tee times
+        today_str = datetime.date.today().strftime("%Y-%m-%d")
+        by_date = defaultdict(list)
+        count = 0
+        for _, d in db.tee_times_range(today_str):
+            if d.get('date'):
+                by_date[d['date']].append(d)
+                count += 1
                 
-                # Document ID: YYYYMMDD_Club_Hour_SnapshotTime
-                # We use a simplified snapshot ID to allow multiple snapshots per day
-                # e.g. 20251211_Plaza_08_1400
-                snapshot_str = snapshot_time.strftime("%H%M")
-                doc_id = f"{date.replace('-', '')}_{club}_{hour}_{snapshot_str}"
-                
-                doc_ref = db.collection('price_history').document(doc_id)
-                
-                data = {
-                    "club_name": club,
-                    "date": date,
-                    "hour": hour,
-                    "stats": {
-                        "min": min_price,
-                        "avg": avg_price,
-                        "count": len(prices)
-                    },
-                    "snapshot_at": snapshot_time,
-                    "weekday": datetime.datetime.strptime(date, "%Y-%m-%d").weekday(),
-                    # Add TTL field: Expire after 7 days
-                    "expire_at": snapshot_time + datetime.timedelta(days=7)
-                }
-                
-                batch.set(doc_ref, data)
-                batch_count += 1
-                
-                if batch_count >= 400:
-                    batch.commit()
-                    batch = db.batch()
-                    batch_count = 0
-                    print("Committed batch...")
-
-    if batch_count > 0:
-        batch.commit()
+        print(f"Processed {count} tee times. Creating snapshots...")
         
-    print("History archiving completed.")
+        aggregator = HistoryAggregator(db)
+        written = 0
+        for date in sorted(by_date):
+            written += aggregator.apply(date, by_date[date])["written"]
+            
+        print(f"History archiving completed. Snapshots written: {written}")
+    else:
+        print("price_history snapshots are written by ingest_data; skipping full scan (use --full to rebuild).")
     
     # Perform aggregation for yesterday (or past dates)
-    aggregate_daily_stats(db)
+    aggregate_daily_stats(db, rebuild=rebuild_daily)
 
-def aggregate_daily_stats(db):
+def aggregate_daily_stats(db, rebuild=False):
     """
-    Aggregates price_history into daily_stats for Yesterday.
-    This ensures we have a fast lookup table for past dates.
+    daily_stats are running aggregates (min/sum/count + quantile sketch) that HistoryAggregator
+    keeps in history_state/{date}, counting one snapshot per ingest run for every group. Ingest never writes
+    daily_stats documents; once the day is over they are written from the running aggregates (flush_daily),
+    so yesterday's daily_stats are complete and no open date shows up as a baseline.
+    With rebuild=True, yesterday's daily_stats are recomputed from its price_history snapshots instead
+    (e.g. after snapshots were written by an older version). Those only cover snapshots that were stored.
     """
+    db = as_storage(db)
     yesterday = (datetime.date.today() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-    print(f"Aggregating daily stats for {yesterday}...")
+    if not rebuild:
+        updated, skipped = HistoryAggregator(db).flush_daily(yesterday)
+        print(f"daily_stats for {yesterday} flushed from the running aggregates. Updated: {updated}, Skipped: {skipped}")
+        return
+    print(f"Rebuilding daily stats for {yesterday}...")
     
     # 1. Fetch existing daily_stats to avoid redundant writes
-    existing_docs = db.collection('daily_stats').where('date', '==', yesterday).stream()
-    existing_map = {}
-    for doc in existing_docs:
-        existing_map[doc.id] = doc.to_dict()
+    existing_map = dict(db.daily_stats(yesterday))
     
     # 2. Query price_history for yesterday
-    docs = db.collection('price_history').where('date', '==', yesterday).stream()
+    docs = db.price_history(yesterday)
     
-    # Structure: stats[club][hour] = [prices...]
-    stats = defaultdict(lambda: defaultdict(list))
+    # Structure: stats[club][hour] = running aggregate of snapshot minimums
+    stats = defaultdict(dict)
     
     count = 0
-    for doc in docs:
-        d = doc.to_dict()
+    for _, d in docs:
         club = d.get('club_name')
         hour = d.get('hour')
         
         snapshot_min = d.get('stats', {}).get('min')
         if club and hour is not None and snapshot_min is not None:
-            stats[club][hour].append(snapshot_min)
+            stats[club][hour] = daily_add(stats[club].get(hour), snapshot_min)
             count += 1
             
     print(f"Found {count} history records for {yesterday}. Calculating daily stats...")
     
-    batch = db.batch()
-    batch_count = 0
+    bw = db.writer(f"daily_stats {yesterday}")
+    updated_count = 0
     skipped_count = 0
     
     for club, hours in stats.items():
-        for hour, prices in hours.items():
-            min_price = min(prices)
-            avg_price = sum(prices) / len(prices)
-            snapshot_count = len(prices)
-            
-            # Doc ID: YYYYMMDD_Club_Hour
-            doc_id = f"{yesterday.replace('-', '')}_{club}_{hour}"
-            doc_ref = db.collection('daily_stats').document(doc_id)
-            
-            new_data = {
-                "club_name": club,
-                "date": yesterday,
-                "hour": hour,
-                "min_price": min_price,
-                "avg_price": avg_price,
-                "snapshot_count": snapshot_count,
-                "updated_at": firestore.SERVER_TIMESTAMP
-            }
+        for hour, agg in hours.items():
+            doc_id, new_data = daily_stats_doc(yesterday, club, hour, agg)
             
             # Check if update is needed
-            needs_update = True
-            if doc_id in existing_map:
-                existing = existing_map[doc_id]
-                if (existing.get('min_price') == min_price and
-                    existing.get('avg_price') == avg_price and
-                    existing.get('snapshot_count') == snapshot_count):
-                    needs_update = False
-            
-            if needs_update:
-                batch.set(doc_ref, new_data)
-                batch_count += 1
-                
-                if batch_count >= 400:
-                    batch.commit()
-                    batch = db.batch()
-                    batch_count = 0
-            else:
+            existing = existing_map.get(doc_id)
+            if existing and all(existing.get(k) == new_data[k] for k in ('min_price', 'avg_price', 'snapshot_count', 'sketch')):
                 skipped_count += 1
+                continue
+            bw.set('daily_stats', doc_id, new_data)
+            updated_count += 1
                 
-    if batch_count > 0:
-        batch.commit()
+    bw.close()
         
-    print(f"Daily stats aggregation for {yesterday} completed. Updated: {batch_count}, Skipped: {skipped_count}")
+    print(f"Daily stats aggregation for {yesterday} completed. Updated: {updated_count}, Skipped: {skipped_count}")
 
 if __name__ == "__main__":
-    archive_history()
+    archive_history(full=ARCHIVE_FULL_SCAN or "--full" in sys.argv[1:],
+                    rebuild_daily="--rebuild-daily" in sys.argv[1:])
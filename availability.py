@@ -0,0 +1,60 @@
+# availability.py
+# 예약 가능 날짜 매니페스트: 수집이 날짜마다 티타임 수·구장별 수·최저가를 문서 하나(availability/manifest)에 모아 둔다.
+# /api/available_dates는 날짜마다 조회하던 14번 대신 이 문서 하나만 읽는다.
+#   {"dates": {date: {"count", "min_price", "clubs": {club: count}}}, "updated_at"}
+# 티타임이 없는 날짜와 지난 날짜는 빠진다. 매니페스트가 없으면 읽는 쪽이 날짜별 조회로 대체.
+import datetime, threading
+from typing import Dict, Iterable, Optional
+from storage import SERVER_TIMESTAMP, Storage, as_storage
+
+AVAILABILITY_COLLECTION = "availability"
+MANIFEST_KEY = "manifest"
+
+def summarize(records: Iterable[Dict]) -> Optional[Dict]:
+    """병합 레코드(슬롯당 하나) → 날짜 요약. 티타임이 없으면 None"""
+    clubs: Dict[str, int] = {}
+    min_price = None
+    for r in records:
+        price = r.get("price")
+        if not price:
+            continue
+        club = r.get("golf") or r.get("club_name")
+        clubs[club] = clubs.get(club, 0) + 1
+        min_price = price if min_price is None else min(min_price, price)
+    if not clubs:
+        return None
+    return {"count": sum(clubs.values()), "min_price": min_price, "clubs": clubs}
+
+def load_availability(store: Storage) -> Optional[Dict[str, Dict]]:
+    """{date: 요약} — 매니페스트가 없거나 형식이 다르면 None"""
+    doc = as_storage(store).get_meta(AVAILABILITY_COLLECTION, MANIFEST_KEY)
+    dates = (doc or {}).get("dates")
+    return dates if isinstance(dates, dict) else None
+
+class AvailabilityManifest:
+    """
+    update(date, records)로 날짜 요약을 바꾼다. 요약이 그대로면 쓰지 않는다.
+    날짜 작업자들이 한 문서를 함께 고치므로 읽기-수정-쓰기는 잠금으로 직렬화.
+    """
+
+    def __init__(self, db):
+        self.store: Storage = as_storage(db)
+        self._lock = threading.Lock()
+        self._dates: Optional[Dict[str, Dict]] = None
+
+    def update(self, date: str, records: Iterable[Dict]) -> bool:
+        summary = summarize(records)
+        with self._lock:
+            if self._dates is None:
+                self._dates = dict(load_availability(self.store) or {})
+            today = datetime.date.today().isoformat()
+            dates = {d: s for d, s in self._dates.items() if d >= today}
+            if summary is None:
+                dates.pop(date, None)
+            else:
+                dates[date] = summary
+            if dates == self._dates:
+                return False
+            self.store.put_meta(AVAILABILITY_COLLECTION, MANIFEST_KEY, {"dates": dates, "updated_at": SERVER_TIMESTAMP})
+            self._dates = dates
+            return True
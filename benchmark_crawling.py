@@ -1,14 +1,20 @@
+import argparse
+import json
+import os
 import time
 import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from crawler_utils import crawl_golfpang, crawl_teescan
+import crawler_utils
+import rate_limiter
+from crawler_utils import crawl_golfpang, crawl_golfpang_dates, crawl_teescan
+from replay_server import ReplayServer
 
 # Mock DB save to isolate crawling performance
 def mock_save(data, date):
     pass
 
 def crawl_date(target_date):
-    """Crawl a single date and return data count"""
+    """Crawl a single date and return its records"""
     try:
         # Crawl Golfpang
         data_gp = crawl_golfpang(target_date, [])
@@ -24,13 +30,13 @@ def run_serial(dates):
     start_time = time.time()
     total_items = 0
     results = {}
-    
+
     for date in dates:
         print(f"Crawling {date}...")
         data = crawl_date(date)
         total_items += len(data)
-        results[date] = len(data)
-        
+        results[date] = data
+
     duration = time.time() - start_time
     print(f"Serial finished in {duration:.2f}s. Total items: {total_items}")
     return results, duration
@@ -40,51 +46,118 @@ def run_parallel(dates):
     start_time = time.time()
     total_items = 0
     results = {}
-    
+
     with ThreadPoolExecutor(max_workers=4) as executor:
         future_to_date = {executor.submit(crawl_date, date): date for date in dates}
-        
+
         for future in as_completed(future_to_date):
             date = future_to_date[future]
             try:
                 data = future.result()
                 total_items += len(data)
-                results[date] = len(data)
+                results[date] = data
                 print(f"Finished {date} ({len(data)} items)")
             except Exception as e:
                 print(f"Error on {date}: {e}")
-                
+
     duration = time.time() - start_time
     print(f"Parallel finished in {duration:.2f}s. Total items: {total_items}")
     return results, duration
 
+def run_multi_date(dates):
+    print("\n--- Starting Multi-date Crawl (shared Golfpang sweeps) ---")
+    start_time = time.time()
+    gp_by_date, gp_stats = crawl_golfpang_dates(dates, [])
+    results = {}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        future_to_date = {executor.submit(crawl_teescan, date, []): date for date in dates}
+        for future in as_completed(future_to_date):
+            date = future_to_date[future]
+            results[date] = gp_by_date.get(date, []) + future.result()
+    duration = time.time() - start_time
+    print(f"Multi-date finished in {duration:.2f}s. Total items: {sum(len(v) for v in results.values())} "
+          f"(pages={gp_stats['pages']}, saved≈{gp_stats['saved_pages_est']})")
+    return results, duration
+
+ENGINES = {
+    "serial": run_serial,
+    "parallel": run_parallel,
+    "multi": run_multi_date,
+}
+
+def _record_set(records):
+    return sorted((r["source"], r["golf"], r["date"], r["time"], r["price"]) for r in records)
+
+def check_integrity(dates, runs):
+    """Compare every engine's records with the first engine, record by record."""
+    print("\n=== Data Integrity Check ===")
+    base_name, (base_results, _) = next(iter(runs.items()))
+    match = True
+    for date in dates:
+        expected = _record_set(base_results.get(date, []))
+        for name, (results, _) in runs.items():
+            got = _record_set(results.get(date, []))
+            if got != expected:
+                print(f"MISMATCH on {date}: {base_name}={len(expected)} {name}={len(got)} "
+                      f"(only in {base_name}: {len(set(expected) - set(got))}, only in {name}: {len(set(got) - set(expected))})")
+                match = False
+        if match:
+            print(f"Match on {date}: {len(expected)} items")
+    return match
+
+def _manifest_path(fixture_dir):
+    return os.path.join(fixture_dir, "manifest.json")
+
 if __name__ == "__main__":
-    # Test with just 3 days to be quick but representative
+    ap = argparse.ArgumentParser(description="Benchmark crawler engines live or against recorded fixtures")
+    ap.add_argument("--days", type=int, default=3)
+    ap.add_argument("--engines", default="serial,parallel,multi")
+    ap.add_argument("--record", metavar="DIR", help="crawl live through the recorder and save fixtures to DIR")
+    ap.add_argument("--replay", metavar="DIR", help="serve fixtures from DIR instead of the live sites")
+    ap.add_argument("--latency", type=float, default=0.0, help="replay: ms per response")
+    ap.add_argument("--jitter", type=float, default=0.0, help="replay: ± ms uniform jitter")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="replay: fraction of 503 responses")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--local-rps", type=float, default=200.0, help="rate limit for the local stand-in server")
+    args = ap.parse_args()
+
     today = datetime.date.today()
-    dates = [(today + datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(3)]
-    
+    dates = [(today + datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(args.days)]
+
+    server = None
+    if args.record or args.replay:
+        fixture_dir = args.record or args.replay
+        if args.replay:
+            with open(_manifest_path(fixture_dir), "r", encoding="utf-8") as f:
+                dates = json.load(f)["dates"]
+        server = ReplayServer(fixture_dir, "record" if args.record else "replay",
+                              latency_ms=args.latency, jitter_ms=args.jitter,
+                              error_rate=args.error_rate, seed=args.seed).start()
+        # Both sites share the local host, so give it its own budget
+        rate_limiter.HOST_LIMITS["127.0.0.1"] = (args.local_rps, 32)
+        crawler_utils.set_endpoints(server.golfpang_base, server.teescan_base)
+        print(f"{'Recording' if args.record else 'Replaying'} via {server.base_url} "
+              f"(latency={args.latency}ms jitter={args.jitter}ms errors={args.error_rate:.0%})")
+
     print(f"Benchmarking crawling for dates: {dates}")
-    
-    serial_counts, serial_time = run_serial(dates)
-    parallel_counts, parallel_time = run_parallel(dates)
-    
+
+    runs = {}
+    for name in [e.strip() for e in args.engines.split(",") if e.strip()]:
+        runs[name] = ENGINES[name](dates)
+
     print("\n\n=== Benchmark Results ===")
-    print(f"Serial Time:   {serial_time:.2f}s")
-    print(f"Parallel Time: {parallel_time:.2f}s")
-    print(f"Speedup:       {serial_time / parallel_time:.2f}x")
-    
-    print("\n=== Data Integrity Check ===")
-    match = True
-    for date in dates:
-        s_count = serial_counts.get(date, 0)
-        p_count = parallel_counts.get(date, 0)
-        if s_count != p_count:
-            print(f"MISMATCH on {date}: Serial={s_count}, Parallel={p_count}")
-            match = False
-        else:
-            print(f"Match on {date}: {s_count} items")
-            
-    if match:
-        print("\nSUCCESS: Data counts match exactly!")
+    base_time = next(iter(runs.values()))[1]
+    for name, (_, duration) in runs.items():
+        print(f"{name:<10} {duration:8.2f}s  speedup {base_time / duration if duration else float('inf'):.2f}x")
+
+    if check_integrity(dates, runs):
+        print("\nSUCCESS: Records match exactly!")
     else:
-        print("\nWARNING: Data counts do not match!")
+        print("\nWARNING: Records do not match!")
+
+    if server is not None:
+        server.stop()
+        print(f"Replay server stats: {server.stats}")
+        if args.record:
+            with open(_manifest_path(args.record), "w", encoding="utf-8") as f:
+                json.dump({"dates": dates, "recorded_at": datetime.datetime.now().isoformat(timespec="seconds")}, f, indent=1)
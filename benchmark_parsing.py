@@ -0,0 +1,81 @@
+import glob
+import os
+import re
+import time
+from bs4 import BeautifulSoup
+from crawler_utils import parse_gp_rows, _parse_price, _same_mmdd, _normalize_md_from_kor_date
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "golfpang")
+TARGET_DATE = "2025-12-25"
+ROUNDS = 50
+
+def parse_bs4(html, target_date=None):
+    """Previous BeautifulSoup row extraction, kept here as the baseline."""
+    try:
+        soup = BeautifulSoup(html, "lxml")
+    except Exception:
+        soup = BeautifulSoup(html, "html.parser")
+
+    rows = soup.select('tr[id^="tr_"]')
+    out = []
+    for tr in rows:
+        tds = tr.find_all("td")
+        if len(tds) < 5: continue
+
+        date_txt = tds[1].get_text(" ", strip=True)
+        time_txt = tds[2].get_text(" ", strip=True)
+        club_txt = tds[4].get_text(" ", strip=True)
+
+        if target_date and not _same_mmdd(target_date, date_txt):
+            continue
+
+        price_txt = ""
+        price_span = tr.select_one("span.price")
+        if price_span:
+            price_txt = price_span.get_text(strip=True)
+        if not price_txt:
+            m_price = re.search(r"([0-9][0-9,]{3,})\s*원?", tr.get_text(" ", strip=True))
+            price_txt = m_price.group(1) if m_price else ""
+        price = _parse_price(price_txt)
+        if price is None:
+            continue
+
+        out.append((_normalize_md_from_kor_date(date_txt) or "", time_txt, club_txt, price))
+    return out, len(rows)
+
+def load_fixtures():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+def run(name, parse_fn, pages):
+    start_time = time.perf_counter()
+    total_rows = 0
+    for _ in range(ROUNDS):
+        for html in pages:
+            rows, _ = parse_fn(html, TARGET_DATE)
+            total_rows += len(rows)
+    duration = time.perf_counter() - start_time
+    n_pages = ROUNDS * len(pages)
+    print(f"{name:<14} {duration:.3f}s  {n_pages / duration:8.1f} pages/s  {total_rows / duration:10.1f} rows/s")
+    return duration
+
+if __name__ == "__main__":
+    pages = load_fixtures()
+    print(f"Benchmarking page parsing on {len(pages)} fixtures x {ROUNDS} rounds (target={TARGET_DATE})")
+
+    print("\n=== Data Integrity Check ===")
+    match = True
+    for i, html in enumerate(pages):
+        for target in (TARGET_DATE, None):
+            if parse_bs4(html, target) != parse_gp_rows(html, target):
+                print(f"MISMATCH on fixture #{i} (target={target})")
+                match = False
+    print("SUCCESS: Parsers agree on every fixture" if match else "WARNING: Parsers disagree!")
+
+    print("\n=== Benchmark Results ===")
+    before = run("BeautifulSoup", parse_bs4, pages)
+    after = run("lxml", parse_gp_rows, pages)
+    print(f"Speedup:       {before / after:.2f}x")
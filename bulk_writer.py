@@ -0,0 +1,187 @@
+# bulk_writer.py
+# Firestore 대량 쓰기: 작업을 batch 한도(작업 수·요청 크기)에서 잘라 공유 스레드 풀에서 병렬 commit
+# - 경합/일시 오류(Aborted, ResourceExhausted, 5xx, 시간 초과)는 지수 백오프 + 지터로 재시도
+# - 같은 문서를 건드리는 commit은 먼저 보낸 commit이 끝난 뒤에 보냄 (문서별 순서 보장)
+# - ops/sec 처리량 리포트
+import os, random, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from google.api_core import exceptions as gexc
+
+# Firestore 한도: commit당 500 작업, 요청 10 MiB. 트랜스폼·인덱스 항목 여유를 두고 자른다.
+BATCH_MAX_OPS = int(os.environ.get("BULK_BATCH_OPS", 400))
+BATCH_MAX_BYTES = int(os.environ.get("BULK_BATCH_BYTES", 9 * 1024 * 1024))
+# 프로세스 전체에서 동시에 진행되는 commit 수 (날짜 작업자 여러 개가 풀을 공유)
+COMMIT_WORKERS = int(os.environ.get("BULK_COMMIT_WORKERS", 8))
+# writer 하나가 commit 대기열에 쌓아 둘 수 있는 batch 수 (메모리 상한)
+MAX_PENDING_BATCHES = int(os.environ.get("BULK_MAX_PENDING", 16))
+COMMIT_RETRIES = int(os.environ.get("BULK_COMMIT_RETRIES", 5))
+RETRY_BASE_SEC = float(os.environ.get("BULK_RETRY_BASE_SEC", 0.5))
+
+RETRYABLE = (gexc.Aborted, gexc.ResourceExhausted, gexc.ServiceUnavailable,
+             gexc.DeadlineExceeded, gexc.InternalServerError)
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def _commit_pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=COMMIT_WORKERS, thread_name_prefix="bulk-commit")
+        return _POOL
+
+def _op_size(ref, data) -> int:
+    """요청 크기 대략치: 문서 경로 + 필드 값의 문자열 길이"""
+    return len(str(getattr(ref, "path", ""))) + (len(str(data)) if data is not None else 0) + 32
+
+def _doc_key(ref):
+    path = getattr(ref, "path", None)
+    return path if isinstance(path, str) else id(ref)
+
+class BulkWriter:
+    """
+    db.batch()를 대신하는 쓰기 도구. set()/delete()로 작업을 쌓으면 한도마다 batch 하나를 만들어
+    공유 풀에서 commit하고, flush()/close()에서 모두 끝날 때까지 기다린다.
+    commit 실패(재시도 소진)는 flush()/close()에서 첫 오류를 다시 던진다.
+
+        with BulkWriter(db, "tee_times 2025-12-25") as bw:
+            bw.set(ref, data)
+            bw.delete(other_ref)
+    """
+
+    def __init__(self, db, label: str = "bulk", max_ops: int = BATCH_MAX_OPS,
+                 max_bytes: int = BATCH_MAX_BYTES, retries: int = COMMIT_RETRIES,
+                 max_pending: int = MAX_PENDING_BATCHES, verbose: bool = True):
+        self.db = db
+        self.label = label
+        self.max_ops = max(1, min(int(max_ops), 500))
+        self.max_bytes = max_bytes
+        self.retries = retries
+        self.verbose = verbose
+        self._ops: List = []
+        self._bytes = 0
+        self._keys = set()
+        self._inflight: Dict = {}        # 문서 키 → 그 문서를 마지막으로 포함한 commit future
+        self._futures: List = []
+        self._pending = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._errors: List[Exception] = []
+        self._started = None
+        self.stats = {"ops": 0, "commits": 0, "retries": 0, "seconds": 0.0}
+
+    # ── 작업 추가 ──
+    def set(self, ref, data, merge: bool = False):
+        self._add(("set", ref, data, merge), ref, data)
+
+    def delete(self, ref):
+        self._add(("delete", ref, None, False), ref, None)
+
+    def _add(self, op, ref, data):
+        size = _op_size(ref, data)
+        if self._ops and (len(self._ops) >= self.max_ops or self._bytes + size > self.max_bytes):
+            self._submit()
+        self._ops.append(op)
+        self._bytes += size
+        self._keys.add(_doc_key(ref))
+
+    # ── commit ──
+    def _submit(self):
+        if not self._ops:
+            return
+        ops, keys = self._ops, self._keys
+        self._ops, self._keys, self._bytes = [], set(), 0
+        if self._started is None:
+            self._started = time.monotonic()
+        self._pending.acquire()
+        with self._lock:
+            deps = {self._inflight[k] for k in keys if k in self._inflight}
+            fut = _commit_pool().submit(self._commit, ops, deps)
+            for k in keys:
+                self._inflight[k] = fut
+            self._futures.append(fut)
+        fut.add_done_callback(lambda f, keys=keys: self._done(f, keys))
+
+    def _done(self, fut, keys):
+        with self._lock:
+            for k in keys:
+                if self._inflight.get(k) is fut:
+                    del self._inflight[k]
+        self._pending.release()
+
+    def _commit(self, ops, deps):
+        # 풀은 FIFO이므로 먼저 제출된 의존 commit은 이미 실행 중이거나 끝난 상태
+        if deps:
+            wait(deps)
+        attempt = 0
+        while True:
+            batch = self.db.batch()
+            for kind, ref, data, merge in ops:
+                if kind == "set":
+                    if merge:
+                        batch.set(ref, data, merge=True)
+                    else:
+                        batch.set(ref, data)
+                else:
+                    batch.delete(ref)
+            try:
+                batch.commit()
+                break
+            except RETRYABLE as e:
+                attempt += 1
+                if attempt > self.retries:
+                    with self._lock:
+                        self._errors.append(e)
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(RETRY_BASE_SEC * (2 ** (attempt - 1)) * (0.5 + random.random()))
+            except Exception as e:
+                with self._lock:
+                    self._errors.append(e)
+                raise
+        with self._lock:
+            self.stats["ops"] += len(ops)
+            self.stats["commits"] += 1
+            if self.verbose and self.stats["commits"] % 10 == 0:
+                print(f"[BulkWriter] {self.label}: {self.stats['ops']} ops committed...", flush=True)
+
+    def flush(self):
+        """쌓인 작업을 보내고 지금까지의 commit이 모두 끝날 때까지 대기"""
+        self._submit()
+        with self._lock:
+            futures, self._futures = self._futures, []
+        wait(futures)
+        if self._started is not None:
+            self.stats["seconds"] = time.monotonic() - self._started
+        with self._lock:
+            if self._errors:
+                raise self._errors[0]
+
+    def close(self) -> Dict:
+        self.flush()
+        if self.verbose and self.stats["ops"]:
+            print(self.report(), flush=True)
+        return self.stats
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.stats["ops"] / self.stats["seconds"] if self.stats["seconds"] > 0 else 0.0
+
+    def report(self) -> str:
+        return (f"[BulkWriter] {self.label}: {self.stats['ops']} ops in {self.stats['commits']} commits "
+                f"({self.stats['retries']} retries) {self.stats['seconds']:.2f}s → {self.ops_per_sec:.0f} ops/s")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            # 예외로 빠져나갈 때도 이미 쌓인 작업은 보내고, 원래 예외를 그대로 전달
+            try:
+                self.flush()
+            except Exception:
+                pass
+        return False
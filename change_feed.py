@@ -0,0 +1,88 @@
+# change_feed.py
+# 수집 변경 피드: 날짜 동기화가 끝날 때마다 새로 생긴·가격이 바뀐·사라진 슬롯을 세대(generation) 번호와 함께 남긴다.
+# 보관·캐시 무효화·알림이 전체를 다시 훑지 않고 마지막으로 본 세대 이후의 변경만 처리할 수 있게 함.
+# - change_feed/seq    : 세대 번호 카운터 (Storage.next_sequence로 원자적으로 증가)
+# - change_feed/{gen}  : 날짜 하나의 변경 {"date", "run", "inserted": [[slot, price]], "repriced": [[slot, price]], "deleted": [slot]}
+# - change_feed/head   : 마지막 세대와 날짜별 마지막 변경 세대 {"generation", "dates": {date: gen}, "published_at": epoch초}
+#                        — 변경 문서를 쓴 뒤 갱신
+# 날짜마다 바로 발행하므로 중간에 끊긴 실행도 이미 동기화한 날짜의 변경은 남는다.
+#
+#   from change_feed import read_changes
+#   gen, entries = read_changes(store, since=last_seen)   # entries가 None이면 피드가 잘려 전체 재조회 필요
+import datetime, os, threading, time
+from typing import Dict, List, Optional, Tuple
+from storage import SERVER_TIMESTAMP, Storage, as_storage
+
+FEED_COLLECTION = "change_feed"
+# 남겨 둘 세대 수 (그보다 오래된 변경 문서는 발행할 때 지움)
+CHANGE_FEED_KEEP = int(os.environ.get("CHANGE_FEED_KEEP", 5000))
+# 변경 문서 하나에 담는 슬롯 수 상한 (넘으면 목록 없이 truncated만 기록 → 소비자가 그 날짜를 전체 재조회)
+CHANGE_FEED_MAX_ITEMS = int(os.environ.get("CHANGE_FEED_MAX_ITEMS", 20000))
+
+KINDS = ("inserted", "repriced", "deleted")
+
+def _key(gen: int) -> str:
+    return f"{gen:010d}"
+
+def read_head(store: Storage) -> Dict:
+    """{"generation": 마지막 세대, "dates": {date: 그 날짜가 마지막으로 바뀐 세대}, "published_at": epoch초 또는 None}"""
+    head = as_storage(store).get_meta(FEED_COLLECTION, "head") or {}
+    gen, dates, at = head.get("generation"), head.get("dates"), head.get("published_at")
+    return {"generation": gen if isinstance(gen, int) else 0, "dates": dates if isinstance(dates, dict) else {},
+            "published_at": at if isinstance(at, (int, float)) else None}
+
+class ChangeFeed:
+    """
+    publish(date, changes) — changes: {slot_id: (kind, price)}, kind는 KINDS 중 하나 (deleted는 price None).
+    변경이 있으면 새 세대를 받아 변경 문서와 head를 쓰고 그 세대를 돌려준다.
+    """
+
+    def __init__(self, db, run: Optional[str] = None):
+        self.store: Storage = as_storage(db)
+        self.run = run
+        self._lock = threading.Lock()
+
+    def publish(self, date: str, changes: Dict[str, Tuple[str, Optional[int]]], partial: bool = False) -> Optional[int]:
+        if not changes:
+            return None
+        lists = {kind: [] for kind in KINDS}
+        for slot, (kind, price) in sorted(changes.items()):
+            lists[kind].append(slot if kind == "deleted" else [slot, price])
+
+        gen = self.store.next_sequence(FEED_COLLECTION, "seq")
+        doc = {"generation": gen, "date": date, "run": self.run, "partial": partial,
+               "counts": {kind: len(v) for kind, v in lists.items()}, "created_at": SERVER_TIMESTAMP}
+        if len(changes) > CHANGE_FEED_MAX_ITEMS:
+            doc["truncated"] = True
+        else:
+            doc.update(lists)
+        self.store.put_meta(FEED_COLLECTION, _key(gen), doc)
+
+        # 날짜 작업자들이 동시에 발행하므로 head 갱신은 직렬로. 세대는 낮추지 않고, 지난 날짜는 뺀다
+        with self._lock:
+            head = read_head(self.store)
+            today = datetime.date.today().isoformat()
+            dates = {d: g for d, g in head["dates"].items() if d >= today}
+            dates[date] = max(gen, dates.get(date, 0))
+            self.store.put_meta(FEED_COLLECTION, "head", {
+                "generation": max(gen, head["generation"]), "dates": dates, "published_at": time.time(),
+                "updated_at": SERVER_TIMESTAMP,
+            })
+        if gen > CHANGE_FEED_KEEP:
+            self.store.delete_meta(FEED_COLLECTION, _key(gen - CHANGE_FEED_KEEP))
+        return gen
+
+def read_changes(store: Storage, since: int = 0) -> Tuple[int, Optional[List[Dict]]]:
+    """
+    since 이후 세대의 변경 문서를 세대 순으로 → (마지막 세대, [변경 문서...]).
+    since 이후 일부가 이미 지워졌으면 entries는 None (전체 재조회 후 마지막 세대부터 다시 따라가면 됨).
+    번호만 받고 쓰지 못한 세대는 건너뛴다.
+    """
+    store = as_storage(store)
+    latest = read_head(store)["generation"]
+    if latest <= since:
+        return latest, []
+    if latest - since > CHANGE_FEED_KEEP:
+        return latest, None
+    docs = store.get_meta_many(FEED_COLLECTION, [_key(g) for g in range(since + 1, latest + 1)])
+    return latest, [d for d in docs if d is not None]
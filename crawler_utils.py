@@ -1,10 +1,10 @@
 # crawler_utils.py
-import requests, json, os, re, time as _time
-from bs4 import BeautifulSoup
+import requests, json, os, re, threading
+from lxml import etree
 from typing import List, Dict, Optional, Tuple
 import urllib3
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from rate_limiter import LimitedHTTPAdapter
+from response_cache import body_digest
 from datetime import datetime
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -19,13 +19,15 @@ with open(golf_club_path, "r", encoding="utf-8") as f:
 # ─────────────────────────────────────────────────────────────────────────────
 # 공통 설정
 GOLFPANG_BASE = "https://www.golfpang.com"
-LIST_URL     = f"{GOLFPANG_BASE}/web/round/booking_list.do"
-NODE_URL     = f"{GOLFPANG_BASE}/web/round/booking_node.do"
-TBLLIST_URL  = f"{GOLFPANG_BASE}/web/round/booking_tblList.do"
+# 요청 대상 주소 (GPANG_API_BASE로 재지정 가능: replay_server 등 로컬 대역 서버)
+GPANG_API_BASE = os.environ.get("GPANG_API_BASE", GOLFPANG_BASE).rstrip("/")
+LIST_URL     = f"{GPANG_API_BASE}/web/round/booking_list.do"
+NODE_URL     = f"{GPANG_API_BASE}/web/round/booking_node.do"
+TBLLIST_URL  = f"{GPANG_API_BASE}/web/round/booking_tblList.do"
 
 CONNECT_TIMEOUT = int(os.environ.get("GPANG_CONNECT_TIMEOUT", 5))
 READ_TIMEOUT    = int(os.environ.get("GPANG_READ_TIMEOUT", 20))
-SLEEP_BETWEEN   = float(os.environ.get("GPANG_SLEEP", 0.25))
+# 요청 간격/동시 요청 수는 rate_limiter.HOST_LIMITS (GPANG_SLEEP, GPANG_MAX_INFLIGHT, TEESCAN_RPS ...)
 
 COMMON_HEADERS = {
     "User-Agent": os.environ.get(
@@ -49,16 +51,30 @@ AJAX_HEADERS = {
     "x-customer-check": "gp-post-key-2019",
 }
 
+def set_endpoints(golfpang_base: Optional[str] = None, teescan_base: Optional[str] = None):
+    """
+    실행 중에 크롤링 대상 주소를 바꾼다 (벤치마크/재현 서버용).
+    레코드의 url 필드는 실제 사이트 주소를 유지하고, 부트스트랩된 골팡 세션은 모두 폐기.
+    """
+    global GPANG_API_BASE, LIST_URL, NODE_URL, TBLLIST_URL, TEESCAN_API_BASE, TEESCAN_API_URL
+    if golfpang_base:
+        GPANG_API_BASE = golfpang_base.rstrip("/")
+        LIST_URL    = f"{GPANG_API_BASE}/web/round/booking_list.do"
+        NODE_URL    = f"{GPANG_API_BASE}/web/round/booking_node.do"
+        TBLLIST_URL = f"{GPANG_API_BASE}/web/round/booking_tblList.do"
+        GP_SESSION_POOL.close()
+    if teescan_base:
+        TEESCAN_API_BASE = teescan_base.rstrip("/")
+        TEESCAN_API_URL  = f"{TEESCAN_API_BASE}/v1/booking/getTeeTimeListbyGolfclub"
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 유틸
-def _make_session() -> requests.Session:
+def _make_session(pool_maxsize: int = 40, retries: int = 6) -> requests.Session:
     s = requests.Session()
-    retry = Retry(
-        total=6, connect=6, read=6, backoff_factor=0.4,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET", "POST"], raise_on_status=False,
-    )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=20, pool_maxsize=40)
+    # 모든 요청은 호스트별 전역 제한기(토큰 버킷 + 동시 요청 상한)를 거친다.
+    # 재시도(429/5xx/연결·읽기 오류)도 제한기가 맡아 시도마다 토큰을 쓰고 감속 신호를 받는다
+    adapter = LimitedHTTPAdapter(retries=retries, backoff_factor=0.4,
+                                 pool_connections=20, pool_maxsize=max(pool_maxsize, 1))
     s.mount("https://", adapter); s.mount("http://", adapter)
     return s
 
@@ -120,6 +136,63 @@ def _same_mmdd(target_yyyy_mm_dd: str, kor_date_text: str) -> bool:
     tgt = f"{dt.month:02d}-{dt.day:02d}"
     return (_normalize_md_from_kor_date(kor_date_text) or "") == tgt
 
+def _target_mmdd(target_yyyy_mm_dd: str) -> str:
+    """'2025-12-25' → '12-25' (페이지당 1회만 계산)"""
+    y, m, d = target_yyyy_mm_dd.split("-")
+    return f"{int(m):02d}-{int(d):02d}"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 골팡 페이지 파서 (lxml 직접 사용 — BeautifulSoup 트리 생성/CSS 선택자 비용 제거)
+_GP_ROW_XPATH   = etree.XPath('//tr[starts-with(@id, "tr_")]')
+_GP_PRICE_XPATH = etree.XPath('.//span[contains(concat(" ", normalize-space(@class), " "), " price ")]')
+_GP_PRICE_RE    = re.compile(r"([0-9][0-9,]{3,})\s*원?")
+_GP_HTML_PARSER = threading.local()
+
+def _lx_text(el, sep: str = " ") -> str:
+    """BeautifulSoup get_text(sep, strip=True)와 동일: 공백 제거한 텍스트 조각을 sep로 연결"""
+    return sep.join(t for t in (x.strip() for x in el.itertext()) if t)
+
+def parse_gp_rows(html: str, target_date: Optional[str] = None) -> Tuple[List[Tuple[str, str, str, int]], int]:
+    """
+    booking_tblList.do 응답 → ([(mmdd, time_txt, club_txt, price), ...], tr 행 수)
+    - mmdd는 '12-25' 형식 (날짜 인식 실패 시 '')
+    - target_date가 주어지면 해당 월-일 행만 반환 (월-일은 페이지당 1회 계산)
+    - 가격을 읽을 수 없는 행은 제외
+    """
+    if not html or not html.strip():
+        return [], 0
+    parser = getattr(_GP_HTML_PARSER, "parser", None)
+    if parser is None:
+        parser = _GP_HTML_PARSER.parser = etree.HTMLParser()
+    root = etree.fromstring(html, parser)
+    if root is None:
+        return [], 0
+
+    tgt = _target_mmdd(target_date) if target_date else None
+    trs = _GP_ROW_XPATH(root)
+    out: List[Tuple[str, str, str, int]] = []
+    for tr in trs:
+        tds = list(tr.iter("td"))
+        if len(tds) < 5: continue
+
+        md = _normalize_md_from_kor_date(_lx_text(tds[1])) or ""
+        if tgt is not None and md != tgt:
+            continue
+
+        price_txt = ""
+        spans = _GP_PRICE_XPATH(tr)
+        if spans:
+            price_txt = _lx_text(spans[0], "")
+        if not price_txt:
+            m_price = _GP_PRICE_RE.search(_lx_text(tr))
+            price_txt = m_price.group(1) if m_price else ""
+        price = _parse_price(price_txt)
+        if price is None:
+            continue
+
+        out.append((md, _lx_text(tds[2]), _lx_text(tds[4]), price))
+    return out, len(trs)
+
 def _is_maintenance_html(text: str) -> bool:
     if not text: return False
     t = str(text)
@@ -156,13 +229,79 @@ def _bootstrap_gp_session(s: requests.Session, date_str: str, sector: Optional[i
         print(f"[{_fmt_ts()}] [Golfpang] bootstrap node.do 실패 → list.do 쿠키만 진행(관용 모드)", flush=True)
     return ok_list or ok_node
 
+# ─────────────────────────────────────────────────────────────────────────────
+# 골팡 세션 풀 — 섹터별 1회 부트스트랩 후 날짜/스레드 간 쿠키·커넥션 공유
+class GolfpangSessionPool:
+    """
+    섹터마다 부트스트랩된 requests.Session 하나를 보관한다.
+    - get(): 없으면 생성 + 부트스트랩, 있으면 그대로 반환 (세대 번호 포함)
+    - rebootstrap(): 5xx/점검 응답을 받은 호출자가 호출. 같은 세대에서 처음 요청한
+      스레드만 실제로 재부트스트랩하고, 나머지는 갱신된 세션을 그대로 받는다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Dict] = {}
+
+    def _entry(self, sector: int) -> Dict:
+        with self._lock:
+            e = self._entries.get(sector)
+            if e is None:
+                e = {"session": None, "gen": 0, "lock": threading.Lock()}
+                self._entries[sector] = e
+            return e
+
+    def get(self, sector: int, date_str: str) -> Tuple[requests.Session, int]:
+        e = self._entry(sector)
+        with e["lock"]:
+            if e["session"] is None:
+                s = _make_session()
+                _bootstrap_gp_session(s, date_str, sector)
+                e["session"] = s
+                e["gen"] += 1
+            return e["session"], e["gen"]
+
+    def rebootstrap(self, sector: int, date_str: str, gen: int) -> Tuple[requests.Session, int]:
+        e = self._entry(sector)
+        with e["lock"]:
+            if e["session"] is None:
+                e["session"] = _make_session()
+            if e["gen"] == gen or gen == 0:
+                print(f"[{_fmt_ts()}] [Golfpang]   retry bootstrap (500/maintenance) sec={sector}", flush=True)
+                _bootstrap_gp_session(e["session"], date_str, sector)
+                e["gen"] += 1
+            return e["session"], e["gen"]
+
+    def close(self):
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        for e in entries.values():
+            if e["session"] is not None:
+                e["session"].close()
+
+GP_SESSION_POOL = GolfpangSessionPool()
+
+def _post_tbllist(sector: int, date_str: str, form: Dict) -> requests.Response:
+    """booking_tblList.do POST. 5xx/점검 페이지면 섹터 세션을 재부트스트랩 후 1회 재시도."""
+    s, gen = GP_SESSION_POOL.get(sector, date_str)
+    r = s.post(TBLLIST_URL, data=form, headers=AJAX_HEADERS,
+               timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), verify=False)
+    if r.status_code >= 500 or _is_maintenance_html(r.text):
+        s, gen = GP_SESSION_POOL.rebootstrap(sector, date_str, gen)
+        r = s.post(TBLLIST_URL, data=form, headers=AJAX_HEADERS,
+                   timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), verify=False)
+    return r
+
 # ─────────────────────────────────────────────────────────────────────────────
 # 이름 매칭 (사이트 표기 ↔ 우리 JSON 표기)
+_NAME_WS_RE = re.compile(r"\s+")
+_NAME_CC_RE = re.compile(r"C\.?C\.?$")
+
 def _norm_name(n: str) -> str:
     if not n: return ""
     # n = re.sub(r"\(.*?\)", "", n)      # 괄호 제거 (REMOVED to distinguish Public/Member)
-    n = re.sub(r"\s+", "", n)          # 공백 제거
-    n = re.sub(r"C\.?C\.?$", "CC", n)  # C.C → CC
+    n = _NAME_WS_RE.sub("", n)         # 공백 제거
+    n = _NAME_CC_RE.sub("CC", n)       # C.C → CC
     n = n.replace("-", "")
     return n
 
@@ -179,31 +318,117 @@ def _name_match(site_txt: str, gp_code_txt: str) -> bool:
         return True
     return False
 
+class ClubNameMatcher:
+    """
+    사이트 구장 표기 → 대상 구장 매핑 인덱스 (크롤링 1회당 1번 구축)
+    - 대상 이름은 미리 정규화, 완전일치는 해시 조회
+    - 부분일치는 트라이로 사이트 문자열 안의 대상 이름을 한 번에 탐색
+    - 결과는 대상 목록 순서상 첫 매칭으로, 선형 _name_match 순회와 동일
+      ("Name"이 "Name(Public)"에 매칭되지 않는 규칙 유지)
+    - 이미 판정한 사이트 문자열은 메모 캐시에서 바로 반환
+    """
+
+    _END = ""
+
+    def __init__(self, targets: List[Dict]):
+        self._targets = list(targets)
+        self._norms = [_norm_name(t["gp"]) for t in self._targets]
+        self._exact: Dict[str, int] = {}
+        self._trie: Dict = {}
+        for i, b in enumerate(self._norms):
+            self._exact.setdefault(b, i)
+            if not b: continue
+            node = self._trie
+            for ch in b:
+                node = node.setdefault(ch, {})
+            node.setdefault(self._END, []).append(i)
+        self._memo: Dict[str, Optional[Dict]] = {}
+
+    def _substring_hits(self, a: str, limit: int) -> Optional[int]:
+        best = None
+        for start in range(len(a)):
+            node = self._trie
+            for ch in a[start:]:
+                node = node.get(ch)
+                if node is None: break
+                for i in node.get(self._END, ()):
+                    if i >= limit or (best is not None and i >= best): continue
+                    extra = a.replace(self._norms[i], "")
+                    if "(" in extra or ")" in extra: continue
+                    best = i
+        return best
+
+    def match(self, site_txt: str) -> Optional[Dict]:
+        try:
+            return self._memo[site_txt]
+        except KeyError:
+            pass
+        a = _norm_name(site_txt)
+        exact = self._exact.get(a)
+        limit = exact if exact is not None else len(self._targets)
+        sub = self._substring_hits(a, limit)
+        idx = sub if sub is not None else exact
+        res = self._targets[idx] if idx is not None else None
+        self._memo[site_txt] = res
+        return res
+
 # ─────────────────────────────────────────────────────────────────────────────
-# Teescan (원본 유지)
+# Teescan — 제한된 동시성(in-flight 상한) + keep-alive 세션 공유 + 요청별 타임아웃
+TEESCAN_API_BASE  = os.environ.get("TEESCAN_API_BASE", "https://foapi.teescanner.com").rstrip("/")
+TEESCAN_API_URL   = f"{TEESCAN_API_BASE}/v1/booking/getTeeTimeListbyGolfclub"
+TEESCAN_WORKERS   = int(os.environ.get("TEESCAN_WORKERS", 16))
+TEESCAN_TIMEOUT   = float(os.environ.get("TEESCAN_TIMEOUT", 3))
+TEESCAN_RETRIES   = int(os.environ.get("TEESCAN_RETRIES", 2))   # 구장당 최대 소요 ≈ (재시도+1) × 타임아웃
+
+def _fetch_teescan(s: requests.Session, seq: str, date_str: str) -> Optional[bytes]:
+    """티스캐너 API 원본 응답 본문 (오류 시 None)"""
+    url = f"{TEESCAN_API_URL}?golfclub_seq={seq}&roundDay={date_str}&orderType="
+    try:
+        r = s.get(url, timeout=(TEESCAN_TIMEOUT, TEESCAN_TIMEOUT))
+        return r.content
+    except Exception as e:
+        print(f"[Teescan] seq={seq} date={date_str} 오류: {e}", flush=True)
+        return None
+
+def _teescan_items(body: bytes) -> List[Dict]:
+    return json.loads(body).get("data", {}).get("teeTimeList", [])
+
 def get_teescan_times(s: requests.Session, seq: str, date_str: str) -> List[Dict]:
     """티스캐너 API에서 특정 구장/날짜의 티타임 리스트 조회"""
-    url = (
-        "https://foapi.teescanner.com/v1/booking/getTeeTimeListbyGolfclub"
-        f"?golfclub_seq={seq}&roundDay={date_str}&orderType="
-    )
-    # headers = {"User-Agent": "Mozilla/5.0"} # Session handles headers
+    body = _fetch_teescan(s, seq, date_str)
+    if body is None:
+        return []
     try:
-        r = s.get(url, timeout=3)
-        return r.json().get("data", {}).get("teeTimeList", [])
+        return _teescan_items(body)
     except Exception as e:
         print(f"[Teescan] seq={seq} date={date_str} 오류: {e}", flush=True)
         return []
 
-def crawl_teescan(date_str: str, favorite: List[str]):
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    
-    res: List[Dict] = []
-    visited = set()
-    tasks = []
-    
-    # Filter targets first
+def _teescan_records(name: str, date_str: str, items: List[Dict]) -> List[Dict]:
+    """티스캐너 API 응답 → 공통 레코드 dict 변환 (가격 범위 밖/비정상 항목 제외)"""
+    out: List[Dict] = []
+    for it in items:
+        try:
+            price = int(it.get("price", 0))
+            if price < 1000 or price > 10000000:
+                continue
+        except (ValueError, TypeError):
+            continue
+
+        ttxt  = str(it.get("teetime_time", "00:00"))
+        h     = int(ttxt.split(":")[0]) if ":" in ttxt else int(ttxt[:2] or 0)
+        out.append({
+            "golf": name, "date": date_str,
+            "hour": f"{h:02d}시대", "hour_num": h,
+            "price": price, "benefit": "",
+            "time": ttxt,
+            "url": "https://www.teescanner.com/", "source": "teescan",
+        })
+    return out
+
+def _teescan_targets(favorite: List[str]) -> List[Tuple[str, str]]:
     targets = []
+    visited = set()
     for club in GOLF_CLUBS:
         name = club.get("name")
         if not name or name in visited: continue
@@ -212,58 +437,84 @@ def crawl_teescan(date_str: str, favorite: List[str]):
         if not seq: continue
         if favorite and name not in favorite: continue
         targets.append((name, seq))
-        
-    # Sequential processing with Session reuse
-    with _make_session() as s:
-        # Set common headers for Teescan if needed
+    return targets
+
+def crawl_teescan(date_str: str, favorite: List[str], max_workers: Optional[int] = None, cache=None, emit=None):
+    """
+    - 구장별 API 호출을 스레드 풀로 동시에 수행 (동시 요청 수 = TEESCAN_WORKERS, 기본 16)
+    - 하나의 세션/커넥션 풀을 공유하여 keep-alive 재사용
+    - 결과 순서/형식은 순차 처리와 동일 (GOLF_CLUBS 순서)
+    - cache(ResponseCache)가 주어지면 응답 본문 해시가 같은 구장은 저장된 레코드를 재사용
+    - emit(records, unchanged)가 주어지면 구장별 결과를 완료되는 즉시 전달 (스트리밍 동기화용)
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    targets = _teescan_targets(favorite)
+    if not targets:
+        return []
+    workers = max(1, min(max_workers or TEESCAN_WORKERS, len(targets)))
+
+    def _fetch_cached(t_name, t_seq):
+        body = _fetch_teescan(s, t_seq, date_str)
+        if body is None:
+            return [], False
+        digest = body_digest(body)
+        records = cache.get("teescan", date_str, str(t_seq), digest)
+        if records is not None:
+            return records, True
+        try:
+            records = _teescan_records(t_name, date_str, _teescan_items(body))
+        except Exception as e:
+            print(f"[Teescan] seq={t_seq} date={date_str} 오류: {e}", flush=True)
+            return [], False
+        cache.put("teescan", date_str, str(t_seq), digest, records)
+        return records, False
+
+    def _fetch(target):
+        t_name, t_seq = target
+        try:
+            if cache is not None:
+                return _fetch_cached(t_name, t_seq)
+            return _teescan_records(t_name, date_str, get_teescan_times(s, t_seq, date_str)), False
+        except Exception as e:
+            print(f"[Teescan] Error processing {t_name}: {e}", flush=True)
+            return [], False
+
+    res: List[Dict] = []
+    all_hit = True
+    with _make_session(pool_maxsize=workers, retries=TEESCAN_RETRIES) as s:
         s.headers.update({"User-Agent": "Mozilla/5.0"})
-        
-        for t_name, t_seq in targets:
-            try:
-                items = get_teescan_times(s, t_seq, date_str)
-                
-                for it in items:
-                    try:
-                        price = int(it.get("price", 0))
-                        if price < 1000 or price > 10000000:
-                            continue
-                    except (ValueError, TypeError):
-                        continue
-                    
-                    ttxt  = str(it.get("teetime_time", "00:00"))
-                    h     = int(ttxt.split(":")[0]) if ":" in ttxt else int(ttxt[:2] or 0)
-                    res.append({
-                        "golf": t_name, "date": date_str,
-                        "hour": f"{h:02d}시대", "hour_num": h,
-                        "price": price, "benefit": "",
-                        "time": ttxt,
-                        "url": "https://www.teescanner.com/", "source": "teescan",
-                    })
-            except Exception as e:
-                print(f"[Teescan] Error processing {t_name}: {e}", flush=True)
-                
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_fetch, t) for t in targets]
+            if emit is not None:
+                for future in as_completed(futures):
+                    records, hit = future.result()
+                    emit(records, hit)
+            # 결과는 입력(GOLF_CLUBS) 순서대로 모아 순차 버전과 동일한 레코드 순서 유지
+            for future in futures:
+                records, hit = future.result()
+                res.extend(records)
+                all_hit = all_hit and hit
+
+    if cache is not None:
+        cache.mark(date_str, "teescan", all_hit, [("teescan", date_str, str(seq)) for _, seq in targets])
     return res
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Golfpang — clubname 비움 + 섹터(5,4,8) 순회 + 페이지 무제한 + 행단위 매핑 + 즉시 로그
-def crawl_golfpang(date_str: str, favorite: List[str], sectors: List[int] = None):
-    """
-    - sector는 기본 [5,4,8]만 순회(환경변수 GPANG_SECTORS='5,4,8'로 변경 가능)
-    - clubname='' 로 전체 수신 → <tr id="tr_*">를 행 단위 파싱
-    - 병렬 처리: 각 섹터를 별도 스레드/세션으로 처리하여 속도 향상.
-    """
-    out: List[Dict] = []
-    # 섹터 결정
+GPANG_MAX_PAGES = 50
+GPANG_PAGE_WINDOW = int(os.environ.get("GPANG_PAGE_WINDOW", 4))   # 섹터당 동시에 요청 중인 페이지 수
+
+def _gp_sectors(sectors: Optional[List[int]]) -> List[int]:
     if sectors is None or len(sectors) == 0:
         env = os.environ.get("GPANG_SECTORS", "5,4,8")
         try:
-            sectors = [int(x.strip()) for x in env.split(",") if x.strip()]
+            return [int(x.strip()) for x in env.split(",") if x.strip()]
         except Exception:
-            sectors = [5,4,8]
-    else:
-        sectors = [s for s in sectors if s in (5,4,8)]
+            return [5,4,8]
+    return [s for s in sectors if s in (5,4,8)]
 
-    # 수집 대상 구장 준비 (공통)
+def _gp_targets(favorite: List[str]) -> List[Dict]:
     targets_all: List[Dict] = []
     for club in GOLF_CLUBS:
         name = club.get("name")
@@ -272,149 +523,235 @@ def crawl_golfpang(date_str: str, favorite: List[str], sectors: List[int] = None
         if not _fav_ok(name, favorite): continue
         sector_guess = _sector_from_address(club.get("address"))
         targets_all.append({"name": name, "gp": gp_name, "sector": sector_guess})
+    return targets_all
+
+def _fetch_gp_page(sector: int, rd_date: str, page: int, target_date: Optional[str],
+                   cache=None) -> Tuple[List[Tuple[str, str, str, int]], int, bool]:
+    """섹터 목록 한 페이지 요청 + 파싱 (프리페치 워커에서 실행). 반환: (행, tr 수, 캐시 적중 여부)"""
+    form = {
+        "pageNum": page,
+        "rd_date": rd_date,
+        "sector": sector,
+        "clubname": "",
+        "bkOrder": "", "idx": "", "cust_nick": "",
+        "sector2": "", "sector3": "", "cdOrder": "",
+    }
+    r = _post_tbllist(sector, rd_date, form)
+    if cache is None or r.status_code != 200:
+        rows, tr_count = parse_gp_rows(r.text, target_date)
+        return rows, tr_count, False
+
+    # 캐시에는 날짜 필터 없이 파싱한 행을 저장 (같은 페이지가 여러 날짜에 쓰일 수 있음)
+    unit = f"{sector}:{page}"
+    digest = body_digest(r.content)
+    cached = cache.get("golfpang", rd_date, unit, digest)
+    if cached is not None:
+        return [tuple(row) for row in cached["rows"]], cached["tr_count"], True
+    rows, tr_count = parse_gp_rows(r.text)
+    cache.put("golfpang", rd_date, unit, digest, {"rows": rows, "tr_count": tr_count})
+    return rows, tr_count, False
+
+def _sweep_gp_sector(sector: int, rd_date: str, wanted: Dict[str, str],
+                     matcher: "ClubNameMatcher", cache=None) -> Tuple[Dict[str, List[Dict]], Dict]:
+    """
+    rd_date 기준으로 한 섹터의 페이지를 순회하며 행을 날짜별 버킷으로 분류.
+    - wanted: {'12-25': '2025-12-25', ...} 수집할 월-일 → 날짜
+    - 최대 GPANG_PAGE_WINDOW 페이지를 미리 요청(슬라이딩 윈도우)하되, 결과는 페이지 순서대로
+      소비하여 종료 규칙(빈 페이지 / 3페이지 연속 매칭 없음 / 최대 페이지)을 그대로 적용.
+      종료가 확정되면 아직 시작 안 한 선행 요청은 취소
+    - 페이지 사이 고정 대기는 없다: 섹터 세션의 모든 요청이 골팡 호스트 제한기(GPANG_SLEEP 간격)를 거친다
+    - 반환: ({날짜: [레코드]}, {"pages": 실제 요청한 페이지 수, "exhausted": 목록 끝(빈 페이지)까지 읽었는지,
+              "cache_misses": 캐시 미적중/오류 페이지 수, "units": 소비한 캐시 단위})
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    buckets: Dict[str, List[Dict]] = {d: [] for d in wanted.values()}
+    stats = {"pages": 0, "exhausted": False, "cache_misses": 0, "units": []}
+    seen = set()
+    empty_consecutive_pages = 0
+    target_date = rd_date if len(wanted) == 1 else None
+
+    window = max(1, min(GPANG_PAGE_WINDOW, GPANG_MAX_PAGES))
+    executor = ThreadPoolExecutor(max_workers=window)
+    inflight = {}
+    next_page = 1
+    page = 1
+    try:
+        while True:
+            while next_page <= GPANG_MAX_PAGES and len(inflight) < window:
+                inflight[next_page] = executor.submit(_fetch_gp_page, sector, rd_date, next_page, target_date, cache)
+                stats["pages"] += 1
+                next_page += 1
+
+            try:
+                rows, tr_count, hit = inflight.pop(page).result()
+            except Exception as e:
+                print(f"[{_fmt_ts()}] [Golfpang] Error processing sector={sector} page={page}: {e}", flush=True)
+                stats["cache_misses"] += 1
+                break
+            if not hit:
+                stats["cache_misses"] += 1
+            stats["units"].append(("golfpang", rd_date, f"{sector}:{page}"))
+
+            added_this_page = 0
+            for md, time_txt, club_txt, price in rows:
+                row_date = wanted.get(md)
+                if row_date is None:
+                    continue
+
+                matched = matcher.match(club_txt)
+                if not matched:
+                    continue
+
+                hour_label, hour_num = _normalize_time_to_hour_num(time_txt)
+                if hour_num < 0:
+                    continue
+
+                key = (matched["name"], row_date, hour_num, price)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                buckets[row_date].append({
+                    "golf": matched["name"],
+                    "date": row_date,
+                    "hour": hour_label,
+                    "hour_num": hour_num,
+                    "price": price,
+                    "benefit": "",
+                    "time": time_txt,
+                    "url": GOLFPANG_BASE + "/",
+                    "source": "golfpang",
+                })
+                added_this_page += 1
+
+            # Log/Break conditions
+            if not tr_count:
+                print(f"[{_fmt_ts()}] [Golfpang]  ⏹ No more rows. Stop sector={sector}", flush=True)
+                stats["exhausted"] = True
+                break
+
+            if added_this_page == 0:
+                empty_consecutive_pages += 1
+            else:
+                empty_consecutive_pages = 0
+
+            if empty_consecutive_pages >= 3:
+                print(f"[{_fmt_ts()}] [Golfpang]  ⏹ 3 consecutive pages with no matches. Stop sector={sector}", flush=True)
+                break
 
+            if page >= GPANG_MAX_PAGES:
+                print(f"[{_fmt_ts()}] [Golfpang]  ⏹ Max page reached. Stop sector={sector}", flush=True)
+                break
+
+            page += 1
+    finally:
+        # 종료 지점 이후의 선행 요청 정리: 시작 전이면 취소(요청 수에서 제외), 진행 중이면 결과 폐기
+        for fut in inflight.values():
+            if fut.cancel():
+                stats["pages"] -= 1
+        executor.shutdown(wait=False)
+
+    return buckets, stats
+
+def _gp_sort_key(x: Dict):
+    return (x.get("date",""), x.get("hour_num", 99), x.get("golf",""), x.get("price", 1<<60))
+
+def crawl_golfpang(date_str: str, favorite: List[str], sectors: List[int] = None, cache=None, emit=None):
+    """
+    - sector는 기본 [5,4,8]만 순회(환경변수 GPANG_SECTORS='5,4,8'로 변경 가능)
+    - clubname='' 로 전체 수신 → <tr id="tr_*">를 행 단위 파싱
+    - 병렬 처리: 각 섹터를 별도 스레드/세션으로 처리하여 속도 향상.
+    """
+    by_date, _ = crawl_golfpang_dates([date_str], favorite, sectors, cache=cache, emit=emit)
+    return by_date[date_str]
+
+def crawl_golfpang_dates(dates: List[str], favorite: List[str], sectors: List[int] = None,
+                         multi: bool = True, cache=None, emit=None) -> Tuple[Dict[str, List[Dict]], Dict]:
+    """
+    여러 날짜를 한 번의 페이지 순회로 수집 (날짜별 버킷 분류).
+    - 섹터마다 아직 남은 날짜 중 첫 날짜로 순회하고, 응답에 섞여 나오는 다른 대상 날짜 행도 함께 분류
+    - 순회가 목록 끝까지 도달했고(빈 페이지) 해당 날짜 행이 있었다면 그 날짜는 수집 완료로 보고 재순회 생략
+    - multi=False면 날짜마다 별도 순회 (기존 방식)
+    - cache(ResponseCache)가 주어지면 본문 해시가 같은 페이지는 파싱을 건너뛰고, 날짜별 적중 여부를 기록
+    - emit(records, unchanged)가 주어지면 섹터가 끝날 때마다 그 섹터의 레코드(모든 날짜)를 전달
+    반환: ({날짜: [레코드]}, {"sweeps", "pages", "saved_sweeps", "saved_pages_est", "failed_sectors"})
+    """
     from concurrent.futures import ThreadPoolExecutor, as_completed
 
+    dates = list(dict.fromkeys(dates))
+    sectors = _gp_sectors(sectors)
+    targets_all = _gp_targets(favorite)
+
+    # 섹터별 대상 필터링 + 이름 매칭 인덱스 (크롤링당 1회 구축)
+    matchers = {
+        sector: ClubNameMatcher([t for t in targets_all if t["sector"] == sector or t["sector"] is None])
+        for sector in sectors
+    }
+
     def _process_sector(sector):
-        local_out = []
-        # 섹터별 대상 필터링
-        targets = [t for t in targets_all if t["sector"] == sector or t["sector"] is None]
-        
-        # 각 스레드별 독립 세션 사용 (중요)
-        with _make_session() as s:
-            _bootstrap_gp_session(s, date_str, sector)
-            print(f"[{_fmt_ts()}] [Golfpang] ▶ START sector={sector} date={date_str}", flush=True)
-
-            seen = set()
-            page = 1
-            empty_consecutive_pages = 0
-            
-            while True:
-                form = {
-                    "pageNum": page,
-                    "rd_date": date_str,
-                    "sector": sector,
-                    "clubname": "",
-                    "bkOrder": "", "idx": "", "cust_nick": "",
-                    "sector2": "", "sector3": "", "cdOrder": "",
-                }
-                
-                try:
-                    r = s.post(TBLLIST_URL, data=form, headers=AJAX_HEADERS,
-                               timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), verify=False)
-                    status = r.status_code
-                    ctype = r.headers.get("Content-Type", "")
-                    
-                    if status >= 500 or _is_maintenance_html(r.text):
-                        print(f"[{_fmt_ts()}] [Golfpang]   retry bootstrap (500/maintenance) sec={sector}", flush=True)
-                        _bootstrap_gp_session(s, date_str, sector)
-                        r = s.post(TBLLIST_URL, data=form, headers=AJAX_HEADERS,
-                                   timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), verify=False)
-                        status = r.status_code
-                    
-                    try:
-                        soup = BeautifulSoup(r.text, "lxml")
-                    except Exception:
-                        soup = BeautifulSoup(r.text, "html.parser")
-
-                    rows = soup.select('tr[id^="tr_"]')
-                    added_this_page = 0
-
-                    for tr in rows:
-                        tds = tr.find_all("td")
-                        if len(tds) < 5: continue
-
-                        date_txt = tds[1].get_text(" ", strip=True)
-                        time_txt = tds[2].get_text(" ", strip=True)
-                        club_txt = tds[4].get_text(" ", strip=True)
-
-                        if not _same_mmdd(date_str, date_txt):
-                            continue
-
-                        matched = None
-                        for t in targets:
-                            if _name_match(club_txt, t["gp"]):
-                                matched = t; break
-                        if not matched:
-                            continue
-
-                        price_txt = ""
-                        price_span = tr.select_one("span.price")
-                        if price_span:
-                            price_txt = price_span.get_text(strip=True)
-                        if not price_txt:
-                            m_price = re.search(r"([0-9][0-9,]{3,})\s*원?", tr.get_text(" ", strip=True))
-                            price_txt = m_price.group(1) if m_price else ""
-                        price = _parse_price(price_txt)
-                        if price is None:
-                            continue
-
-                        hour_label, hour_num = _normalize_time_to_hour_num(time_txt)
-                        if hour_num < 0:
-                            continue
-
-                        key = (matched["name"], date_str, hour_num, price)
-                        if key in seen:
-                            continue
-                        seen.add(key)
-
-                        local_out.append({
-                            "golf": matched["name"],
-                            "date": date_str,
-                            "hour": hour_label,
-                            "hour_num": hour_num,
-                            "price": price,
-                            "benefit": "",
-                            "time": time_txt,
-                            "url": GOLFPANG_BASE + "/",
-                            "source": "golfpang",
-                        })
-                        added_this_page += 1
-
-                    # Log/Break conditions
-                    if not rows:
-                        print(f"[{_fmt_ts()}] [Golfpang]  ⏹ No more rows. Stop sector={sector}", flush=True)
-                        break
-                    
-                    if added_this_page == 0:
-                        empty_consecutive_pages += 1
-                    else:
-                        empty_consecutive_pages = 0
-                        
-                    if empty_consecutive_pages >= 3:
-                        print(f"[{_fmt_ts()}] [Golfpang]  ⏹ 3 consecutive pages with no matches. Stop sector={sector}", flush=True)
-                        break
-
-                    if page >= 50:
-                        print(f"[{_fmt_ts()}] [Golfpang]  ⏹ Max page reached. Stop sector={sector}", flush=True)
-                        break
-
-                    page += 1
-                    _time.sleep(0.05)
-                    
-                except Exception as e:
-                    print(f"[{_fmt_ts()}] [Golfpang] Error processing sector={sector} page={page}: {e}", flush=True)
-                    break
-                    
-        return local_out
+        matcher = matchers[sector]
+        buckets: Dict[str, List[Dict]] = {d: [] for d in dates}
+        st = {"sweeps": 0, "pages": 0, "cache_misses": 0}
+        remaining = list(dates)
+
+        while remaining:
+            rd_date = remaining[0]
+            # 섹터 세션은 풀에서 공유 (부트스트랩은 섹터당 1회)
+            print(f"[{_fmt_ts()}] [Golfpang] ▶ START sector={sector} date={rd_date}", flush=True)
+            sweep_dates = remaining if multi else [rd_date]
+            got, sweep = _sweep_gp_sector(sector, rd_date, {_target_mmdd(d): d for d in sweep_dates}, matcher, cache)
+            st["sweeps"] += 1
+            st["pages"] += sweep["pages"]
+            st["cache_misses"] += sweep["cache_misses"] if cache is not None else 1
+
+            covered = [rd_date] + [d for d in sweep_dates[1:] if got.get(d) and sweep["exhausted"]]
+            for d in covered:
+                buckets[d] = got.get(d, [])
+                if cache is not None:
+                    cache.mark(d, "golfpang", sweep["cache_misses"] == 0, sweep["units"])
+            if len(covered) > 1:
+                print(f"[{_fmt_ts()}] [Golfpang]   harvested {covered[1:]} from sweep date={rd_date} sector={sector}", flush=True)
+            remaining = [d for d in remaining if d not in covered]
+        return buckets, st
+
+    by_date: Dict[str, List[Dict]] = {d: [] for d in dates}
+    stats = {"sweeps": 0, "pages": 0, "saved_sweeps": 0, "saved_pages_est": 0, "failed_sectors": 0}
 
     # Execute sectors in parallel
     workers = min(len(sectors), 3)
     if workers < 1: workers = 1
-    
+
     with ThreadPoolExecutor(max_workers=workers) as executor:
         future_to_sector = {executor.submit(_process_sector, s): s for s in sectors}
         for future in as_completed(future_to_sector):
             sec = future_to_sector[future]
             try:
-                data = future.result()
-                out.extend(data)
-                print(f"[{_fmt_ts()}] [Golfpang] ◀ DONE sector={sec} count={len(data)}", flush=True)
+                buckets, st = future.result()
+                for d, recs in buckets.items():
+                    by_date[d].extend(recs)
+                if emit is not None:
+                    emit([r for recs in buckets.values() for r in recs], st["cache_misses"] == 0)
+                stats["sweeps"] += st["sweeps"]
+                stats["pages"] += st["pages"]
+                saved = len(dates) - st["sweeps"]
+                stats["saved_sweeps"] += saved
+                if st["sweeps"]:
+                    stats["saved_pages_est"] += round(saved * st["pages"] / st["sweeps"])
+                print(f"[{_fmt_ts()}] [Golfpang] ◀ DONE sector={sec} count={sum(len(v) for v in buckets.values())}", flush=True)
             except Exception as e:
                 print(f"[{_fmt_ts()}] [Golfpang] ◀ FAILED sector={sec} err={e}", flush=True)
-
-    out.sort(key=lambda x: (x.get("date",""), x.get("hour_num", 99), x.get("golf",""), x.get("price", 1<<60)))
-    return out
+                stats["failed_sectors"] += 1
+                if cache is not None:
+                    for d in dates:
+                        cache.mark(d, "golfpang", False)
+
+    for recs in by_date.values():
+        recs.sort(key=_gp_sort_key)
+    if len(dates) > 1:
+        print(f"[{_fmt_ts()}] [Golfpang] multi-date: dates={len(dates)} sweeps={stats['sweeps']} pages={stats['pages']} "
+              f"saved_sweeps={stats['saved_sweeps']} saved_pages≈{stats['saved_pages_est']}", flush=True)
+    return by_date, stats
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Golfpang Specific Club (for optimization/repair)
@@ -432,89 +769,64 @@ def crawl_golfpang_specific_club(date_str: str, club_id: str, sector: int) -> Li
             club_name = c.get("name")
             break
             
-    with _make_session() as s:
-        _bootstrap_gp_session(s, date_str, sector)
-        print(f"[{_fmt_ts()}] [Golfpang] ▶ START Specific Club={club_name}({club_id}) date={date_str}", flush=True)
+    # 섹터 세션은 풀에서 공유 (부트스트랩은 섹터당 1회)
+    print(f"[{_fmt_ts()}] [Golfpang] ▶ START Specific Club={club_name}({club_id}) date={date_str}", flush=True)
+    
+    seen = set()
+    page = 1
+    while True:
+        form = {
+            "pageNum": page,
+            "rd_date": date_str,
+            "sector": sector,
+            "clubname": club_id,  # Club ID
+            "bkOrder": "", "idx": "", "cust_nick": "",
+            "sector2": "", 
+            "sector3": club_id,   # Club ID
+            "cdOrder": "",
+        }
         
-        seen = set()
-        page = 1
-        while True:
-            form = {
-                "pageNum": page,
-                "rd_date": date_str,
-                "sector": sector,
-                "clubname": club_id,  # Club ID
-                "bkOrder": "", "idx": "", "cust_nick": "",
-                "sector2": "", 
-                "sector3": club_id,   # Club ID
-                "cdOrder": "",
-            }
+        try:
+            r = _post_tbllist(sector, date_str, form)
             
-            try:
-                r = s.post(TBLLIST_URL, data=form, headers=AJAX_HEADERS,
-                           timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), verify=False)
-                
-                try:
-                    soup = BeautifulSoup(r.text, "lxml")
-                except Exception:
-                    soup = BeautifulSoup(r.text, "html.parser")
-                rows = soup.select('tr[id^="tr_"]')
-                
-                if not rows:
-                    break
-                    
-                added_this_page = 0
-                for tr in rows:
-                    tds = tr.find_all("td")
-                    if len(tds) < 5: continue
-
-                    date_txt = tds[1].get_text(" ", strip=True)
-                    time_txt = tds[2].get_text(" ", strip=True)
-                    # club_txt = tds[4].get_text(" ", strip=True) # Should match our club
-                    
-                    price_txt = ""
-                    price_span = tr.select_one("span.price")
-                    if price_span:
-                        price_txt = price_span.get_text(strip=True)
-                    if not price_txt:
-                        m_price = re.search(r"([0-9][0-9,]{3,})\s*원?", tr.get_text(" ", strip=True))
-                        price_txt = m_price.group(1) if m_price else ""
-                    price = _parse_price(price_txt)
-                    if price is None:
-                        continue
-
-                    hour_label, hour_num = _normalize_time_to_hour_num(time_txt)
-                    if hour_num < 0:
-                        continue
-                        
-                    key = (club_name, date_str, hour_num, price)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    
-                    out.append({
-                        "golf": club_name,
-                        "date": date_str,
-                        "hour": hour_label,
-                        "hour_num": hour_num,
-                        "price": price,
-                        "benefit": "",
-                        "time": time_txt,
-                        "url": GOLFPANG_BASE + "/",
-                        "source": "golfpang",
-                    })
-                    added_this_page += 1
-                
-                print(f"[{_fmt_ts()}] [Golfpang]  Club={club_name} page={page} added={added_this_page}", flush=True)
+            rows, tr_count = parse_gp_rows(r.text)
+            
+            if not tr_count:
+                break
                 
-                if page >= 10: # Safety limit for single club
-                    break
+            added_this_page = 0
+            for _md, time_txt, _club_txt, price in rows:
+                hour_label, hour_num = _normalize_time_to_hour_num(time_txt)
+                if hour_num < 0:
+                    continue
                     
-                page += 1
-                _time.sleep(0.05)
+                key = (club_name, date_str, hour_num, price)
+                if key in seen:
+                    continue
+                seen.add(key)
                 
-            except Exception as e:
-                print(f"Error crawling specific club {club_name}: {e}")
+                out.append({
+                    "golf": club_name,
+                    "date": date_str,
+                    "hour": hour_label,
+                    "hour_num": hour_num,
+                    "price": price,
+                    "benefit": "",
+                    "time": time_txt,
+                    "url": GOLFPANG_BASE + "/",
+                    "source": "golfpang",
+                })
+                added_this_page += 1
+            
+            print(f"[{_fmt_ts()}] [Golfpang]  Club={club_name} page={page} added={added_this_page}", flush=True)
+            
+            if page >= 10: # Safety limit for single club
                 break
                 
+            page += 1
+            
+        except Exception as e:
+            print(f"Error crawling specific club {club_name}: {e}")
+            break
+            
     return out
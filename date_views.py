@@ -0,0 +1,125 @@
+# date_views.py
+# 읽기 경로용 날짜별 압축 뷰: 한 날짜의 티타임 전부 + 7일 전 기준가(daily_stats min_price)를 한 문서에 담는다.
+# - 열 단위 JSON → zlib → base64 문자열 하나 (문서마다 필드 하나라 to_dict() 비용이 거의 없음)
+# - 1 MiB 문서 한도를 넘으면 date_views/{date} 머리 문서 + {date}~1, {date}~2 ... 조각 문서로 나눔
+# - get_prices는 요청한 날짜 전체의 머리를 get_all 1회(+ 조각 get_all 1회)로 읽는다. 뷰가 없으면 기존 조회로 대체
+import base64, datetime, hashlib, json, os, zlib
+from typing import Dict, List, Optional, Tuple
+from history_aggregator import HISTORY_STATE_COLLECTION
+from storage import SERVER_TIMESTAMP, Storage
+
+VIEW_COLLECTION = "date_views"
+VIEW_VERSION = 2
+# 조각 하나에 담는 base64 문자 수 (문서 한도 1 MiB에 여유)
+VIEW_CHUNK_CHARS = int(os.environ.get("DATE_VIEW_CHUNK_CHARS", 900_000))
+BASELINE_DAYS = 7
+
+def baseline_date(date: str) -> str:
+    return (datetime.datetime.strptime(date, "%Y-%m-%d") - datetime.timedelta(days=BASELINE_DAYS)).strftime("%Y-%m-%d")
+
+def _chunk_key(date: str, i: int) -> str:
+    return date if i == 0 else f"{date}~{i}"
+
+def pack_view(date: str, tee_times: List[Dict], baseline: List[Dict]) -> str:
+    """
+    tee_times: tee_times 문서 형태 (club_name, time, hour, price, source, prices)
+    baseline : daily_stats 문서 형태 (club_name, hour, min_price)
+    """
+    clubs: Dict[str, int] = {}
+    sources: Dict[str, int] = {}
+    cols = {"club": [], "time": [], "hour": [], "price": [], "source": [], "prices": []}
+    for t in tee_times:
+        cols["club"].append(clubs.setdefault(t["club_name"], len(clubs)))
+        cols["time"].append(t["time"])
+        cols["hour"].append(t["hour"])
+        cols["price"].append(t["price"])
+        cols["source"].append(sources.setdefault(t.get("source", "Unknown"), len(sources)))
+        # 출처별 가격: [출처 위치, 가격, 출처 위치, 가격, ...]
+        flat = []
+        for src, p in sorted((t.get("prices") or {t.get("source", "Unknown"): t["price"]}).items()):
+            flat += [sources.setdefault(src, len(sources)), p]
+        cols["prices"].append(flat)
+    base = {"club": [], "hour": [], "min": []}
+    for b in baseline:
+        if b.get("club_name") and b.get("hour") is not None and b.get("min_price") is not None:
+            base["club"].append(clubs.setdefault(b["club_name"], len(clubs)))
+            base["hour"].append(int(b["hour"]))
+            base["min"].append(b["min_price"])
+    payload = {"v": VIEW_VERSION, "date": date, "clubs": list(clubs), "sources": list(sources),
+               "rows": cols, "baseline": base}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(raw, 6)).decode("ascii")
+
+def unpack_view(packed: str) -> Tuple[List[Dict], Dict]:
+    """압축 뷰 → (티타임 목록, {(club, hour): min_price}) — hour는 int와 str 두 키로 모두 넣는다"""
+    payload = json.loads(zlib.decompress(base64.b64decode(packed)))
+    clubs, sources, rows = payload["clubs"], payload["sources"], payload["rows"]
+    date = payload["date"]
+    items = []
+    for c, t, h, p, s, flat in zip(rows["club"], rows["time"], rows["hour"], rows["price"], rows["source"], rows["prices"]):
+        prices = {sources[flat[i]]: flat[i + 1] for i in range(0, len(flat), 2)}
+        items.append({"club_name": clubs[c], "date": date, "time": t, "hour": h, "price": p, "source": sources[s],
+                      "prices": prices, "sources": sorted(prices)})
+    history = {}
+    base = payload["baseline"]
+    for c, h, m in zip(base["club"], base["hour"], base["min"]):
+        history[(clubs[c], h)] = m
+        history[(clubs[c], str(h))] = m
+    return items, history
+
+def load_baseline(store: Storage, date: str) -> List[Dict]:
+    """기준일 daily_stats 최저가. 집계 상태 문서 하나로 읽고, 없으면 daily_stats 조회로 대체 (지난 날짜만, 아니면 빈 목록)"""
+    base = baseline_date(date)
+    if base >= datetime.date.today().strftime("%Y-%m-%d"):
+        # 오늘 이후 기준일은 아직 누적 중인 값이라 기준가로 쓰지 않는다 (daily_stats도 그날이 지나야 생김)
+        return []
+    state = store.get_meta(HISTORY_STATE_COLLECTION, base) or {}
+    daily = state.get("daily")
+    if daily and all("club" in a for a in daily.values()):
+        return [{"club_name": a["club"], "hour": a["hour"], "min_price": a["min"]} for a in daily.values()]
+    return [d for _, d in store.daily_stats(base)]
+
+def publish_view(store: Storage, date: str, tee_times: List[Dict]) -> bool:
+    """날짜 뷰를 새로 만들어 내용이 바뀌었을 때만 쓴다. 썼으면 True"""
+    baseline = load_baseline(store, date)
+    packed = pack_view(date, tee_times, baseline)
+    digest = hashlib.sha1(packed.encode("ascii")).hexdigest()[:16]
+    head = store.get_meta(VIEW_COLLECTION, date)
+    if head and head.get("v") == VIEW_VERSION and head.get("digest") == digest:
+        return False
+
+    parts = [packed[i:i + VIEW_CHUNK_CHARS] for i in range(0, len(packed), VIEW_CHUNK_CHARS)] or [""]
+    old_chunks = head.get("chunks", 1) if head else 1
+    # 조각을 먼저 쓰고 머리 문서를 마지막에 바꿔서, 읽는 쪽이 새 머리 + 옛 조각을 섞어 보지 않게 함
+    for i, part in enumerate(parts[1:], start=1):
+        store.put_meta(VIEW_COLLECTION, _chunk_key(date, i), {"date": date, "digest": digest, "data": part})
+    store.put_meta(VIEW_COLLECTION, date, {
+        "v": VIEW_VERSION, "date": date, "digest": digest, "chunks": len(parts),
+        "count": len(tee_times), "data": parts[0], "updated_at": SERVER_TIMESTAMP,
+    })
+    for i in range(len(parts), old_chunks):
+        store.delete_meta(VIEW_COLLECTION, _chunk_key(date, i))
+    return True
+
+def load_view(store: Storage, date: str) -> Optional[Tuple[List[Dict], Dict]]:
+    """날짜 뷰 읽기. 없거나 형식이 다르거나 조각이 맞지 않으면 None (호출 쪽이 원래 조회로 대체)"""
+    return load_views(store, [date])[date]
+
+def load_views(store: Storage, dates: List[str]) -> Dict[str, Optional[Tuple[List[Dict], Dict]]]:
+    """여러 날짜의 뷰를 머리 get_all 1회 + 조각 get_all 1회로 → {date: load_view와 같은 값}"""
+    heads = dict(zip(dates, store.get_meta_many(VIEW_COLLECTION, dates)))
+    valid = {d: h for d, h in heads.items()
+             if h and h.get("v") == VIEW_VERSION and isinstance(h.get("data"), str)}
+    chunk_keys = [_chunk_key(d, i) for d, h in valid.items() for i in range(1, h.get("chunks", 1))]
+    chunks = dict(zip(chunk_keys, store.get_meta_many(VIEW_COLLECTION, chunk_keys))) if chunk_keys else {}
+
+    out: Dict[str, Optional[Tuple[List[Dict], Dict]]] = {d: None for d in dates}
+    for d, head in valid.items():
+        rest = [chunks[_chunk_key(d, i)] for i in range(1, head.get("chunks", 1))]
+        if any(r is None or r.get("digest") != head.get("digest") for r in rest):
+            continue
+        try:
+            out[d] = unpack_view("".join([head["data"]] + [r["data"] for r in rest]))
+        except (ValueError, KeyError, zlib.error):
+            pass
+    return out
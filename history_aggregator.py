@@ -0,0 +1,268 @@
+# history_aggregator.py
+# price_history 증분 집계: 수집 diff로 바뀐 (구장, 시간대) 그룹만 NumPy group-by로 다시 계산하고,
+# 통계(min/avg/count)가 실제로 움직인 그룹만 스냅샷 문서로 쓴다.
+# - 날짜별 직전 그룹 통계는 저장소 메타 문서(history_state/{date}) 하나에 보관 (Cloud Run 작업 간 공유)
+# - 상태가 없으면(첫 실행·실패 후) 그 날짜 전체를 다시 계산
+# - 통계가 그대로인 그룹도 HISTORY_REFRESH_DAYS가 지나면 다시 써서 TTL(7일) 만료로 이력이 끊기지 않게 함
+# - daily_stats는 병합 가능한 누적값(min, sum, count, 분위수 스케치): 실행마다 모든 그룹의 스냅샷 최저가를 상태에 누적하고
+#   (통계가 그대로라 스냅샷 문서를 쓰지 않은 그룹 포함), 문서는 날짜가 지난 뒤 flush_daily()에서만 쓴다
+#   (진행 중인 날짜의 누적값이 앱의 '7일 전' 기준가로 보이지 않게)
+import datetime, math, os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from storage import SERVER_TIMESTAMP, Storage, as_storage
+
+HISTORY_STATE_COLLECTION = "history_state"
+HISTORY_TTL_DAYS = 7
+HISTORY_REFRESH_DAYS = float(os.environ.get("HISTORY_REFRESH_DAYS", 3))
+# 스케치 버킷 폭: 버킷 i는 [γ^i, γ^(i+1)) → 분위수 상대 오차 약 (γ-1)/2
+SKETCH_GAMMA = 1.02
+SKETCH_QUANTILES = {"p25_price": 0.25, "p50_price": 0.5, "p75_price": 0.75}
+
+Group = Tuple[str, int]   # (club_key, hour)
+
+def club_key(name: str) -> str:
+    """tee_times 문서 ID에 들어가는 구장 표기"""
+    return name.replace(" ", "").replace("/", "_")
+
+def doc_group(doc_id: str) -> Optional[Group]:
+    """tee_times 문서 ID(YYYYMMDD_club_HHMM) → (club_key, hour)"""
+    if len(doc_id) < 15 or doc_id[8] != "_" or doc_id[-5] != "_":
+        return None
+    try:
+        return doc_id[9:-5], int(doc_id[-4:-2])
+    except ValueError:
+        return None
+
+def group_stats(keys: np.ndarray, prices: np.ndarray):
+    """정수 그룹 키별 (키, min, sum, count) — 정렬 후 reduceat으로 한 번에 계산"""
+    if len(keys) == 0:
+        empty = np.empty(0, np.int64)
+        return empty, empty, empty, empty
+    order = np.argsort(keys, kind="stable")
+    k, p = keys[order], prices[order]
+    uniq, starts = np.unique(k, return_index=True)
+    mins = np.minimum.reduceat(p, starts)
+    sums = np.add.reduceat(p, starts)
+    counts = np.diff(np.append(starts, len(k)))
+    return uniq, mins, sums, counts
+
+def record_hour(r: Dict) -> Optional[int]:
+    """
+    레코드의 시(hour): 크롤 레코드는 hour_num (hour는 '07시대' 같은 표시용 문자열),
+    tee_times 문서는 정수 hour, 둘 다 없으면 time 앞 두 자리 (snapshot_archive._hour와 같은 규칙)
+    """
+    h = r.get("hour_num")
+    if h is None and not isinstance(r.get("hour"), str):
+        h = r.get("hour")
+    if h is not None and int(h) >= 0:
+        return int(h)
+    t = str(r.get("time") or "")[:2]
+    return int(t) if t.isdigit() else None
+
+def _state_key(g: Group) -> str:
+    return f"{g[0]}|{g[1]}"
+
+# ── 병합 가능한 일별 누적값: {"min", "sum", "count", "sketch": {버킷: 개수}} ──
+
+def _bucket(price: float) -> str:
+    return str(int(math.floor(math.log(price) / math.log(SKETCH_GAMMA))))
+
+def daily_add(agg: Optional[Dict], price: int) -> Dict:
+    agg = daily_merge(agg, None)
+    agg["min"] = price if agg["min"] is None else min(agg["min"], price)
+    agg["sum"] += price
+    agg["count"] += 1
+    b = _bucket(price)
+    agg["sketch"][b] = agg["sketch"].get(b, 0) + 1
+    return agg
+
+def daily_merge(a: Optional[Dict], b: Optional[Dict]) -> Dict:
+    """두 누적값을 합친 새 누적값 (순서·분할과 무관)"""
+    out = {"min": None, "sum": 0, "count": 0, "sketch": {}}
+    for agg in (a, b):
+        if not agg:
+            continue
+        if agg.get("min") is not None:
+            out["min"] = agg["min"] if out["min"] is None else min(out["min"], agg["min"])
+        out["sum"] += agg.get("sum", 0)
+        out["count"] += agg.get("count", 0)
+        for k, n in (agg.get("sketch") or {}).items():
+            out["sketch"][k] = out["sketch"].get(k, 0) + n
+    return out
+
+def sketch_quantile(sketch: Dict[str, int], q: float) -> Optional[int]:
+    """스케치에서 q 분위수 추정 (버킷 기하 중앙값)"""
+    total = sum(sketch.values())
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for k in sorted(sketch, key=int):
+        seen += sketch[k]
+        if seen > rank:
+            i = int(k)
+            return int(round(SKETCH_GAMMA ** (i + 0.5)))
+    return None
+
+def daily_stats_doc(date: str, club: str, hour: int, agg: Dict) -> Tuple[str, Dict]:
+    # Doc ID: YYYYMMDD_Club_Hour
+    doc = {
+        "club_name": club,
+        "date": date,
+        "hour": hour,
+        "min_price": agg["min"],
+        "avg_price": agg["sum"] / agg["count"],
+        "snapshot_count": agg["count"],
+        "sum_price": agg["sum"],
+        "sketch": agg["sketch"],
+        "updated_at": SERVER_TIMESTAMP,
+    }
+    for field, q in SKETCH_QUANTILES.items():
+        doc[field] = sketch_quantile(agg["sketch"], q)
+    return f"{date.replace('-', '')}_{club}_{hour}", doc
+
+def _daily_from_doc(d: Dict) -> Optional[Dict]:
+    """저장된 daily_stats 문서 → 누적값 (sum/sketch가 없는 예전 문서는 avg×count로 복원)"""
+    count = d.get("snapshot_count") or 0
+    if not count or d.get("min_price") is None:
+        return None
+    total = d.get("sum_price")
+    if total is None:
+        total = (d.get("avg_price") or d["min_price"]) * count
+    return {"min": d["min_price"], "sum": total, "count": count, "sketch": dict(d.get("sketch") or {})}
+
+class HistoryAggregator:
+    """
+    apply(date, records, changed)
+      records : 그 날짜의 현재 전체 레코드 (크롤 레코드 golf/hour_num/price 또는 tee_times 문서 club_name/hour/price,
+                시는 record_hour()로 읽음)
+      changed : 수집 diff로 바뀐 그룹 집합 {(club_key, hour)}. None이면 날짜 전체 재계산
+    """
+
+    def __init__(self, db, snapshot_time: Optional[datetime.datetime] = None):
+        self.store: Storage = as_storage(db)
+        self.snapshot_time = snapshot_time or datetime.datetime.now()
+
+    def _snapshot_doc(self, date: str, club: str, hour: int, st: Dict) -> Tuple[str, Dict]:
+        # Document ID: YYYYMMDD_Club_Hour_SnapshotTime (e.g. 20251211_Plaza_08_1400)
+        doc_id = f"{date.replace('-', '')}_{club}_{hour}_{self.snapshot_time.strftime('%H%M')}"
+        return doc_id, {
+            "club_name": club,
+            "date": date,
+            "hour": hour,
+            "stats": {"min": st["min"], "avg": st["avg"], "count": st["count"]},
+            "snapshot_at": self.snapshot_time,
+            "weekday": datetime.datetime.strptime(date, "%Y-%m-%d").weekday(),
+            "expire_at": self.snapshot_time + datetime.timedelta(days=HISTORY_TTL_DAYS),
+        }
+
+    def apply(self, date: str, records: Iterable[Dict], changed: Optional[Set[Group]] = None) -> Dict:
+        state = self.store.get_meta(HISTORY_STATE_COLLECTION, date) or {}
+        groups: Dict[str, Dict] = state.get("groups")
+        daily: Dict[str, Dict] = state.get("daily") or {}
+        bootstrap = groups is None
+        if bootstrap:
+            groups, changed = {}, None
+            # 상태를 통째로 잃었어도(invalidate()는 누적값을 남김) 그날 이미 쌓인 daily_stats 누적값은 이어서 사용
+            for _, d in (self.store.daily_stats(date) if not daily else ()):
+                agg = _daily_from_doc(d)
+                if agg and d.get("club_name") and d.get("hour") is not None:
+                    agg.update(club=d["club_name"], hour=int(d["hour"]))
+                    daily[_state_key((club_key(d["club_name"]), int(d["hour"])))] = agg
+
+        # 바뀐 그룹에 속한 행만 배열로
+        names: List[str] = []
+        gid: Dict[Group, int] = {}
+        keys, prices = [], []
+        for r in records:
+            club = r.get("club_name") or r.get("golf")
+            hour = record_hour(r)
+            price = r.get("price")
+            if not club or hour is None or not price:
+                continue
+            g = (club_key(club), hour)
+            if changed is not None and g not in changed:
+                continue
+            if g not in gid:
+                gid[g] = len(names)
+                names.append(club)
+            keys.append(gid[g])
+            prices.append(price)
+        uniq, mins, sums, counts = group_stats(np.asarray(keys, np.int64), np.asarray(prices, np.int64))
+
+        now = self.snapshot_time
+        refresh_before = (now - datetime.timedelta(days=HISTORY_REFRESH_DAYS)).isoformat(timespec="seconds")
+        by_index = {i: g for g, i in gid.items()}
+        recomputed = set()
+        to_write = []
+        for i, mn, sm, cnt in zip(uniq.tolist(), mins.tolist(), sums.tolist(), counts.tolist()):
+            g = by_index[i]
+            sk = _state_key(g)
+            recomputed.add(sk)
+            st = {"club": names[i], "hour": g[1], "min": mn, "avg": sm / cnt, "count": cnt}
+            prev = groups.get(sk)
+            if prev and (prev["min"], prev["avg"], prev["count"]) == (st["min"], st["avg"], st["count"]) \
+                    and prev.get("written_at", "") >= refresh_before:
+                continue
+            st["written_at"] = now.isoformat(timespec="seconds")
+            groups[sk] = st
+            to_write.append(st)
+
+        # 바뀐 그룹인데 남은 티타임이 없으면 상태에서 제거 (전체 재계산이면 보지 못한 그룹 모두)
+        stale = [sk for sk, st in groups.items() if sk not in recomputed and
+                 (changed is None or (club_key(st["club"]), st["hour"]) in changed)]
+        for sk in stale:
+            del groups[sk]
+
+        # 통계는 그대로지만 마지막 스냅샷이 오래된 그룹은 TTL 만료 전에 다시 쓴다
+        for sk, st in groups.items():
+            if sk not in recomputed and st.get("written_at", "") < refresh_before:
+                st["written_at"] = now.isoformat(timespec="seconds")
+                to_write.append(st)
+
+        # 실행마다 살아 있는 모든 그룹이 스냅샷 하나로 누적값에 들어간다 (스냅샷 문서를 쓰지 않은 그룹도 —
+        # 매 실행 모든 그룹을 쓰던 때와 avg/count/분위수 의미가 같게). 같은 스냅샷 시각으로 다시 불려도 한 번만 센다
+        now_iso = now.isoformat(timespec="seconds")
+        if state.get("counted_at") != now_iso:
+            for sk, st in groups.items():
+                daily[sk] = daily_add(daily.get(sk), st["min"])
+                daily[sk].update(club=st["club"], hour=st["hour"])
+
+        if to_write:
+            bw = self.store.writer(f"price_history {date}")
+            for st in to_write:
+                bw.set('price_history', *self._snapshot_doc(date, st["club"], st["hour"], st))
+            bw.close()
+        self.store.put_meta(HISTORY_STATE_COLLECTION, date,
+                            {"date": date, "groups": groups, "daily": daily, "counted_at": now_iso})
+        return {"recomputed": len(recomputed), "written": len(to_write), "dropped": len(stale)}
+
+    def flush_daily(self, date: str) -> Tuple[int, int]:
+        """
+        지난 날짜의 누적값을 daily_stats 문서로 쓴다 (하루 마감용, 바뀐 문서만) → (쓴 수, 그대로인 수).
+        오늘 이후 날짜는 아직 누적 중이라 쓰지 않는다
+        """
+        if date >= self.snapshot_time.strftime("%Y-%m-%d"):
+            return 0, 0
+        daily = (self.store.get_meta(HISTORY_STATE_COLLECTION, date) or {}).get("daily") or {}
+        existing = dict(self.store.daily_stats(date))
+        bw = self.store.writer(f"daily_stats {date}")
+        updated = skipped = 0
+        for agg in daily.values():
+            if not agg.get("count") or "club" not in agg:
+                continue
+            doc_id, doc = daily_stats_doc(date, agg["club"], agg["hour"], agg)
+            old = existing.get(doc_id)
+            if old and all(old.get(k) == doc[k] for k in ("min_price", "avg_price", "snapshot_count", "sketch")):
+                skipped += 1
+                continue
+            bw.set('daily_stats', doc_id, doc)
+            updated += 1
+        bw.close()
+        return updated, skipped
+
+    def invalidate(self, date: str):
+        """다음 apply()가 그 날짜 전체를 다시 계산하도록 그룹 상태를 비운다 (이번 집계가 실패했을 때). 누적값은 유지"""
+        daily = (self.store.get_meta(HISTORY_STATE_COLLECTION, date) or {}).get("daily")
+        self.store.put_meta(HISTORY_STATE_COLLECTION, date, {"date": date, "daily": daily} if daily else {"date": date})
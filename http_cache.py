@@ -0,0 +1,62 @@
+# http_cache.py
+# HTTP 캐시 정책: 응답마다 Cache-Control을 고르고, 수집 세대에서 만든 ETag/Last-Modified로 조건부 요청에 304로 답한다.
+# - 지문이 붙은 정적 파일(/assets/<지문>/<파일>)은 1년 immutable, 지문 없는 /static은 짧게 + stale-while-revalidate
+# - API는 수집 작업이 change_feed/head에 올린 세대로 ETag를 만들어, 데이터가 그대로면 본문을 만들지 않고 304
+# - 가격은 구매 판단에 쓰이므로 stale 허용 없이 항상 재검증(no-cache), 구장·날짜 목록은 잠깐의 stale 허용
+import datetime, hashlib, os, threading
+from typing import Callable, Dict, Optional, Tuple
+from flask import g, request
+from werkzeug.http import is_resource_modified
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+STATIC = "public, max-age=300, stale-while-revalidate=86400"
+CLUBS = "public, max-age=3600, stale-while-revalidate=86400"
+DATES = "public, max-age=60, stale-while-revalidate=600"
+REVALIDATE = "no-cache"
+NO_STORE = "no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0"
+
+_fingerprints: Dict[str, Tuple[float, str]] = {}
+_lock = threading.Lock()
+
+def fingerprint(path: str) -> str:
+    """파일 내용 해시 앞 10자 (수정 시각이 바뀔 때만 다시 계산)"""
+    mtime = os.path.getmtime(path)
+    with _lock:
+        hit = _fingerprints.get(path)
+        if hit and hit[0] == mtime:
+            return hit[1]
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:10]
+    with _lock:
+        _fingerprints[path] = (mtime, digest)
+    return digest
+
+def etag_for(*parts) -> str:
+    return hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:16]
+
+def set_policy(cache_control: str):
+    """이 요청의 응답에 쓸 Cache-Control (after_request에서 적용)"""
+    g.cache_policy = cache_control
+
+def policy() -> Optional[str]:
+    return g.get("cache_policy")
+
+def conditional(build: Callable, cache_control: str, etag: Optional[str] = None,
+                last_modified: Optional[datetime.datetime] = None):
+    """
+    GET/HEAD에서 If-None-Match / If-Modified-Since가 맞으면 build()를 부르지 않고 304.
+    검증자가 없으면(etag·last_modified 모두 None) 그냥 build() 결과.
+    """
+    from flask import current_app
+    set_policy(cache_control)
+    validated = etag is not None or last_modified is not None
+    if validated and request.method in ("GET", "HEAD") and not is_resource_modified(
+            request.environ, etag=f'W/"{etag}"' if etag else None, last_modified=last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.make_response(build())
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
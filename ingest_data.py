@@ -1,13 +1,52 @@
 import datetime
+import hashlib
 import os
+import queue
+import threading
+import time
 import firebase_admin
-from firebase_admin import credentials, firestore
-from crawler_utils import crawl_golfpang, crawl_teescan, GOLF_CLUBS
+from firebase_admin import credentials
+from crawler_utils import crawl_golfpang, crawl_golfpang_dates, crawl_teescan, GOLF_CLUBS, GP_SESSION_POOL
+from rate_limiter import limiter_report
+from response_cache import ResponseCache
+from run_journal import RunJournal
+from storage import SERVER_TIMESTAMP, STORAGE_BACKEND, as_storage, open_storage
+from snapshot_archive import SnapshotArchive
+from date_views import VIEW_COLLECTION, publish_view
+from change_feed import ChangeFeed
+from availability import AvailabilityManifest
+from history_aggregator import HistoryAggregator, club_key, doc_group
+from tee_merge import SOURCES, SlotMerger, merge_records, slot_id
+from shadow_index import ShadowIndex
 
 # Configuration
 PROJECT_ID = "golf-ai-480805"
 CRED_PATH = "service-account.json"
 DAYS_TO_CRAWL = 14
+# Harvest all dates from shared Golfpang page sweeps (set to 0 for one sweep per date)
+GPANG_MULTI_DATE = os.environ.get("GPANG_MULTI_DATE", "1") != "0"
+# Date workers. Request pacing is enforced per host by rate_limiter, so this can be raised safely.
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", 6))
+# Reuse parsed records for responses whose body hash is unchanged (data/response_cache)
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "1") != "0"
+# Checkpoint crawl/sync units so a restarted job resumes unfinished work (ingest_journal meta documents in storage)
+INGEST_JOURNAL = os.environ.get("INGEST_JOURNAL", "1") != "0"
+# Diff tee_times against the last-synced state kept in sync_manifest/{date} instead of reading every document
+SHADOW_INDEX = os.environ.get("SHADOW_INDEX", "1") != "0"
+# Append every run's records to the columnar snapshot store (data/snapshots)
+SNAPSHOT_ARCHIVE = os.environ.get("SNAPSHOT_ARCHIVE", "1") != "0"
+# Write price_history snapshots from each date's sync diff (archive_history.py then only aggregates daily_stats)
+INGEST_HISTORY = os.environ.get("INGEST_HISTORY", "1") != "0"
+# Publish one packed read view per date (date_views) so /api/prices needs 1-2 reads per date
+DATE_VIEWS = os.environ.get("DATE_VIEWS", "1") != "0"
+# Publish each date's inserted/repriced/deleted slots to the change feed (change_feed) for downstream consumers
+CHANGE_FEED = os.environ.get("CHANGE_FEED", "1") != "0"
+# Attempts per change-feed publish before the date (and the run) fails
+CHANGE_FEED_ATTEMPTS = int(os.environ.get("CHANGE_FEED_ATTEMPTS", 3))
+# Keep the per-date availability manifest (availability/manifest) read by /api/available_dates
+AVAILABILITY_MANIFEST = os.environ.get("AVAILABILITY_MANIFEST", "1") != "0"
+# Record batches buffered between crawlers and the Firestore writer of a date
+STREAM_QUEUE_SIZE = int(os.environ.get("INGEST_QUEUE_SIZE", 32))
 
 def init_firestore():
     # Use google.cloud.firestore directly to specify database
@@ -24,123 +63,439 @@ def init_firestore():
         credentials, project = google.auth.default()
         return firestore.Client(project=PROJECT_ID, credentials=credentials, database="teetime")
 
+def _tee_time_doc(item):
+    """Crawled (or merged) record → (doc_id, tee_times document without crawled_at)."""
+    doc_id = slot_id(item)
+    new_data = {
+        "club_name": item['golf'],
+        "date": item['date'],
+        "time": item['time'],
+        "hour": item['hour_num'],
+        "price": item['price'],
+        "source": item.get('source', 'Golfpang'),
+        "prices": item.get('prices') or {item.get('source', 'Golfpang'): item['price']},
+        "sources": item.get('sources') or [item.get('source', 'Golfpang')],
+        # "crawled_at": firestore.SERVER_TIMESTAMP, # Don't include in comparison
+        "weekday": datetime.datetime.strptime(item['date'], "%Y-%m-%d").weekday()
+    }
+    return doc_id, new_data
+
+def _tee_time_hash(data):
+    """Content hash of the fields that decide whether a stored tee time must be rewritten (excluding crawled_at)."""
+    # We assume if these fields match, the record is identical.
+    raw = f"{data.get('club_name')}|{data.get('time')}|{data.get('price')}"
+    # Per-source prices only count once a second source lists the slot, so single-source docs keep their hash
+    prices = data.get('prices') or {}
+    if len(prices) > 1:
+        raw += "|" + ",".join(f"{s}:{p}" for s, p in sorted(prices.items()))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+class TeeTimeWriter:
+    """
+    Streaming Firestore sync for one date.
+    Crawlers put() record batches into a bounded queue while a writer thread diffs them against the
+    existing documents and commits upserts through the storage writer as they arrive. close() then deletes
+    documents that no batch contained. abort() stops without deleting anything (partial crawl).
+
+    Records are merged per slot (date, club, time) across sources before the diff, so each tee time is one
+    document with per-source prices. With expected sources, a club's slots are written once every source has
+    reported that club or finished (source_done()), so a slot listed by both sources is written once.
+
+    Batches flagged unchanged (every response matched the response cache) are held back without
+    reading Firestore; if the whole date turns out unchanged, close(skip_if_unchanged=True) skips
+    the sync entirely.
+
+    With a ShadowIndex, the diff runs against the doc_id → hash state of the last sync stored in
+    the date's manifest document, so Firestore is read once instead of per document. A missing or
+    incomplete index falls back to streaming every document of the date.
+    """
+
+    _END, _ABORT = object(), object()
+
+    def __init__(self, db, target_date, queue_size=STREAM_QUEUE_SIZE, shadow=None, sources=()):
+        self.store = as_storage(db)
+        self.target_date = target_date
+        self.shadow = shadow
+        self.sources = tuple(sources)
+        self.stats = {"deletes": 0, "upserts": 0, "skipped": 0, "synced": False, "index": None}
+        # (club_key, hour) groups touched by this sync, for the incremental price_history aggregation.
+        # None means a deleted document could not be mapped to a group, so the whole date must be recomputed.
+        self.changed_groups = set()
+        # slot_id → (kind, price) of every document this sync wrote or deleted, for the change feed
+        self.changes = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name=f"writer-{target_date}", daemon=True)
+        self._error = None
+        self._skip_if_unchanged = False
+        self._index_dropped = False
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def put(self, records, unchanged=False):
+        if self._error is None:
+            self._queue.put((list(records), unchanged))
+
+    def source_done(self, source):
+        """No more records will come from this source."""
+        if self._error is None:
+            self._queue.put((None, source))
+
+    def close(self, skip_if_unchanged=False):
+        self._skip_if_unchanged = skip_if_unchanged
+        self._queue.put(self._END)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.stats
+
+    def abort(self):
+        self._queue.put(self._ABORT)
+        self._thread.join()
+
+    def _load_existing(self):
+        """doc_id → content hash of the date's stored tee times"""
+        if self.shadow is not None:
+            docs = self.shadow.load(self.target_date)
+            if docs is not None:
+                self.stats["index"] = "shadow"
+                return docs
+        print(f"Checking for stale data on {self.target_date}...")
+        self.stats["index"] = "scan"
+        existing = {}
+        for doc_id, data in self.store.tee_times(self.target_date):
+            existing[doc_id] = _tee_time_hash(data)
+        return existing
+
+    def _dirty(self):
+        # The stored index stops describing Firestore as soon as the first write goes out
+        # (a scanned date has no valid index to drop)
+        if self.shadow is not None and not self._index_dropped and self.stats["index"] == "shadow":
+            self.shadow.discard(self.target_date)
+            self._index_dropped = True
+
+    def _save_index(self, existing, wrote):
+        if self.shadow is None:
+            return
+        if not wrote and self.stats["index"] == "shadow":
+            return
+        self.shadow.save(self.target_date, existing)
+
+    def _run(self):
+        merger = SlotMerger(self.sources)
+        existing = None      # loaded at the first changed batch; unchanged batches only merge until then
+        bw = None
+
+        def start():
+            nonlocal existing, bw
+            existing = self._load_existing()
+            bw = self.store.writer(f"tee_times {self.target_date}")
+
+        def write(slots):
+            for doc_id, item in slots:
+                _, new_data = _tee_time_doc(item)
+                digest = _tee_time_hash(new_data)
+                if existing.get(doc_id) == digest:
+                    self.stats["skipped"] += 1
+                    continue
+                kind = "repriced" if doc_id in existing else "inserted"
+                # A slot rewritten within the same sync keeps its first kind
+                self.changes[doc_id] = (self.changes.get(doc_id, (kind,))[0], new_data['price'])
+                existing[doc_id] = digest
+                self._dirty()
+                # Add crawled_at only when writing
+                bw.set('tee_times', doc_id, {**new_data, "crawled_at": SERVER_TIMESTAMP})
+                self.stats["upserts"] += 1
+                if self.changed_groups is not None:
+                    self.changed_groups.add((club_key(item['golf']), new_data['hour']))
+
+        try:
+            while True:
+                msg = self._queue.get()
+                if msg is self._ABORT:
+                    if bw is not None:
+                        bw.close()
+                    print(f"Sync aborted for {self.target_date}. Upserts kept: {self.stats['upserts']}, no deletes applied.")
+                    return
+                if msg is self._END:
+                    break
+                records, unchanged = msg
+                if records is None:
+                    merger.source_done(unchanged)
+                else:
+                    merger.add(records)
+                    if existing is None and not unchanged:
+                        start()
+                if existing is not None:
+                    write(merger.ready())
+
+            if existing is None:
+                if self._skip_if_unchanged:
+                    print(f"[{self.target_date}] Responses unchanged since last run. Skipping sync.")
+                    return
+                start()
+            write(merger.drain())
+
+            # Delete documents that were not in this crawl
+            to_delete = set(existing) - merger.ids
+            print(f"Found {len(to_delete)} stale items to delete.")
+            for doc_id in to_delete:
+                self._dirty()
+                bw.delete('tee_times', doc_id)
+                self.changes[doc_id] = ("deleted", None)
+                group = doc_group(doc_id)
+                if group is None:
+                    self.changed_groups = None
+                elif self.changed_groups is not None:
+                    self.changed_groups.add(group)
+                del existing[doc_id]
+                self.stats["deletes"] += 1
+
+            bw.close()
+            self._save_index(existing, bw.stats["ops"] > 0)
+            self.stats["synced"] = True
+            print(f"Sync complete for {self.target_date}. Total ops: {bw.stats['ops']} (Deletes: {self.stats['deletes']}, Upserts: {self.stats['upserts']}). Skipped: {self.stats['skipped']}")
+        except Exception as e:
+            self._error = e
+            # Keep draining so producers blocked on put() can finish
+            while msg is not self._END and msg is not self._ABORT:
+                msg = self._queue.get()
+
 def save_tee_times(db, tee_times, target_date):
-    # 1. Calculate new IDs
-    new_ids = set()
-    data_map = {}
-    
-    for item in tee_times:
-        club_safe = item['golf'].replace(" ", "").replace("/", "_")
-        doc_id = f"{item['date'].replace('-', '')}_{club_safe}_{item['time'].replace(':', '')}"
-        new_ids.add(doc_id)
-        data_map[doc_id] = item
-
-    # 2. Fetch existing IDs and Data for this date
-    print(f"Checking for stale data on {target_date}...")
-    existing_docs = db.collection('tee_times').where('date', '==', target_date).stream()
-    existing_ids = set()
-    existing_data_map = {}
-    
-    for doc in existing_docs:
-        existing_ids.add(doc.id)
-        existing_data_map[doc.id] = doc.to_dict()
-        
-    # 3. Identify IDs to delete
-    to_delete = existing_ids - new_ids
-    print(f"Found {len(to_delete)} stale items to delete.")
-    
-    # 4. Batch Operations
-    batch = db.batch()
-    count = 0
-    ops_count = 0 # Track actual DB operations
-    
-    # Delete operations
-    for doc_id in to_delete:
-        doc_ref = db.collection('tee_times').document(doc_id)
-        batch.delete(doc_ref)
-        count += 1
-        ops_count += 1
-        if count % 400 == 0:
-            batch.commit()
-            batch = db.batch()
-            print(f"Processed {count} operations (deletes)...")
-
-    # Upsert operations (Only if changed)
-    skipped_count = 0
-    
-    for doc_id, item in data_map.items():
-        doc_ref = db.collection('tee_times').document(doc_id)
-        
-        new_data = {
-            "club_name": item['golf'],
-            "date": item['date'],
-            "time": item['time'],
-            "hour": item['hour_num'],
-            "price": item['price'],
-            "source": item.get('source', 'Golfpang'),
-            # "crawled_at": firestore.SERVER_TIMESTAMP, # Don't include in comparison
-            "weekday": datetime.datetime.strptime(item['date'], "%Y-%m-%d").weekday()
-        }
-        
-        # Check if update is needed
-        needs_update = True
-        if doc_id in existing_data_map:
-            existing = existing_data_map[doc_id]
-            # Compare fields (excluding crawled_at)
-            # We assume if these fields match, the record is identical.
-            if (existing.get('price') == new_data['price'] and
-                existing.get('time') == new_data['time'] and
-                existing.get('club_name') == new_data['club_name']):
-                needs_update = False
-        
-        if needs_update:
-            # Add crawled_at only when writing
-            new_data["crawled_at"] = firestore.SERVER_TIMESTAMP
-            batch.set(doc_ref, new_data)
-            count += 1
-            ops_count += 1
-            if count % 400 == 0:
-                batch.commit()
-                batch = db.batch()
-                print(f"Processed {count} operations (upserts)...")
-        else:
-            skipped_count += 1
-            
-    if count % 400 != 0:
-        batch.commit()
-        
-    print(f"Sync complete for {target_date}. Total ops: {ops_count} (Deletes: {len(to_delete)}, Upserts: {ops_count - len(to_delete)}). Skipped: {skipped_count}")
+    writer = TeeTimeWriter(db, target_date).start()
+    writer.put(tee_times)
+    return writer.close()
+
+def _publish_date_view(store, target_date, merged):
+    # Same documents the writer synced (one per slot)
+    docs = [_tee_time_doc(item)[1] for item in merged]
+    try:
+        if publish_view(store, target_date, docs):
+            print(f"[{target_date}] Date view published ({len(docs)} tee times)")
+    except Exception as e:
+        print(f"[{target_date}] Date view publish failed: {e}")
+        _drop_date_view(store, target_date)
+
+def _drop_date_view(store, target_date):
+    # A stale view would hide this sync from readers, so drop it and let them fall back to tee_times
+    try:
+        store.delete_meta(VIEW_COLLECTION, target_date)
+    except Exception as e:
+        print(f"[{target_date}] Date view delete failed: {e}")
+
+def _invalidate_history(history, target_date, changes):
+    # Upserts committed by a failed sync never reached history_state; without this the next run diffs
+    # against the new tee_times, finds nothing changed and keeps the old group stats
+    if history is None or not changes:
+        return
+    try:
+        history.invalidate(target_date)
+    except Exception as e:
+        print(f"[{target_date}] price_history invalidation failed: {e}")
 
-def process_date(target_date, db):
+def _publish_changes(feed, target_date, changes, partial=False):
     """
-    Crawls data for a single date and saves it to Firestore.
+    Publish the date's changes, retrying with backoff. API caches and ETags are keyed on the feed generation,
+    so a publish that keeps failing is raised instead of swallowed: readers would keep serving the old data.
+    """
+    if feed is None or not changes:
+        return
+    for attempt in range(1, CHANGE_FEED_ATTEMPTS + 1):
+        try:
+            gen = feed.publish(target_date, changes, partial=partial)
+            print(f"[{target_date}] Change feed generation {gen}: {len(changes)} slots")
+            return
+        except Exception as e:
+            print(f"[{target_date}] Change feed publish failed (attempt {attempt}/{CHANGE_FEED_ATTEMPTS}): {e}")
+            if attempt == CHANGE_FEED_ATTEMPTS:
+                raise
+            time.sleep(2 ** (attempt - 1))
+
+class GolfpangFeed:
+    """
+    Hands the shared multi-date Golfpang harvest to the date workers while it runs.
+    crawl_golfpang_dates emits each finished sector; its records are split by date and queued for that
+    date's worker, which forwards them to its writer, so syncing and the Teescan crawl overlap the sweep.
+    """
+
+    def __init__(self, dates):
+        self._queues = {d: queue.Queue() for d in dates}
+
+    def emit(self, records, unchanged):
+        by_date = {}
+        for r in records:
+            by_date.setdefault(r["date"], []).append(r)
+        for d, recs in by_date.items():
+            if d in self._queues:
+                self._queues[d].put((recs, unchanged))
+
+    def finish(self, by_date):
+        """End of the harvest: by_date holds each date's final (sorted) records, None if the harvest failed."""
+        for d, q in self._queues.items():
+            q.put((None, None if by_date is None else by_date.get(d, [])))
+
+    def consume(self, date, put):
+        """Forward the date's batches to put(records, unchanged) until the harvest ends → the date's records."""
+        q = self._queues[date]
+        while True:
+            records, unchanged = q.get()
+            if records is None:
+                if unchanged is None:
+                    raise RuntimeError("Golfpang multi-date harvest failed")
+                return unchanged
+            put(records, unchanged)
+
+def _harvest_golfpang(feed, dates, cache=None, journal=None):
+    crawled = None
+    try:
+        crawled, gp_stats = crawl_golfpang_dates(dates, [], cache=cache, emit=feed.emit)
+        print(f"Golfpang multi-date sweep: {gp_stats['pages']} pages fetched, "
+              f"~{gp_stats['saved_pages_est']} saved vs per-date mode ({gp_stats['saved_sweeps']} sweeps skipped)")
+        if journal is not None and not gp_stats["failed_sectors"]:
+            for d in dates:
+                journal.complete(d, "golfpang", crawled[d])
+    except Exception as e:
+        print(f"Golfpang multi-date sweep failed: {e}")
+    finally:
+        feed.finish(crawled)
+
+def _journaled(journal, date, source):
+    """Records of a crawl unit finished by an interrupted earlier run (None if it must be crawled)."""
+    if journal is None or not journal.done(date, source):
+        return None
+    return journal.records(date, source)
+
+def process_date(target_date, db, data_gp=None, cache=None, journal=None, shadow=None, archive=None, history=None, views=False,
+                 feed=None, availability=None, gp_feed=None):
+    """
+    Crawls data for a single date and streams it into Firestore.
+    Golfpang and Teescan crawl at the same time and emit records per sector / per club into a
+    TeeTimeWriter, which merges same-slot records across sources, diffs and commits while the crawl is still running.
+    If data_gp is given (pre-harvested by crawl_golfpang_dates), Golfpang is not crawled again; with gp_feed, the
+    date's Golfpang records are taken from the shared multi-date harvest as each sector finishes.
+    If every response for the date matched the response cache, the Firestore sync is skipped.
+    With a journal, crawl units finished by an interrupted run are reused and each finished unit is checkpointed.
+    With a shadow index, the writer diffs against the last-synced state instead of reading every document.
+    With a snapshot archive, the crawled records are also appended to the columnar store under data/snapshots.
+    With a history aggregator, price_history snapshots are written for the groups this sync changed.
+    With views, the packed date view read by /api/prices is republished when its content changed.
+    With an availability manifest, the date's tee-time count, per-club counts and min price are updated.
+    With a change feed, the slots this sync inserted, repriced or deleted are published under a new generation,
+    after everything derived from them (history, view, manifest) is written, so readers keyed on the generation
+    never cache the previous derived data under the new one. A publish that still fails after retries is raised.
     Returns the count of items saved (or found).
     """
+    from concurrent.futures import ThreadPoolExecutor
+
     print(f"\n>>> [Start] Crawling for {target_date}...")
+    writer = TeeTimeWriter(db, target_date, shadow=shadow, sources=SOURCES).start()
+
+    def run_golfpang():
+        data = data_gp if data_gp is not None else _journaled(journal, target_date, "golfpang")
+        if data is not None:
+            # Records crawled earlier still count as unchanged when every Golfpang response of the date hit the cache
+            writer.put(data, unchanged=cache is not None and cache.source_unchanged(target_date, "golfpang"))
+        elif gp_feed is not None:
+            data = gp_feed.consume(target_date, writer.put)
+        else:
+            data = crawl_golfpang(target_date, [], cache=cache, emit=writer.put)
+            if journal is not None:
+                journal.complete(target_date, "golfpang", data)
+        writer.source_done("golfpang")
+        return data
+
+    def run_teescan():
+        data = _journaled(journal, target_date, "teescan")
+        if data is not None:
+            writer.put(data)
+        else:
+            data = crawl_teescan(target_date, [], cache=cache, emit=writer.put)
+            if journal is not None:
+                journal.complete(target_date, "teescan", data)
+        writer.source_done("teescan")
+        return data
+
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            fut_gp = executor.submit(run_golfpang)
+            fut_ts = executor.submit(run_teescan)
+            data = fut_gp.result() + fut_ts.result()
+    except Exception as e:
+        print(f"Error processing {target_date}: {e}")
+        writer.abort()
+        _invalidate_history(history, target_date, writer.changes)
+        if writer.changes:
+            _drop_date_view(writer.store, target_date)
+        # Upserts that went out before the abort are real changes too
+        _publish_changes(feed, target_date, writer.changes, partial=True)
+        if cache is not None:
+            cache.invalidate(target_date)
+        return 0
+
+    if archive is not None:
+        try:
+            archive.append(data, key=target_date)
+        except Exception as e:
+            print(f"[{target_date}] Snapshot archive append failed: {e}")
+
+    # One record per slot with per-source prices, same as the tee_times documents the writer syncs
+    merged = merge_records(data)
+
+    history_done = view_done = False
     try:
-        # Crawl Golfpang
-        data_gp = crawl_golfpang(target_date, [])
-        
-        # Crawl Teescan
-        # print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Starting Teescan crawl for {target_date}...")
-        data_ts = crawl_teescan(target_date, [])
-        
-        data = data_gp + data_ts
         if data:
-            print(f"[{target_date}] Found {len(data)} tee times. Syncing...")
-            save_tee_times(db, data, target_date)
-            return len(data)
+            print(f"[{target_date}] Found {len(data)} tee times ({len(merged)} slots). Finishing sync...")
         else:
             print(f"[{target_date}] No data found. Clearing...")
-            save_tee_times(db, [], target_date)
-            return 0
-            
+        writer.close(skip_if_unchanged=cache is not None and cache.unchanged(target_date))
+
+        if history is not None:
+            try:
+                st = history.apply(target_date, merged, writer.changed_groups)
+                print(f"[{target_date}] price_history: {st['written']} snapshots written "
+                      f"({st['recomputed']} groups recomputed, {st['dropped']} dropped)")
+            except Exception as e:
+                print(f"[{target_date}] price_history aggregation failed: {e}")
+                history.invalidate(target_date)
+            history_done = True
+
+        if views:
+            _publish_date_view(writer.store, target_date, merged)
+            view_done = True
+
+        if availability is not None:
+            try:
+                availability.update(target_date, merged)
+            except Exception as e:
+                print(f"[{target_date}] Availability manifest update failed: {e}")
+
     except Exception as e:
         print(f"Error processing {target_date}: {e}")
+        if not history_done:
+            _invalidate_history(history, target_date, writer.changes)
+        if not view_done and writer.changes:
+            _drop_date_view(writer.store, target_date)
+        if not writer.stats["synced"]:
+            _publish_changes(feed, target_date, writer.changes, partial=True)
+        if cache is not None:
+            cache.invalidate(target_date)
         return 0
 
+    # Not caught here: the date stays unsynced in the journal and main reports the run as failed
+    try:
+        _publish_changes(feed, target_date, writer.changes)
+    except Exception:
+        if cache is not None:
+            cache.invalidate(target_date)
+        raise
+
+    if journal is not None:
+        journal.complete(target_date, "sync")
+    return len(merged)
+
 def main():
-    db = init_firestore()
+    db = open_storage(STORAGE_BACKEND, init_firestore)
     if not db:
         return
 
@@ -153,15 +508,44 @@ def main():
         dates_to_crawl.append(d)
         
     print(f"Starting parallel crawl for {len(dates_to_crawl)} days: {dates_to_crawl}")
+
+    cache = ResponseCache() if RESPONSE_CACHE else None
+    journal = RunJournal.open(db, dates_to_crawl) if INGEST_JOURNAL else None
+    shadow = ShadowIndex(db) if SHADOW_INDEX else None
+    history = HistoryAggregator(db) if INGEST_HISTORY else None
+    # A resumed run keeps its run id, so dates archived before the interruption are not appended twice
+    run_id = journal.state.get("run_id") if journal is not None else None
+    archive = SnapshotArchive().begin_run(run_id) if SNAPSHOT_ARCHIVE else None
+    feed = ChangeFeed(db, run_id) if CHANGE_FEED else None
+    availability = AvailabilityManifest(db) if AVAILABILITY_MANIFEST else None
+
+    # Dates already synced by an interrupted run (within the freshness window) are skipped
+    pending_dates = [d for d in dates_to_crawl if journal is None or not journal.done(d, "sync")]
+    if len(pending_dates) < len(dates_to_crawl):
+        print(f"Resuming: {len(dates_to_crawl) - len(pending_dates)} dates already synced, {len(pending_dates)} pending")
+
+    gp_by_date = {}
+    gp_feed = None
+    if GPANG_MULTI_DATE:
+        for d in pending_dates:
+            recs = _journaled(journal, d, "golfpang")
+            if recs is not None:
+                gp_by_date[d] = recs
+        gp_dates = [d for d in pending_dates if d not in gp_by_date]
+        if gp_dates:
+            # One sweep harvests every date; the date workers start right away and receive it sector by sector
+            gp_feed = GolfpangFeed(gp_dates)
+            threading.Thread(target=_harvest_golfpang, args=(gp_feed, gp_dates, cache, journal),
+                             name="golfpang-harvest", daemon=True).start()
     
     # Use ThreadPoolExecutor for parallel processing
-    # Adjust max_workers based on Cloud Run resources and target site limits.
-    # 4 workers is a good starting point for 14 days (approx 3-4 batches).
+    # Target site limits are enforced by the per-host limiter, not by the worker count.
     from concurrent.futures import ThreadPoolExecutor, as_completed
     
     total_items = 0
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        future_to_date = {executor.submit(process_date, date, db): date for date in dates_to_crawl}
+    failed_dates = []
+    with ThreadPoolExecutor(max_workers=INGEST_WORKERS) as executor:
+        future_to_date = {executor.submit(process_date, date, db, gp_by_date.get(date), cache, journal, shadow, archive, history, DATE_VIEWS, feed, availability, gp_feed if date not in gp_by_date else None): date for date in pending_dates}
         
         for future in as_completed(future_to_date):
             date = future_to_date[future]
@@ -171,8 +555,26 @@ def main():
                 print(f">>> [Done] {date} finished. Items: {count}")
             except Exception as e:
                 print(f">>> [Error] {date} failed: {e}")
+                failed_dates.append(date)
 
+    GP_SESSION_POOL.close()
+    if journal is not None:
+        if all(journal.done(d, "sync") for d in dates_to_crawl):
+            journal.finish()
+        else:
+            print("Some dates did not sync; the next run will resume from the journal.")
+    if shadow is not None:
+        shadow.prune(dates_to_crawl)
+    if cache is not None:
+        cache.prune(dates_to_crawl)
+        cache.save()
+    for host, st in limiter_report().items():
+        print(f"[RateLimit] {host}: requests={st['requests']} throttled={st['throttled']} "
+              f"waited={st['waited']:.1f}s rate={st['rate']}/{st['max_rate']} req/s")
     print(f"\nAll crawling tasks completed. Total items processed: {total_items}")
+    if failed_dates:
+        # Exit non-zero so the job run is marked failed (e.g. its changes never reached the change feed)
+        raise SystemExit(f"Failed dates: {sorted(failed_dates)}")
 
 if __name__ == "__main__":
     main()
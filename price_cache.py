@@ -0,0 +1,87 @@
+# price_cache.py
+# /api/prices용 프로세스 내 날짜별 결과 캐시: 날짜마다 (티타임 목록, 기준가 맵)을 들고 있다가
+# 수집 작업이 발행한 세대(change_feed/head)가 바뀐 날짜만 다시 읽는다.
+# - 키: 날짜 (조건을 내려보낸 부분 결과는 (날짜, 선택 조건)), 유효성: (그 날짜의 세대, 7일 전 기준일의 세대) 스탬프가 같을 때만
+# - head는 최대 PRICE_CACHE_HEAD_SEC마다 한 번만 읽음 (요청이 몰려도 head 읽기는 1회)
+# - 피드가 없으면(스탬프 None) PRICE_CACHE_FALLBACK_TTL 동안만 유효, 스탬프가 같아도 PRICE_CACHE_MAX_AGE가 지나면 다시 읽음
+#   (세대 발행이 실패해 스탬프가 멈춰도 오래된 가격을 계속 내보내지 않게)
+# - 보관한 행 수 합계가 PRICE_CACHE_MAX_ROWS를 넘으면 가장 오래 안 쓴 날짜부터 버림 (LRU)
+import os, threading, time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+from change_feed import read_head
+
+PRICE_CACHE_MAX_ROWS = int(os.environ.get("PRICE_CACHE_MAX_ROWS", 200_000))
+PRICE_CACHE_HEAD_SEC = float(os.environ.get("PRICE_CACHE_HEAD_SEC", 5))
+PRICE_CACHE_FALLBACK_TTL = float(os.environ.get("PRICE_CACHE_FALLBACK_TTL", 60))
+PRICE_CACHE_MAX_AGE = float(os.environ.get("PRICE_CACHE_MAX_AGE", 900))
+
+Stamp = Optional[Tuple[int, int]]
+
+class PriceCache:
+    def __init__(self, max_rows: int = PRICE_CACHE_MAX_ROWS, head_sec: float = PRICE_CACHE_HEAD_SEC,
+                 fallback_ttl: float = PRICE_CACHE_FALLBACK_TTL, max_age: float = PRICE_CACHE_MAX_AGE):
+        self.max_rows = max_rows
+        self.head_sec = head_sec
+        self.fallback_ttl = fallback_ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Stamp, float, int, List[Dict], Dict]]" = OrderedDict()
+        self._rows = 0
+        self._head: Optional[Dict] = None
+        self._head_at = 0.0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def head(self, store) -> Dict:
+        """change_feed/head. head_sec 안에서는 마지막으로 읽은 값을 다시 쓴다"""
+        now = time.monotonic()
+        with self._lock:
+            if self._head is not None and now - self._head_at < self.head_sec:
+                return self._head
+        head = read_head(store)
+        with self._lock:
+            self._head, self._head_at = head, now
+        return head
+
+    def generations(self, store) -> Optional[Dict[str, int]]:
+        """{date: 세대} (피드가 없으면 None)"""
+        head = self.head(store)
+        return head["dates"] if head["generation"] else None
+
+    @staticmethod
+    def stamp(generations: Optional[Dict[str, int]], date: str, history_date: str) -> Stamp:
+        if generations is None:
+            return None
+        return generations.get(date, 0), generations.get(history_date, 0)
+
+    def get(self, date, stamp: Stamp) -> Optional[Tuple[List[Dict], Dict]]:
+        with self._lock:
+            entry = self._entries.get(date)
+            if entry is None or entry[0] != stamp or time.monotonic() > entry[1]:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(date)
+            self.stats["hits"] += 1
+            return entry[3], entry[4]
+
+    def put(self, date, stamp: Stamp, docs: List[Dict], history_map: Dict):
+        rows = len(docs) + len(history_map) // 2 + 1
+        if rows > self.max_rows:
+            return
+        expires = time.monotonic() + (self.fallback_ttl if stamp is None else self.max_age)
+        with self._lock:
+            old = self._entries.pop(date, None)
+            if old is not None:
+                self._rows -= old[2]
+            self._entries[date] = (stamp, expires, rows, docs, history_map)
+            self._rows += rows
+            while self._rows > self.max_rows:
+                _, evicted = self._entries.popitem(last=False)
+                self._rows -= evicted[2]
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+            self._head = None
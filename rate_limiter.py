@@ -0,0 +1,154 @@
+# rate_limiter.py
+# 호스트별 전역 요청 제한기: 토큰 버킷(초당 요청 수) + 동시 요청 세마포어 + 429/503 적응형 감속
+import os, threading, time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+# 호스트 접미사 → (초당 요청 수, 최대 동시 요청 수)
+# 골팡은 GPANG_SLEEP(요청 간 평균 간격, 초)을 그대로 사용: 예전 페이지 간 대기와 같은 0.25 → 4 req/s
+HOST_LIMITS = {
+    "golfpang.com": (
+        float(os.environ.get("GPANG_RPS", 1.0 / max(float(os.environ.get("GPANG_SLEEP", 0.25)), 0.001))),
+        int(os.environ.get("GPANG_MAX_INFLIGHT", 8)),
+    ),
+    "teescanner.com": (
+        float(os.environ.get("TEESCAN_RPS", 30)),
+        int(os.environ.get("TEESCAN_MAX_INFLIGHT", 16)),
+    ),
+}
+# 서버가 부하를 알리는 응답: 이때만 속도를 줄인다
+THROTTLE_STATUSES = frozenset((429, 503))
+DEFAULT_LIMIT = (
+    float(os.environ.get("CRAWL_RPS", 20)),
+    int(os.environ.get("CRAWL_MAX_INFLIGHT", 16)),
+)
+
+class HostLimiter:
+    """
+    한 호스트로 나가는 모든 요청이 거치는 제한기 (프로세스 전역, 스레드 안전).
+    - slot(): 동시 요청 수 상한 + 토큰 버킷으로 평균 속도 제한
+    - feedback(): 429/503이면 속도를 절반으로 줄이고 잠시 대기(Retry-After 우선),
+      정상 응답이면 최대 속도까지 조금씩 회복 (AIMD). 시간 초과·연결 오류와 그 밖의 5xx는 속도를 바꾸지 않는다
+      (느린 응답 몇 개로 처리량이 무너지지 않게, 재시도는 LimitedHTTPAdapter가 따로 함)
+    """
+
+    def __init__(self, host: str, rate: float, max_inflight: int, burst: Optional[float] = None):
+        self.host = host
+        self.max_rate = max(float(rate), 0.01)
+        self.rate = self.max_rate
+        self.min_rate = max(self.max_rate / 16, 0.2)
+        self.burst = burst if burst is not None else max(1.0, self.max_rate / 4)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._sem = threading.BoundedSemaphore(max(1, int(max_inflight)))
+        self.stats = {"requests": 0, "throttled": 0, "waited": 0.0}
+
+    def _take_token(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                wait = max(self._blocked_until - now, 0.0)
+                if wait == 0.0:
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        self.stats["requests"] += 1
+                        return
+                    wait = (1.0 - self._tokens) / self.rate
+                self.stats["waited"] += wait
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self):
+        self._sem.acquire()
+        try:
+            self._take_token()
+            yield
+        finally:
+            self._sem.release()
+
+    def feedback(self, status: Optional[int], retry_after: Optional[float] = None):
+        if status is None:
+            return
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                self.stats["throttled"] += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                pause = retry_after if retry_after else 1.0 / self.rate
+                self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+                self._tokens = 0.0
+            elif status < 500 and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+_LIMITERS: Dict[str, HostLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+def _limits_for(host: str):
+    for suffix, limits in HOST_LIMITS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return suffix, limits
+    return host, DEFAULT_LIMIT
+
+def get_limiter(host: str) -> HostLimiter:
+    """호스트(서브도메인 포함)에 해당하는 전역 제한기. www.golfpang.com과 golfpang.com은 같은 제한기를 공유."""
+    key, (rate, inflight) = _limits_for((host or "").lower())
+    with _LIMITERS_LOCK:
+        lim = _LIMITERS.get(key)
+        if lim is None:
+            lim = _LIMITERS[key] = HostLimiter(key, rate, inflight)
+        return lim
+
+def limiter_report() -> Dict[str, Dict]:
+    with _LIMITERS_LOCK:
+        return {k: {**v.stats, "rate": round(v.rate, 2), "max_rate": v.max_rate} for k, v in _LIMITERS.items()}
+
+def _retry_after(resp) -> Optional[float]:
+    try:
+        return float(resp.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+# 제한기가 재시도하는 응답 상태 (urllib3 Retry의 status_forcelist 대신)
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+class LimitedHTTPAdapter(HTTPAdapter):
+    """
+    모든 요청을 대상 호스트의 HostLimiter를 통해 보내는 HTTPAdapter.
+    429/5xx/연결·읽기 오류 재시도도 여기서 한다: 시도마다 토큰을 받고 응답 상태를 feedback()에 알린다
+    (연결·읽기 오류는 감속 없이 재시도만).
+    (urllib3 Retry에 맡기면 한 send 안에서 재시도되어 토큰 없이 나가고, 제한기는 마지막 상태만 본다)
+    """
+
+    def __init__(self, retries: int = 0, backoff_factor: float = 0.0, **kwargs):
+        self.retries = max(0, int(retries))
+        self.backoff_factor = backoff_factor
+        super().__init__(**kwargs)
+
+    def _backoff(self, attempt: int):
+        """urllib3 Retry와 같은 간격: 첫 재시도는 바로, 이후 backoff_factor × 2^(n-1)초"""
+        if self.backoff_factor and attempt > 0:
+            time.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+
+    def send(self, request, **kwargs):
+        limiter = get_limiter(urlparse(request.url).hostname)
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            with limiter.slot():
+                try:
+                    resp = super().send(request, **kwargs)
+                except (RequestsConnectionError, Timeout):
+                    if last:
+                        raise
+                    resp = None
+            if resp is not None:
+                limiter.feedback(resp.status_code, _retry_after(resp))
+                if last or resp.status_code not in RETRY_STATUSES:
+                    return resp
+                resp.close()
+            self._backoff(attempt)
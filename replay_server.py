@@ -0,0 +1,242 @@
+# replay_server.py
+# 골팡/티스캐너 응답 기록·재생용 로컬 대역 HTTP 서버
+# - record: 실제 사이트로 중계하면서 응답을 fixture 파일로 저장
+# - replay: 저장된 fixture만으로 응답 (지연/지터/오류 주입 가능, 네트워크 불필요)
+#
+# 크롤러는 crawler_utils.set_endpoints(server.golfpang_base, server.teescan_base)
+# 또는 환경변수 GPANG_API_BASE / TEESCAN_API_BASE 로 이 서버를 바라보게 한다.
+#
+#   python replay_server.py record fixtures/replay --port 8765
+#   python replay_server.py replay fixtures/replay --port 8765 --latency 80 --jitter 40 --error-rate 0.02
+import argparse, base64, hashlib, json, os, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+UPSTREAMS = {
+    "golfpang": "https://www.golfpang.com",
+    "teescan": "https://foapi.teescanner.com",
+}
+# 중계 시 실제 사이트로 넘기는 요청 헤더
+FORWARD_HEADERS = ("user-agent", "accept", "accept-language", "content-type", "cookie",
+                   "x-requested-with", "x-customer-check")
+
+def fixture_key(method: str, path: str, query: str, body: bytes) -> str:
+    """요청 식별 키: 메서드 + 경로 + 정렬된 쿼리 + 정렬된 폼 본문 (파라미터 순서와 무관)"""
+    q = sorted(parse_qsl(query, keep_blank_values=True))
+    try:
+        b = sorted(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+    except UnicodeDecodeError:
+        b = [("_raw", hashlib.sha1(body).hexdigest())]
+    raw = json.dumps([method.upper(), path, q, b], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+class FixtureStore:
+    """fixture 디렉터리: {key}.json 파일 하나에 요청 요약 + 상태코드 + Content-Type + 본문(base64)"""
+
+    def __init__(self, fixture_dir: str):
+        self.fixture_dir = fixture_dir
+        self._lock = threading.Lock()
+        self._mem: Dict[str, Dict] = {}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.fixture_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            if key in self._mem:
+                return self._mem[key]
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                fx = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._mem[key] = fx
+        return fx
+
+    def put(self, key: str, fx: Dict):
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        with self._lock:
+            self._mem[key] = fx
+            with open(self._path(key), "w", encoding="utf-8") as f:
+                json.dump(fx, f, ensure_ascii=False, indent=1)
+
+class ReplayServer:
+    """
+    ThreadingHTTPServer 기반 대역 서버. 경로 접두사로 사이트를 구분한다:
+      /golfpang/... → www.golfpang.com,  /teescan/... → foapi.teescanner.com
+    - latency_ms / jitter_ms: 응답마다 latency ± jitter(균등분포) 지연
+    - error_rate: 해당 비율만큼 503 응답 주입 (seed로 재현 가능)
+    """
+
+    def __init__(self, fixture_dir: str, mode: str = "replay", host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown mode: {mode}")
+        self.mode = mode
+        self.store = FixtureStore(fixture_dir)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.stats = {"served": 0, "recorded": 0, "missing": 0, "injected_errors": 0}
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    # ── 주소 ──
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def golfpang_base(self) -> str:
+        return f"{self.base_url}/golfpang"
+
+    @property
+    def teescan_base(self) -> str:
+        return f"{self.base_url}/teescan"
+
+    # ── 수명 ──
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ── 처리 ──
+    def _bump(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _delay_and_fault(self) -> bool:
+        with self._rng_lock:
+            delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+            fault = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return fault
+
+    def _forward(self, site: str, method: str, path: str, query: str, body: bytes,
+                 headers: Dict[str, str]) -> Tuple[int, str, bytes, list]:
+        import requests
+        # 세션 없이 요청: 쿠키는 크롤러가 보낸 Cookie 헤더를 그대로 중계 (크롤러 세션별로 분리 유지)
+        url = UPSTREAMS[site] + path + (f"?{query}" if query else "")
+        fwd = {k: v for k, v in headers.items() if k.lower() in FORWARD_HEADERS}
+        fwd["Origin"] = UPSTREAMS[site]
+        fwd["Referer"] = UPSTREAMS[site] + "/web/round/booking_list.do"
+        r = requests.request(method, url, data=body or None, headers=fwd, timeout=(5, 20),
+                             verify=False, allow_redirects=True)
+        # 로컬 주소에서도 쿠키가 유지되도록 Domain/Secure 속성 제거
+        cookies = []
+        for c in r.raw.headers.getlist("Set-Cookie"):
+            parts = [p for p in c.split(";") if p.strip().split("=")[0].lower() not in ("domain", "secure")]
+            cookies.append(";".join(parts))
+        return r.status_code, r.headers.get("Content-Type", ""), r.content, cookies
+
+    def handle(self, method: str, raw_path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, str, bytes, list]:
+        parts = urlsplit(raw_path)
+        site, _, rest = parts.path.lstrip("/").partition("/")
+        if site not in UPSTREAMS:
+            return 404, "text/plain", b"unknown site prefix", []
+        path = "/" + rest
+        key = f"{site}-{fixture_key(method, path, parts.query, body)}"
+
+        if self._delay_and_fault():
+            self._bump("injected_errors")
+            return 503, "text/plain", b"injected error", []
+
+        if self.mode == "record":
+            status, ctype, content, cookies = self._forward(site, method, path, parts.query, body, headers)
+            self.store.put(key, {
+                "site": site, "method": method, "path": path, "query": parts.query,
+                "body": body.decode("utf-8", "replace"),
+                "status": status, "content_type": ctype,
+                "content_b64": base64.b64encode(content).decode("ascii"),
+            })
+            self._bump("recorded")
+            return status, ctype, content, cookies
+
+        fx = self.store.get(key)
+        if fx is None:
+            self._bump("missing")
+            return 404, "text/plain", f"no fixture for {method} {raw_path}".encode("utf-8"), []
+        self._bump("served")
+        return fx["status"], fx.get("content_type", ""), base64.b64decode(fx["content_b64"]), []
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive: 크롤러의 커넥션 재사용을 그대로 측정
+
+            def _serve(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                try:
+                    status, ctype, content, cookies = server.handle(method, self.path, body, dict(self.headers))
+                except Exception as e:
+                    status, ctype, content, cookies = 502, "text/plain", f"upstream error: {e}".encode("utf-8"), []
+                self.send_response(status)
+                if ctype:
+                    self.send_header("Content-Type", ctype)
+                for c in cookies:
+                    self.send_header("Set-Cookie", c)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, fmt, *args):
+                pass
+
+        return Handler
+
+def main():
+    ap = argparse.ArgumentParser(description="Golfpang/Teescan record & replay server")
+    ap.add_argument("mode", choices=["record", "replay"])
+    ap.add_argument("fixture_dir")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="ms added to every response")
+    ap.add_argument("--jitter", type=float, default=0.0, help="± ms uniform jitter")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+
+    server = ReplayServer(args.fixture_dir, args.mode, args.host, args.port,
+                          args.latency, args.jitter, args.error_rate, args.seed)
+    print(f"[Replay] {args.mode} on {server.base_url}")
+    print(f"[Replay]   GPANG_API_BASE={server.golfpang_base}")
+    print(f"[Replay]   TEESCAN_API_BASE={server.teescan_base}")
+    try:
+        server.start()
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"[Replay] stats: {server.stats}")
+
+if __name__ == "__main__":
+    main()
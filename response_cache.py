@@ -0,0 +1,114 @@
+# response_cache.py
+# 응답 본문 해시 캐시: (출처, 날짜, 단위[섹터:페이지 / 구장 seq]) → {digest, records}
+# - 본문 해시가 지난 실행과 같으면 파싱을 건너뛰고 캐시된 레코드를 재사용
+# - 한 날짜를 구성한 모든 단위가 적중하면 그 날짜는 "변경 없음" → Firestore 동기화 생략 가능
+import hashlib, json, os, threading
+from typing import Dict, List, Tuple
+
+base_dir = os.path.dirname(__file__)
+CACHE_DIR = os.environ.get("RESPONSE_CACHE_DIR", os.path.join(base_dir, "data", "response_cache"))
+CACHE_SOURCES = ("golfpang", "teescan")
+
+def body_digest(body) -> str:
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.sha1(body or b"").hexdigest()
+
+class ResponseCache:
+    """
+    출처·날짜별 JSON 파일(data/response_cache/{source}_{date}.json)에 단위별 digest와 레코드를 보관.
+    - get()/put(): 크롤러가 응답마다 호출 (스레드 안전)
+    - mark(): 크롤러가 날짜별로 "이번 실행에서 이 출처는 전부 캐시 적중이었는지" 기록
+    - unchanged(): 모든 출처가 적중한 날짜인지 (source_unchanged(): 출처 하나만)
+    - invalidate(): 동기화에 실패한 날짜의 기여 단위를 버려 다음 실행에서 반드시 다시 동기화되게 함
+    - save(): 이번 실행에서 본 단위만 파일로 기록 (보지 못한 단위는 정리)
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._files: Dict[Tuple[str, str], Dict[str, Dict]] = {}   # (source, date) → {unit: entry}
+        self._fresh: Dict[Tuple[str, str], Dict[str, Dict]] = {}   # 이번 실행에서 본 단위
+        self._marks: Dict[str, Dict[str, bool]] = {}               # date → {source: 전부 적중?}
+        self._contrib: Dict[str, set] = {}                         # date → {(source, unit_date, unit)}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _path(self, source: str, date: str) -> str:
+        return os.path.join(self.cache_dir, f"{source}_{date}.json")
+
+    def _load(self, source: str, date: str) -> Dict[str, Dict]:
+        key = (source, date)
+        entries = self._files.get(key)
+        if entries is None:
+            entries = {}
+            try:
+                with open(self._path(source, date), "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                pass
+            self._files[key] = entries
+        return entries
+
+    def get(self, source: str, date: str, unit: str, digest: str):
+        """digest가 지난 실행과 같으면 저장된 레코드, 아니면 None"""
+        with self._lock:
+            entry = self._load(source, date).get(unit)
+            if entry is not None and entry.get("digest") == digest:
+                self._fresh.setdefault((source, date), {})[unit] = entry
+                self.stats["hits"] += 1
+                return entry["records"]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, source: str, date: str, unit: str, digest: str, records):
+        with self._lock:
+            self._fresh.setdefault((source, date), {})[unit] = {"digest": digest, "records": records}
+
+    def mark(self, date: str, source: str, hit: bool, units: List[Tuple[str, str, str]] = ()):
+        with self._lock:
+            marks = self._marks.setdefault(date, {})
+            marks[source] = marks.get(source, True) and hit
+            self._contrib.setdefault(date, set()).update(units)
+
+    def unchanged(self, date: str) -> bool:
+        with self._lock:
+            marks = self._marks.get(date, {})
+            return all(marks.get(src) is True for src in CACHE_SOURCES)
+
+    def source_unchanged(self, date: str, source: str) -> bool:
+        """이번 실행에서 그 출처의 응답이 날짜에 대해 전부 적중했는지"""
+        with self._lock:
+            return self._marks.get(date, {}).get(source) is True
+
+    def invalidate(self, date: str):
+        with self._lock:
+            for source, unit_date, unit in self._contrib.pop(date, ()):
+                self._fresh.get((source, unit_date), {}).pop(unit, None)
+            self._marks.pop(date, None)
+
+    def save(self):
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for (source, date), entries in self._fresh.items():
+                path = self._path(source, date)
+                tmp = path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp, path)
+            print(f"[Cache] saved {len(self._fresh)} files (hits={self.stats['hits']}, misses={self.stats['misses']})", flush=True)
+
+    def prune(self, keep_dates):
+        """크롤 범위를 벗어난 날짜의 캐시 파일 삭제"""
+        keep = set(keep_dates)
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext != ".json" or "_" not in stem: continue
+            if stem.split("_", 1)[1] not in keep:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,124 @@
+# run_journal.py
+# 수집 작업 체크포인트: 날짜 × 단위(golfpang / teescan / sync) 완료 시각과 크롤 결과를 기록.
+# 작업이 중간에 죽으면 다음 실행은 신선도 창(INGEST_RESUME_WINDOW_MIN) 안에서 끝난 단위를 건너뛰고 나머지만 수행.
+# 창보다 오래전에 시작한 실행은 이어받지 않고 새 실행으로 시작.
+# - 저널과 크롤 결과는 저장소 메타 문서(ingest_journal/...)에 보관 (Cloud Run 작업은 볼륨이 없어 로컬 디스크는 컨테이너와 함께 사라짐)
+# - 크롤 결과는 압축해서 저장, 1 MiB 문서 한도를 넘으면 {date}_{source} 머리 문서 + ~1, ~2 ... 조각으로 나눔
+import base64, datetime, json, os, threading, uuid, zlib
+from typing import Dict, List, Optional
+from storage import SERVER_TIMESTAMP, Storage, as_storage
+
+JOURNAL_COLLECTION = "ingest_journal"
+JOURNAL_KEY = "current"
+RESUME_WINDOW_MIN = float(os.environ.get("INGEST_RESUME_WINDOW_MIN", 60))
+# 조각 하나에 담는 base64 문자 수 (문서 한도 1 MiB에 여유)
+JOURNAL_CHUNK_CHARS = int(os.environ.get("INGEST_JOURNAL_CHUNK_CHARS", 900_000))
+UNITS = ("golfpang", "teescan", "sync")
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now()
+
+def _spool_key(date: str, source: str, i: int = 0) -> str:
+    return f"{date}_{source}" if i == 0 else f"{date}_{source}~{i}"
+
+class RunJournal:
+    """
+    ingest_journal/current              : {"run_id", "started_at", "finished_at", "units": {date: {unit: iso시각}},
+                                           "spool": {"{date}_{source}": 조각 수}}
+    ingest_journal/{date}_{source}(~i)  : 완료된 크롤 단위의 레코드 {"run_id", "chunks", "data"} (재개 시 그대로 재사용)
+    조각은 run_id를 함께 들고 있어, 다른 실행이 남긴 결과는 읽지 않는다.
+    """
+
+    def __init__(self, db, window_minutes: float = RESUME_WINDOW_MIN):
+        self.store: Storage = as_storage(db)
+        self.window = datetime.timedelta(minutes=window_minutes)
+        self._lock = threading.Lock()
+        self.state: Dict = {}
+        self.resumed = False
+
+    @classmethod
+    def open(cls, db, dates: List[str], window_minutes: float = RESUME_WINDOW_MIN) -> "RunJournal":
+        """이전 실행이 끝나지 않았고 시작 시각과 완료 단위가 신선도 창 안이면 이어서, 아니면 새 실행(새 run_id, 스풀 비움)으로 시작"""
+        j = cls(db, window_minutes)
+        prev = j.store.get_meta(JOURNAL_COLLECTION, JOURNAL_KEY)
+
+        if prev and not prev.get("finished_at"):
+            units = {d: u for d, u in (prev.get("units") or {}).items() if d in dates}
+            j.state = {**prev, "units": units, "spool": prev.get("spool") or {}}
+            # 오래된 실행(날짜가 계속 실패해 끝나지 않은 경우 등)은 이어받지 않는다: run_id를 계속 쓰면
+            # 스냅샷 보관소가 같은 (run, 날짜)의 새 스냅샷을 버리고 변경 피드 run id도 틀려진다
+            j.resumed = j._fresh(prev.get("started_at")) and any(j.done(d, u) for d in units for u in UNITS)
+        if j.resumed:
+            pending = [d for d in dates if not all(j.done(d, u) for u in UNITS)]
+            print(f"[Journal] Resuming run {prev.get('run_id')} — {len(dates) - len(pending)}/{len(dates)} dates already complete", flush=True)
+        else:
+            if prev:
+                j._clear_spool(prev.get("spool") or {})
+            j.state = {"run_id": uuid.uuid4().hex[:12], "started_at": _now().isoformat(timespec="seconds"),
+                       "finished_at": None, "units": {}, "spool": {}}
+            j._write()
+        return j
+
+    def _clear_spool(self, spool: Dict[str, int]):
+        for key, chunks in spool.items():
+            for i in range(int(chunks) - 1, -1, -1):
+                try:
+                    self.store.delete_meta(JOURNAL_COLLECTION, key if i == 0 else f"{key}~{i}")
+                except Exception as e:
+                    print(f"[Journal] Spool delete failed for {key}: {e}")
+
+    def _write(self):
+        self.store.put_meta(JOURNAL_COLLECTION, JOURNAL_KEY, {**self.state, "updated_at": SERVER_TIMESTAMP})
+
+    def _fresh(self, ts: Optional[str]) -> bool:
+        if not ts:
+            return False
+        try:
+            return _now() - datetime.datetime.fromisoformat(ts) <= self.window
+        except ValueError:
+            return False
+
+    def done(self, date: str, unit: str) -> bool:
+        """단위가 완료됐고, 완료 시각이 신선도 창 안인지"""
+        with self._lock:
+            ts = self.state.get("units", {}).get(date, {}).get(unit)
+        return self._fresh(ts)
+
+    def records(self, date: str, source: str) -> Optional[List[Dict]]:
+        """이번 실행이 저장한 크롤 결과 — 없거나 조각이 맞지 않으면 None"""
+        run_id = self.state.get("run_id")
+        head = self.store.get_meta(JOURNAL_COLLECTION, _spool_key(date, source))
+        if not head or head.get("run_id") != run_id or not isinstance(head.get("data"), str):
+            return None
+        keys = [_spool_key(date, source, i) for i in range(1, head.get("chunks", 1))]
+        rest = self.store.get_meta_many(JOURNAL_COLLECTION, keys) if keys else []
+        if any(r is None or r.get("run_id") != run_id for r in rest):
+            return None
+        try:
+            return json.loads(zlib.decompress(base64.b64decode("".join([head["data"]] + [r["data"] for r in rest]))))
+        except (ValueError, KeyError, TypeError, zlib.error):
+            return None
+
+    def complete(self, date: str, unit: str, records: Optional[List[Dict]] = None):
+        """단위 완료 기록. 크롤 단위는 레코드도 함께 저장 (레코드 먼저 쓰고 저널 갱신)"""
+        with self._lock:
+            if records is not None:
+                run_id = self.state.get("run_id")
+                raw = json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                packed = base64.b64encode(zlib.compress(raw, 6)).decode("ascii")
+                parts = [packed[i:i + JOURNAL_CHUNK_CHARS] for i in range(0, len(packed), JOURNAL_CHUNK_CHARS)] or [""]
+                # 조각을 먼저 쓰고 머리 문서를 마지막에 써서, 머리가 있으면 조각도 모두 있게 함
+                for i, part in enumerate(parts[1:], start=1):
+                    self.store.put_meta(JOURNAL_COLLECTION, _spool_key(date, unit, i), {"run_id": run_id, "data": part})
+                self.store.put_meta(JOURNAL_COLLECTION, _spool_key(date, unit),
+                                    {"run_id": run_id, "chunks": len(parts), "data": parts[0]})
+                spool = self.state.setdefault("spool", {})
+                spool[_spool_key(date, unit)] = max(len(parts), spool.get(_spool_key(date, unit), 0))
+            self.state.setdefault("units", {}).setdefault(date, {})[unit] = _now().isoformat(timespec="seconds")
+            self._write()
+
+    def finish(self):
+        with self._lock:
+            self._clear_spool(self.state.get("spool") or {})
+            self.state.update(finished_at=_now().isoformat(timespec="seconds"), spool={})
+            self._write()
@@ -0,0 +1,85 @@
+# shadow_index.py
+# 마지막으로 동기화한 tee_times 상태의 그림자 인덱스: 날짜별 {doc_id: 내용 해시}
+# - 저장소의 매니페스트 문서 sync_manifest/{date}에 압축해서 보관 (로컬 디스크 없이 Cloud Run 작업마다 그대로 이어짐)
+# - 인덱스가 있으면 문서 전체를 읽지 않고 인덱스로 diff (매니페스트 읽기 1회, 1 MiB를 넘으면 조각 get_all 1회 추가)
+# - 인덱스가 없거나 조각이 맞지 않으면(이전 쓰기가 중간에 끊김 등) 전체 조회로 대체
+# - 1 MiB 문서 한도를 넘으면 date_views처럼 sync_manifest/{date} 머리 문서 + {date}~1, {date}~2 ... 조각으로 나눔
+import base64, datetime, json, os, uuid, zlib
+from typing import Dict, Iterable, Optional
+from storage import SERVER_TIMESTAMP, Storage, as_storage
+
+MANIFEST_COLLECTION = "sync_manifest"
+MANIFEST_VERSION = 2
+# 조각 하나에 담는 base64 문자 수 (문서 한도 1 MiB에 여유)
+SHADOW_CHUNK_CHARS = int(os.environ.get("SHADOW_CHUNK_CHARS", 900_000))
+# prune()이 지우는 범위: 크롤 범위 첫날 이전 며칠
+SHADOW_PRUNE_DAYS = 7
+
+def new_generation() -> str:
+    return uuid.uuid4().hex[:16]
+
+def _chunk_key(date: str, i: int) -> str:
+    return date if i == 0 else f"{date}~{i}"
+
+def _pack(docs: Dict[str, str]) -> str:
+    raw = json.dumps(docs, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.b64encode(zlib.compress(raw, 6)).decode("ascii")
+
+def _unpack(packed: str) -> Dict[str, str]:
+    return json.loads(zlib.decompress(base64.b64decode(packed)))
+
+class ShadowIndex:
+    """
+    sync_manifest/{date} : {"v", "date", "generation", "count", "chunks", "data": 압축 인덱스(첫 조각)}
+    쓰기를 시작하기 전에 discard()로 머리 문서를 지우고, 쓰기가 모두 끝난 뒤 save()로 새 세대와 함께 다시 기록.
+    그래서 중간에 실패한 동기화는 다음 실행에서 항상 전체 조회로 돌아간다.
+    조각은 머리 문서의 generation을 함께 들고 있어, 머리와 세대가 다른 조각은 쓰지 않는다.
+    """
+
+    def __init__(self, db):
+        self.store: Storage = as_storage(db)
+
+    def load(self, date: str) -> Optional[Dict[str, str]]:
+        """{doc_id: 해시} — 인덱스가 없거나 읽을 수 없으면 None"""
+        head = self.store.get_meta(MANIFEST_COLLECTION, date)
+        if not head or head.get("v") != MANIFEST_VERSION or not isinstance(head.get("data"), str):
+            return None
+        keys = [_chunk_key(date, i) for i in range(1, head.get("chunks", 1))]
+        rest = self.store.get_meta_many(MANIFEST_COLLECTION, keys) if keys else []
+        if any(r is None or r.get("generation") != head.get("generation") for r in rest):
+            return None
+        try:
+            docs = _unpack("".join([head["data"]] + [r["data"] for r in rest]))
+        except (ValueError, KeyError, TypeError, zlib.error):
+            return None
+        return docs if isinstance(docs, dict) else None
+
+    def save(self, date: str, docs: Dict[str, str]) -> str:
+        generation = new_generation()
+        packed = _pack(docs)
+        parts = [packed[i:i + SHADOW_CHUNK_CHARS] for i in range(0, len(packed), SHADOW_CHUNK_CHARS)] or [""]
+        # 조각을 먼저 쓰고 머리 문서를 마지막에 써서, 머리가 있으면 조각도 모두 있게 함
+        for i, part in enumerate(parts[1:], start=1):
+            self.store.put_meta(MANIFEST_COLLECTION, _chunk_key(date, i), {"date": date, "generation": generation, "data": part})
+        self.store.put_meta(MANIFEST_COLLECTION, date, {
+            "v": MANIFEST_VERSION, "date": date, "generation": generation, "count": len(docs),
+            "chunks": len(parts), "data": parts[0], "updated_at": SERVER_TIMESTAMP,
+        })
+        return generation
+
+    def discard(self, date: str):
+        # 남은 조각은 다음 save()가 덮어쓰고, 머리 없이 읽히지 않는다
+        self.store.delete_meta(MANIFEST_COLLECTION, date)
+
+    def prune(self, keep_dates: Iterable[str]):
+        """크롤 범위 첫날 이전 SHADOW_PRUNE_DAYS일의 인덱스(머리 + 조각) 삭제"""
+        keep = sorted(keep_dates)
+        if not keep:
+            return
+        first = datetime.datetime.strptime(keep[0], "%Y-%m-%d")
+        old = [(first - datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(1, SHADOW_PRUNE_DAYS + 1)]
+        for date, head in zip(old, self.store.get_meta_many(MANIFEST_COLLECTION, old)):
+            if head is None:
+                continue
+            for i in range(head.get("chunks", 1) - 1, -1, -1):
+                self.store.delete_meta(MANIFEST_COLLECTION, _chunk_key(date, i))
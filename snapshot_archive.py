@@ -0,0 +1,195 @@
+# snapshot_archive.py
+# 크롤 결과 열(column) 저장소: 수집 실행마다 레코드를 data/snapshots/ 아래 월별 파티션에 이어 붙인다.
+# - 열마다 고정 폭 원시 바이너리 파일 → np.memmap으로 파싱 없이 바로 배열로 읽음
+# - 구장·출처는 사전 인코딩(dict.json의 목록 위치), 날짜는 1970-01-01 기준 일 번호
+# - index.json에 커밋된 행 범위만 기록: 쓰다가 죽은 꼬리 바이트는 읽을 때 무시되고 다음 append에서 잘라냄
+#
+#   from snapshot_archive import SnapshotArchive
+#   cols = SnapshotArchive().scan("2026-09", "2026-10")   # {"day", "hour", "minute", "price", "club", "source", "snap"}
+import datetime, json, os, threading, uuid
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+base_dir = os.path.dirname(__file__)
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(base_dir, "data", "snapshots"))
+
+# 열 이름 → dtype (리틀 엔디언 고정)
+COLUMNS = {
+    "day": np.dtype("<i4"),      # 티타임 날짜, 1970-01-01부터의 일 수
+    "hour": np.dtype("u1"),
+    "minute": np.dtype("u1"),
+    "price": np.dtype("<i4"),
+    "club": np.dtype("<u2"),     # dict.json "club" 목록 위치
+    "source": np.dtype("u1"),    # dict.json "source" 목록 위치
+    "snap": np.dtype("<i4"),     # 스냅샷(수집) 시각, 1970-01-01 00:00부터의 분 수
+}
+_EPOCH = datetime.date(1970, 1, 1)
+_EPOCH_DT = datetime.datetime(1970, 1, 1)
+
+def day_number(date_str: str) -> int:
+    return (datetime.date.fromisoformat(date_str) - _EPOCH).days
+
+def day_to_date(n: int) -> str:
+    return (_EPOCH + datetime.timedelta(days=int(n))).isoformat()
+
+def snap_minutes(ts: datetime.datetime) -> int:
+    return int((ts.replace(tzinfo=None) - _EPOCH_DT).total_seconds() // 60)
+
+def minutes_to_datetime(n: int) -> datetime.datetime:
+    return _EPOCH_DT + datetime.timedelta(minutes=int(n))
+
+def _hour(r: Dict) -> int:
+    h = r.get("hour_num")
+    return int(h) if h is not None and h >= 0 else int(str(r.get("time", "0"))[:2] or 0)
+
+def _minute(t: str) -> int:
+    """'08:12' → 12, 분이 없는 표기('8시')는 0"""
+    m = t.split(":", 1)[1][:2] if ":" in t else ""
+    return int(m) if m.isdigit() else 0
+
+def _write_json(path: str, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def _read_json(path: str, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+class SnapshotArchive:
+    """
+    data/snapshots/dict.json            : {"club": [...], "source": [...]}
+    data/snapshots/{YYYY-MM}/{col}.bin  : 열 파일 (COLUMNS의 dtype, 행 순서 = append 순서)
+    data/snapshots/{YYYY-MM}/index.json : {"rows": 커밋된 행 수, "runs": [{"run", "key", "snapshot_at", "start", "rows"}]}
+    append()는 (run, key)마다 한 번만 기록된다 (재개된 실행이 같은 날짜를 다시 넣지 않도록).
+    """
+
+    def __init__(self, root: str = SNAPSHOT_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._dict: Optional[Dict[str, List[str]]] = None
+        self.run_id: Optional[str] = None
+        self.snapshot_at: Optional[datetime.datetime] = None
+
+    def begin_run(self, run: Optional[str] = None, snapshot_at: Optional[datetime.datetime] = None) -> "SnapshotArchive":
+        """이후 append()의 기본 실행 ID·스냅샷 시각 (한 수집 실행의 모든 날짜가 같은 스냅샷으로 묶임)"""
+        self.run_id = run or uuid.uuid4().hex[:12]
+        self.snapshot_at = snapshot_at or datetime.datetime.now()
+        return self
+
+    # ── 사전 ──
+    def _dict_path(self) -> str:
+        return os.path.join(self.root, "dict.json")
+
+    def dictionary(self) -> Dict[str, List[str]]:
+        if self._dict is None:
+            d = _read_json(self._dict_path(), {})
+            self._dict = {"club": list(d.get("club", [])), "source": list(d.get("source", []))}
+        return self._dict
+
+    def _codes(self, kind: str, values: Iterable[str]) -> bool:
+        """없는 값을 사전 끝에 추가. 추가했으면 True"""
+        table = self.dictionary()[kind]
+        known = set(table)
+        added = False
+        for v in values:
+            if v not in known:
+                table.append(v)
+                known.add(v)
+                added = True
+        limit = np.iinfo(COLUMNS[kind]).max + 1
+        if len(table) > limit:
+            raise ValueError(f"too many distinct {kind} values for {COLUMNS[kind]} ({len(table)})")
+        return added
+
+    # ── 쓰기 ──
+    def _part_dir(self, month: str) -> str:
+        return os.path.join(self.root, month)
+
+    def append(self, records: List[Dict], snapshot_at: Optional[datetime.datetime] = None,
+               run: Optional[str] = None, key: str = "") -> int:
+        """크롤 레코드(golf, date, time, price, source)를 스냅샷 하나로 추가. 추가한 행 수를 돌려준다."""
+        snapshot_at = snapshot_at or self.snapshot_at or datetime.datetime.now()
+        run = run or self.run_id or uuid.uuid4().hex[:12]
+        month = snapshot_at.strftime("%Y-%m")
+        rows = [r for r in records if r.get("price")]
+
+        with self._lock:
+            part = self._part_dir(month)
+            index_path = os.path.join(part, "index.json")
+            index = _read_json(index_path, {"rows": 0, "runs": []})
+            if any(e["run"] == run and e["key"] == key for e in index["runs"]):
+                return 0
+
+            if self._codes("club", (r["golf"] for r in rows)) | self._codes("source", (r.get("source", "Golfpang") for r in rows)):
+                os.makedirs(self.root, exist_ok=True)
+                _write_json(self._dict_path(), self.dictionary())
+            club_code = {v: i for i, v in enumerate(self._dict["club"])}
+            source_code = {v: i for i, v in enumerate(self._dict["source"])}
+
+            n = len(rows)
+            cols = {
+                "day": np.fromiter((day_number(r["date"]) for r in rows), COLUMNS["day"], n),
+                "hour": np.fromiter((_hour(r) for r in rows), COLUMNS["hour"], n),
+                "minute": np.fromiter((_minute(r.get("time", "")) for r in rows), COLUMNS["minute"], n),
+                "price": np.fromiter((int(r["price"]) for r in rows), COLUMNS["price"], n),
+                "club": np.fromiter((club_code[r["golf"]] for r in rows), COLUMNS["club"], n),
+                "source": np.fromiter((source_code[r.get("source", "Golfpang")] for r in rows), COLUMNS["source"], n),
+                "snap": np.full(n, snap_minutes(snapshot_at), COLUMNS["snap"]),
+            }
+
+            os.makedirs(part, exist_ok=True)
+            start = index["rows"]
+            for name, dtype in COLUMNS.items():
+                path = os.path.join(part, f"{name}.bin")
+                with open(path, "ab") as f:
+                    # 이전에 커밋되지 못한 꼬리를 잘라낸 뒤 이어 쓰기
+                    f.truncate(start * dtype.itemsize)
+                    f.write(cols[name].tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            index["runs"].append({"run": run, "key": key, "snapshot_at": snapshot_at.isoformat(timespec="seconds"),
+                                  "start": start, "rows": n})
+            index["rows"] = start + n
+            _write_json(index_path, index)
+            return n
+
+    # ── 읽기 ──
+    def months(self) -> List[str]:
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        return sorted(n for n in names if os.path.isfile(os.path.join(self.root, n, "index.json")))
+
+    def runs(self, month: str) -> List[Dict]:
+        return _read_json(os.path.join(self._part_dir(month), "index.json"), {"runs": []})["runs"]
+
+    def load(self, month: str) -> Dict[str, np.ndarray]:
+        """한 파티션의 커밋된 행을 읽기 전용 memmap 배열로 (복사 없음)"""
+        part = self._part_dir(month)
+        rows = _read_json(os.path.join(part, "index.json"), {"rows": 0})["rows"]
+        out = {}
+        for name, dtype in COLUMNS.items():
+            if rows == 0:
+                out[name] = np.empty(0, dtype)
+            else:
+                out[name] = np.memmap(os.path.join(part, f"{name}.bin"), dtype=dtype, mode="r", shape=(rows,))
+        return out
+
+    def scan(self, start_month: Optional[str] = None, end_month: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """[start_month, end_month] 범위 파티션의 열을 이어 붙여 돌려준다 (파티션 하나면 memmap 그대로)"""
+        parts = [self.load(m) for m in self.months()
+                 if (start_month is None or m >= start_month) and (end_month is None or m <= end_month)]
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([p[name] for p in parts]) if parts else np.empty(0, dtype)
+                for name, dtype in COLUMNS.items()}
+
+    def decode(self, kind: str, codes: np.ndarray) -> List[str]:
+        table = self.dictionary()[kind]
+        return [table[c] for c in codes.tolist()]
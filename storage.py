@@ -0,0 +1,419 @@
+# storage.py
+# 저장소 인터페이스: 웹(app), 수집(ingest_data), 보관(archive_history)이 Firestore를 직접 부르지 않고 이 계층을 거친다.
+# - FirestoreStorage: 운영용 (google.cloud.firestore.Client, database="teetime")
+# - SQLiteStorage  : 내장 SQLite (WAL, date/club/hour 인덱스) — GCP 없이 로컬 실행·부하 테스트, 웹용 읽기 복제본
+#
+#   STORAGE_BACKEND=sqlite SQLITE_PATH=data/teetime.db python app.py
+import abc, datetime, json, os, re, sqlite3, threading, time
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+base_dir = os.path.dirname(__file__)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "firestore").lower()
+SQLITE_PATH = os.environ.get("SQLITE_PATH", os.path.join(base_dir, "data", "teetime.db"))
+SQLITE_BATCH_OPS = int(os.environ.get("SQLITE_BATCH_OPS", 2000))
+# Firestore 'in' 필터 하나에 넣는 값 수 (서버 한도 30)
+FIRESTORE_IN_LIMIT = int(os.environ.get("FIRESTORE_IN_LIMIT", 30))
+
+Doc = Tuple[str, Dict]
+
+class _ServerTimestamp:
+    """쓰기 시점의 서버 시각으로 바뀌는 값 (Firestore SERVER_TIMESTAMP / SQLite 현재 시각)"""
+
+    def __repr__(self):
+        return "SERVER_TIMESTAMP"
+
+SERVER_TIMESTAMP = _ServerTimestamp()
+
+class Storage(abc.ABC):
+    """
+    문서 단위 저장소. 문서는 (doc_id, dict)로 주고받는다.
+    읽기: tee_times(date), tee_times_range(start, end), has_tee_times(date), daily_stats(date), daily_stats_range(start, end),
+          price_history(date), find(collection, date, clubs, hours, fields) — 구장·시간대 조건과 필드 투영을 저장소로 내려보냄
+    쓰기: writer(label) → set/delete를 모아 한 번에 반영하고 close()에서 통계를 돌려줌
+    메타: get_meta/get_meta_many/put_meta/delete_meta — 매니페스트·날짜 뷰 같은 키로 찾는 단일 문서
+          next_sequence — 메타 문서 하나를 원자적으로 1 올린 값 (변경 피드 세대 번호)
+    """
+
+    def tee_times(self, date: str) -> Iterator[Doc]:
+        return self._where("tee_times", date)
+
+    @abc.abstractmethod
+    def tee_times_range(self, start: str, end: Optional[str] = None) -> Iterator[Doc]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def has_tee_times(self, date: str) -> bool:
+        raise NotImplementedError
+
+    def daily_stats(self, date: str) -> Iterator[Doc]:
+        return self._where("daily_stats", date)
+
+    def daily_stats_range(self, start: str, end: str) -> Iterator[Doc]:
+        return self._range("daily_stats", start, end)
+
+    def price_history(self, date: str) -> Iterator[Doc]:
+        return self._where("price_history", date)
+
+    @abc.abstractmethod
+    def _where(self, collection: str, date: str) -> Iterator[Doc]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def find(self, collection: str, date: str, clubs: Optional[Iterable[str]] = None,
+             hours: Optional[Iterable[int]] = None, fields: Optional[Iterable[str]] = None) -> Iterator[Doc]:
+        """
+        그 날짜 문서 중 club_name이 clubs, hour가 hours에 드는 것만 (None이면 조건 없음).
+        저장소가 서버에서 거르지 못한 조건은 여기서 거르므로 결과는 항상 조건에 맞는다.
+        fields가 있으면 그 필드만 전송 (없는 필드는 빠짐).
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _range(self, collection: str, start: str, end: Optional[str]) -> Iterator[Doc]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_meta(self, collection: str, key: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_meta_many(self, collection: str, keys) -> list:
+        """여러 메타 문서를 한 번에 (없는 키는 None, keys 순서 유지)"""
+        return [self.get_meta(collection, k) for k in keys]
+
+    @abc.abstractmethod
+    def put_meta(self, collection: str, key: str, data: Dict):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete_meta(self, collection: str, key: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def next_sequence(self, collection: str, key: str) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def writer(self, label: str = "bulk"):
+        raise NotImplementedError
+
+# ── Firestore ──
+
+def _fs_values(data: Dict) -> Dict:
+    from google.cloud import firestore
+    return {k: (firestore.SERVER_TIMESTAMP if v is SERVER_TIMESTAMP else v) for k, v in data.items()}
+
+class _FirestoreWriter:
+    def __init__(self, db, label: str):
+        from bulk_writer import BulkWriter
+        self.db = db
+        self._bw = BulkWriter(db, label)
+
+    @property
+    def stats(self) -> Dict:
+        return self._bw.stats
+
+    def set(self, collection: str, doc_id: str, data: Dict, merge: bool = False):
+        self._bw.set(self.db.collection(collection).document(doc_id), _fs_values(data), merge=merge)
+
+    def delete(self, collection: str, doc_id: str):
+        self._bw.delete(self.db.collection(collection).document(doc_id))
+
+    def close(self) -> Dict:
+        return self._bw.close()
+
+class FirestoreStorage(Storage):
+    def __init__(self, db):
+        self.db = db
+
+    def _where(self, collection, date):
+        for doc in self.db.collection(collection).where('date', '==', date).stream():
+            yield doc.id, doc.to_dict()
+
+    def tee_times_range(self, start, end=None):
+        return self._range('tee_times', start, end)
+
+    def find(self, collection, date, clubs=None, hours=None, fields=None):
+        # date == + club_name in + hour == 는 모두 등호 조건이라 단일 필드 인덱스 병합으로 처리됨 (복합 인덱스 불필요).
+        # hour는 값이 하나일 때만 내려보낸다: 'in'을 구장과 함께 두 번 쓰면 분리 조건 수 한도(30)에 금방 걸림
+        hours = None if hours is None else set(hours)
+        base = self.db.collection(collection).where('date', '==', date)
+        if hours is not None and len(hours) == 1:
+            base = base.where('hour', '==', next(iter(hours)))
+        chunks = [None]
+        if clubs is not None:
+            names = sorted(set(clubs))
+            chunks = [names[i:i + FIRESTORE_IN_LIMIT] for i in range(0, len(names), FIRESTORE_IN_LIMIT)]
+        for chunk in chunks:
+            q = base if chunk is None else base.where('club_name', 'in', chunk)
+            if fields is not None:
+                q = q.select(list(fields))
+            for doc in q.stream():
+                data = doc.to_dict()
+                if hours is not None and len(hours) > 1 and data.get('hour') not in hours:
+                    continue
+                yield doc.id, data
+
+    def _range(self, collection, start, end):
+        q = self.db.collection(collection).where('date', '>=', start)
+        if end is not None:
+            q = q.where('date', '<=', end)
+        for doc in q.stream():
+            yield doc.id, doc.to_dict()
+
+    def has_tee_times(self, date):
+        # Limit 1 is enough to know if data exists
+        return any(self.db.collection('tee_times').where('date', '==', date).limit(1).stream())
+
+    def get_meta(self, collection, key):
+        snap = self.db.collection(collection).document(key).get()
+        return (snap.to_dict() or {}) if snap.exists else None
+
+    def get_meta_many(self, collection, keys):
+        # get_all: 문서 여러 개를 한 번의 왕복으로
+        refs = [self.db.collection(collection).document(k) for k in keys]
+        found = {snap.id: snap.to_dict() or {} for snap in self.db.get_all(refs) if snap.exists}
+        return [found.get(k) for k in keys]
+
+    def put_meta(self, collection, key, data):
+        self.db.collection(collection).document(key).set(_fs_values(data))
+
+    def delete_meta(self, collection, key):
+        self.db.collection(collection).document(key).delete()
+
+    def next_sequence(self, collection, key):
+        from google.cloud import firestore
+        ref = self.db.collection(collection).document(key)
+
+        @firestore.transactional
+        def bump(tx):
+            snap = ref.get(transaction=tx)
+            value = ((snap.to_dict() or {}).get("value") or 0) + 1 if snap.exists else 1
+            tx.set(ref, {"value": value, "updated_at": firestore.SERVER_TIMESTAMP})
+            return value
+
+        return bump(self.db.transaction())
+
+    def writer(self, label="bulk"):
+        return _FirestoreWriter(self.db, label)
+
+# ── SQLite ──
+
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def _json_default(v):
+    if isinstance(v, (datetime.datetime, datetime.date)):
+        return v.isoformat()
+    raise TypeError(f"not JSON serializable: {type(v).__name__}")
+
+def _sqlite_values(data: Dict) -> Dict:
+    now = None
+    out = {}
+    for k, v in data.items():
+        if v is SERVER_TIMESTAMP:
+            now = now or datetime.datetime.now(datetime.timezone.utc)
+            v = now
+        out[k] = v
+    return out
+
+class _SQLiteWriter:
+    """작업을 모아 SQLITE_BATCH_OPS마다 한 트랜잭션으로 반영 (BulkWriter와 같은 stats/report)"""
+
+    def __init__(self, store: "SQLiteStorage", label: str, max_ops: int = SQLITE_BATCH_OPS):
+        self.store = store
+        self.label = label
+        self.max_ops = max_ops
+        self._ops = []
+        self._started = time.monotonic()
+        self.stats = {"ops": 0, "commits": 0, "retries": 0, "seconds": 0.0}
+
+    def set(self, collection, doc_id, data, merge=False):
+        self._ops.append(("set", collection, doc_id, _sqlite_values(data), merge))
+        if len(self._ops) >= self.max_ops:
+            self.flush()
+
+    def delete(self, collection, doc_id):
+        self._ops.append(("delete", collection, doc_id, None, False))
+        if len(self._ops) >= self.max_ops:
+            self.flush()
+
+    def flush(self):
+        if not self._ops:
+            return
+        ops, self._ops = self._ops, []
+        self.store._apply(ops)
+        self.stats["ops"] += len(ops)
+        self.stats["commits"] += 1
+
+    def close(self) -> Dict:
+        self.flush()
+        self.stats["seconds"] = time.monotonic() - self._started
+        if self.stats["ops"]:
+            rate = self.stats["ops"] / self.stats["seconds"] if self.stats["seconds"] > 0 else 0.0
+            print(f"[SQLite] {self.label}: {self.stats['ops']} ops in {self.stats['commits']} commits "
+                  f"{self.stats['seconds']:.2f}s → {rate:.0f} ops/s", flush=True)
+        return self.stats
+
+class SQLiteStorage(Storage):
+    """
+    컬렉션마다 테이블 하나: (doc_id PK, date, club_name, hour, data JSON) + (date, club_name, hour) 인덱스.
+    WAL 모드라 웹 요청(읽기)과 수집(쓰기)이 서로 막지 않는다. 연결은 스레드별, 쓰기는 잠금으로 직렬화.
+    """
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._tables = set()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (collection TEXT, key TEXT, data TEXT, PRIMARY KEY (collection, key))")
+        for name in ("tee_times", "daily_stats", "price_history"):
+            self._table(name)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _table(self, name: str) -> str:
+        if name in self._tables:
+            return name
+        if not _NAME_RE.match(name):
+            raise ValueError(f"invalid collection name: {name!r}")
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (doc_id TEXT PRIMARY KEY, date TEXT, "
+                         f"club_name TEXT, hour INTEGER, data TEXT NOT NULL)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_date_club_hour ON {name} (date, club_name, hour)")
+            self._tables.add(name)
+        return name
+
+    def _rows(self, sql: str, args=()) -> Iterator[Doc]:
+        for doc_id, data in self._conn().execute(sql, args).fetchall():
+            yield doc_id, json.loads(data)
+
+    def _where(self, collection, date):
+        return self._rows(f"SELECT doc_id, data FROM {self._table(collection)} WHERE date = ?", (date,))
+
+    def tee_times_range(self, start, end=None):
+        return self._range("tee_times", start, end)
+
+    def find(self, collection, date, clubs=None, hours=None, fields=None):
+        # (date, club_name, hour) 인덱스를 그대로 탄다
+        sql = f"SELECT doc_id, data FROM {self._table(collection)} WHERE date = ?"
+        args = [date]
+        for column, values in (("club_name", clubs), ("hour", hours)):
+            if values is not None:
+                values = sorted(set(values))
+                sql += f" AND {column} IN ({','.join('?' * len(values))})"
+                args += values
+        keep = None if fields is None else set(fields)
+        for doc_id, data in self._rows(sql, args):
+            yield doc_id, data if keep is None else {k: v for k, v in data.items() if k in keep}
+
+    def _range(self, collection, start, end):
+        table = self._table(collection)
+        if end is None:
+            return self._rows(f"SELECT doc_id, data FROM {table} WHERE date >= ?", (start,))
+        return self._rows(f"SELECT doc_id, data FROM {table} WHERE date >= ? AND date <= ?", (start, end))
+
+    def has_tee_times(self, date):
+        return self._conn().execute("SELECT 1 FROM tee_times WHERE date = ? LIMIT 1", (date,)).fetchone() is not None
+
+    def get_meta(self, collection, key):
+        row = self._conn().execute("SELECT data FROM meta WHERE collection = ? AND key = ?", (collection, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_meta(self, collection, key, data):
+        raw = json.dumps(_sqlite_values(data), ensure_ascii=False, default=_json_default)
+        with self._write_lock:
+            self._conn().execute("INSERT OR REPLACE INTO meta (collection, key, data) VALUES (?, ?, ?)", (collection, key, raw))
+
+    def get_meta_many(self, collection, keys):
+        keys = list(keys)
+        if not keys:
+            return []
+        marks = ",".join("?" * len(keys))
+        rows = self._conn().execute(f"SELECT key, data FROM meta WHERE collection = ? AND key IN ({marks})",
+                                    (collection, *keys)).fetchall()
+        found = {k: json.loads(d) for k, d in rows}
+        return [found.get(k) for k in keys]
+
+    def delete_meta(self, collection, key):
+        with self._write_lock:
+            self._conn().execute("DELETE FROM meta WHERE collection = ? AND key = ?", (collection, key))
+
+    def next_sequence(self, collection, key):
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT data FROM meta WHERE collection = ? AND key = ?", (collection, key)).fetchone()
+                value = (json.loads(row[0]).get("value") or 0) + 1 if row else 1
+                raw = json.dumps(_sqlite_values({"value": value, "updated_at": SERVER_TIMESTAMP}), default=_json_default)
+                conn.execute("INSERT OR REPLACE INTO meta (collection, key, data) VALUES (?, ?, ?)", (collection, key, raw))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def writer(self, label="bulk"):
+        return _SQLiteWriter(self, label)
+
+    def _apply(self, ops):
+        tables = {op[1]: self._table(op[1]) for op in ops}
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for kind, collection, doc_id, data, merge in ops:
+                    table = tables[collection]
+                    if kind == "delete":
+                        conn.execute(f"DELETE FROM {table} WHERE doc_id = ?", (doc_id,))
+                        continue
+                    if merge:
+                        row = conn.execute(f"SELECT data FROM {table} WHERE doc_id = ?", (doc_id,)).fetchone()
+                        if row:
+                            data = {**json.loads(row[0]), **data}
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO {table} (doc_id, date, club_name, hour, data) VALUES (?, ?, ?, ?, ?)",
+                        (doc_id, data.get("date"), data.get("club_name"), data.get("hour"),
+                         json.dumps(data, ensure_ascii=False, default=_json_default)))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+# ── 선택 ──
+
+_SQLITE_STORES: Dict[str, SQLiteStorage] = {}
+_SQLITE_LOCK = threading.Lock()
+
+def as_storage(db) -> Storage:
+    """Storage는 그대로, Firestore Client(또는 그 대역)는 FirestoreStorage로 감싼다"""
+    return db if isinstance(db, Storage) else FirestoreStorage(db)
+
+def open_storage(backend: Optional[str] = None, client_factory: Optional[Callable] = None) -> Storage:
+    """
+    backend: "firestore" | "sqlite" (기본값 STORAGE_BACKEND 환경변수)
+    client_factory: Firestore Client를 만드는 함수 (firestore일 때만 호출)
+    """
+    backend = (backend or STORAGE_BACKEND).lower()
+    if backend == "sqlite":
+        path = SQLITE_PATH
+        with _SQLITE_LOCK:
+            store = _SQLITE_STORES.get(path)
+            if store is None:
+                store = _SQLITE_STORES[path] = SQLiteStorage(path)
+            return store
+    if backend == "firestore":
+        if client_factory is None:
+            raise ValueError("firestore backend needs a client_factory")
+        return FirestoreStorage(client_factory())
+    raise ValueError(f"unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,105 @@
+# tee_merge.py
+# 출처 간 티타임 병합: 같은 슬롯(날짜, 구장, 시각)의 레코드를 출처별 가격을 담은 레코드 하나로 합친다.
+# - price / source : 전체 최저가와 그 출처 (기존 필드 그대로라 읽는 쪽은 바꿀 필요 없음)
+# - prices         : {출처: 그 출처의 최저가}  — 골프팡처럼 한 슬롯에 여러 가격을 올리면 최저가만 남김
+# - sources        : 슬롯을 올린 출처 목록 (정렬)
+# 문서 ID가 슬롯 단위라 출처끼리 서로 덮어쓰던 문제가 사라지고, 쓰기 전에 중복이 제거된다.
+#
+# SlotMerger는 스트리밍 동기화용: 배치가 들어올 때마다 병합하고, 기대 출처가 모두 그 구장을 보고했거나
+# 끝난 슬롯만 내보낸다 (한 출처의 배치는 구장 단위로 완결 — 팀스캔은 구장별, 골프팡은 섹터별).
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from history_aggregator import club_key
+
+# 수집기가 레코드에 붙이는 출처 이름
+SOURCES = ("golfpang", "teescan")
+
+def normalize_time(t: str) -> str:
+    """'7:05' → '07:05' (출처마다 다른 표기를 같은 슬롯으로), 그 외 표기는 그대로"""
+    h, sep, m = t.partition(":")
+    if sep and h.isdigit() and len(h) == 1:
+        return f"0{h}:{m}"
+    return t
+
+def slot_id(item: Dict) -> str:
+    """크롤 레코드 → tee_times 문서 ID (YYYYMMDD_club_HHMM)"""
+    return f"{item['date'].replace('-', '')}_{club_key(item['golf'])}_{normalize_time(item['time']).replace(':', '')}"
+
+def lowest(prices: Dict[str, int]) -> Tuple[str, int]:
+    """(출처, 가격) — 같은 가격이면 출처 이름순"""
+    return min(prices.items(), key=lambda kv: (kv[1], kv[0]))
+
+def merged_record(base: Dict, prices: Dict[str, int]) -> Dict:
+    source, price = lowest(prices)
+    return {**base, "price": price, "source": source, "prices": dict(prices), "sources": sorted(prices)}
+
+def _add(slots: Dict[str, Tuple[Dict, Dict[str, int]]], item: Dict) -> Optional[str]:
+    price = item.get("price")
+    if not price:
+        return None
+    sid = slot_id(item)
+    source = item.get("source", "Golfpang")
+    if sid not in slots:
+        base = {k: v for k, v in item.items() if k not in ("price", "source", "prices", "sources")}
+        base["time"] = normalize_time(item["time"])
+        slots[sid] = (base, {})
+    prices = slots[sid][1]
+    if source not in prices or price < prices[source]:
+        prices[source] = price
+    return sid
+
+def merge_records(records: Iterable[Dict]) -> List[Dict]:
+    """레코드 목록 → 슬롯마다 병합 레코드 하나 (처음 나온 순서 유지)"""
+    slots: Dict[str, Tuple[Dict, Dict[str, int]]] = {}
+    for item in records:
+        _add(slots, item)
+    return [merged_record(base, prices) for base, prices in slots.values()]
+
+class SlotMerger:
+    """
+    add(records)        : 배치 병합
+    source_done(source) : 그 출처의 수집이 끝남 (더 올 레코드 없음)
+    ready()             : 내보낼 수 있게 된 (slot_id, 병합 레코드) — 이미 내보낸 슬롯이 다시 바뀌면 다시 나온다
+    drain()             : 남은 슬롯 전부
+    sources가 비어 있으면 기다리지 않고 add() 즉시 ready()로 나온다.
+    """
+
+    def __init__(self, sources: Iterable[str] = ()):
+        self.sources = tuple(sources)
+        self._slots: Dict[str, Tuple[Dict, Dict[str, int]]] = {}
+        self._seen: Dict[str, Set[str]] = {s: set() for s in self.sources}   # 출처 → 보고한 구장
+        self._done: Set[str] = set()
+        self._pending: Dict[str, Set[str]] = {}   # 구장 → 아직 내보내지 않은 슬롯
+
+    @property
+    def ids(self) -> Set[str]:
+        return set(self._slots)
+
+    def add(self, records: Iterable[Dict]):
+        for item in records:
+            sid = _add(self._slots, item)
+            if sid is None:
+                continue
+            club = club_key(item["golf"])
+            self._pending.setdefault(club, set()).add(sid)
+            source = item.get("source", "Golfpang")
+            if source in self._seen:
+                self._seen[source].add(club)
+
+    def source_done(self, source: str):
+        self._done.add(source)
+
+    def _settled(self, club: str) -> bool:
+        return all(s in self._done or club in self._seen[s] for s in self.sources)
+
+    def _emit(self, clubs) -> List[Tuple[str, Dict]]:
+        out = []
+        for club in clubs:
+            for sid in sorted(self._pending.pop(club, ())):
+                out.append((sid, merged_record(*self._slots[sid])))
+        return out
+
+    def ready(self) -> List[Tuple[str, Dict]]:
+        return self._emit([c for c in self._pending if self._settled(c)])
+
+    def drain(self) -> List[Tuple[str, Dict]]:
+        return self._emit(list(self._pending))
@@ -0,0 +1,143 @@
+import datetime
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import app
+import http_cache
+from change_feed import ChangeFeed
+from date_views import publish_view
+from price_cache import PriceCache
+from storage import SQLiteStorage
+
+DATES = ["2025-12-24", "2025-12-25", "2025-12-26"]
+# The change-feed head only keeps dates from today on
+SOON = [(datetime.date.today() + datetime.timedelta(days=i)).isoformat() for i in (1, 2)]
+
+def _tee(date, price):
+    return {"club_name": "ClubA", "date": date, "time": "08:00", "hour": 8, "price": price, "source": "golfpang"}
+
+class TestGetPricesFanOut(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+        bw = self.store.writer("seed")
+        for i, date in enumerate(DATES + ["2025-12-29"]):
+            bw.set("tee_times", f"t{i}", _tee(date, 10000 + i))
+            base = app._history_date(date)
+            bw.set("daily_stats", f"s{i}", {"club_name": "ClubA", "date": base, "hour": 8, "min_price": 9000 + i})
+        bw.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _prices(self, dates):
+        with patch.object(app, "db", None), patch.object(app, "PRICE_CACHE", PriceCache()), \
+                patch.object(app, "open_storage", return_value=self.store):
+            with app.app.test_request_context(json={"dates": dates, "clubs": ["ClubA"], "times": ["8"]}):
+                return [(i["date"], i["price"], i["history_price"]) for i in app.get_prices().get_json()]
+
+    def test_consecutive_dates_use_range_queries(self):
+        with patch.object(app, "PRICE_PUSHDOWN_MAX_CLUBS", 0), \
+                patch.object(self.store, "tee_times", side_effect=AssertionError("per-date query")), \
+                patch.object(self.store, "daily_stats", side_effect=AssertionError("per-date query")):
+            self.assertEqual(self._prices(DATES + ["2025-12-25"]), [
+                ("2025-12-24", 10000, 9000), ("2025-12-25", 10001, 9001), ("2025-12-26", 10002, 9002)])
+
+    def test_scattered_dates_are_fetched_concurrently(self):
+        with patch.object(app, "PRICE_PUSHDOWN_MAX_CLUBS", 0), \
+                patch.object(self.store, "tee_times_range", side_effect=AssertionError("range query")):
+            self.assertEqual(self._prices(["2025-12-29", "2025-12-24"]), [
+                ("2025-12-24", 10000, 9000), ("2025-12-29", 10003, 9003)])
+
+    def test_small_selections_are_pushed_down(self):
+        bw = self.store.writer("more")
+        bw.set("tee_times", "other", {**_tee("2025-12-25", 1), "club_name": "ClubB"})
+        bw.set("tee_times", "late", {**_tee("2025-12-25", 2), "time": "15:00", "hour": 15})
+        bw.close()
+        with patch.object(self.store, "find", wraps=self.store.find) as find, \
+                patch.object(self.store, "tee_times", side_effect=AssertionError("full date read")):
+            self.assertEqual(self._prices(["2025-12-25"]), [("2025-12-25", 10001, 9001)])
+        tee_call = [c for c in find.call_args_list if c.args[0] == "tee_times"][0]
+        self.assertEqual(tee_call.args[1:4], ("2025-12-25", {"ClubA"}, {8}))
+        self.assertIn("price", tee_call.args[4])
+
+    def test_views_for_all_dates_come_from_one_batched_read(self):
+        for date in DATES:
+            publish_view(self.store, date, [_tee(date, 500)])
+        with patch.object(self.store, "get_meta_many", wraps=self.store.get_meta_many) as many, \
+                patch.object(self.store, "tee_times_range", side_effect=AssertionError("range query")):
+            self.assertEqual([p for _, p, _ in self._prices(DATES)], [500, 500, 500])
+        self.assertEqual(many.call_count, 1)
+
+class TestHttpCaching(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+        bw = self.store.writer("seed")
+        bw.set("tee_times", "t0", _tee(SOON[0], 10000))
+        bw.close()
+        self.feed = ChangeFeed(self.store)
+        self.feed.publish(SOON[0], {"s": ("inserted", 10000)})
+        self.patches = [patch.object(app, "db", None), patch.object(app, "PRICE_CACHE", PriceCache(head_sec=0)),
+                        patch.object(app, "open_storage", return_value=self.store)]
+        for p in self.patches:
+            p.start()
+        self.client = app.app.test_client()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _revalidate(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.headers["ETag"].startswith('W/"'))
+        return first, self.client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+
+    def test_prices_get_is_answered_with_304_until_the_date_changes(self):
+        url = f"/api/prices?dates={SOON[0]}&clubs=ClubA&times=08"
+        first, again = self._revalidate(url)
+        self.assertEqual(first.headers["Cache-Control"], http_cache.REVALIDATE)
+        self.assertEqual(first.get_json()[0]["price"], 10000)
+        self.assertEqual((again.status_code, again.data), (304, b""))
+
+        self.feed.publish(SOON[1], {"s": ("inserted", 1)})
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code, 304)
+        self.feed.publish(SOON[0], {"s": ("repriced", 9000)})
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code, 200)
+
+    def test_post_prices_are_not_stored(self):
+        res = self.client.post("/api/prices", json={"dates": [SOON[0]], "clubs": ["ClubA"]})
+        self.assertEqual(res.get_json()[0]["price"], 10000)
+        self.assertTrue(res.headers["Cache-Control"].startswith("no-store"))
+
+    def test_clubs_and_dates_allow_stale_while_revalidate(self):
+        for url, policy in (("/api/clubs", http_cache.CLUBS), ("/api/available_dates", http_cache.DATES),
+                            ("/api/availability", http_cache.DATES)):
+            first, again = self._revalidate(url)
+            self.assertEqual(first.headers["Cache-Control"], policy)
+            self.assertEqual(again.status_code, 304)
+
+    def test_fingerprinted_assets_are_immutable(self):
+        with app.app.test_request_context():
+            url = app.asset_url("manifest.json")
+        self.assertEqual(self.client.get(url).headers["Cache-Control"], http_cache.IMMUTABLE)
+        self.assertEqual(self.client.get("/assets/0000000000/manifest.json").headers["Cache-Control"], http_cache.STATIC)
+        self.assertIn(url.encode(), self.client.get("/").data)
+        self.assertEqual(self.client.get("/static/service-worker.js").headers["Cache-Control"], http_cache.REVALIDATE)
+
+    def test_page_links_local_assets_only_by_fingerprint(self):
+        page = self.client.get("/").data.decode()
+        self.assertEqual(re.findall(r"['\"](/static/[^'\"]+)", page), ["/static/service-worker.js"])
+
+    def test_errors_are_never_stored(self):
+        res = self.client.get("/assets/x/../../app.py")
+        self.assertEqual(res.status_code, 404)
+        self.assertTrue(res.headers["Cache-Control"].startswith("no-store"))
+
+if __name__ == '__main__':
+    unittest.main()
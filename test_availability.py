@@ -0,0 +1,69 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from availability import AVAILABILITY_COLLECTION, AvailabilityManifest, load_availability, summarize
+from change_feed import ChangeFeed
+from price_cache import PriceCache
+from storage import SQLiteStorage
+
+TODAY = datetime.date.today()
+D1 = (TODAY + datetime.timedelta(days=1)).isoformat()
+D2 = (TODAY + datetime.timedelta(days=2)).isoformat()
+PAST = (TODAY - datetime.timedelta(days=1)).isoformat()
+
+def _rec(club, price):
+    return {"golf": club, "date": D1, "time": "08:00", "hour_num": 8, "price": price}
+
+class TestAvailabilityManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_summarize(self):
+        self.assertEqual(summarize([_rec("A", 90000), _rec("A", 80000), _rec("B", 85000), _rec("C", 0)]),
+                         {"count": 3, "min_price": 80000, "clubs": {"A": 2, "B": 1}})
+        self.assertIsNone(summarize([]))
+
+    def test_update_writes_only_changes_and_drops_past_dates(self):
+        self.store.put_meta(AVAILABILITY_COLLECTION, "manifest", {"dates": {PAST: {"count": 1}}})
+        manifest = AvailabilityManifest(self.store)
+        self.assertTrue(manifest.update(D1, [_rec("A", 90000)]))
+        self.assertFalse(manifest.update(D1, [_rec("A", 90000)]))
+        self.assertTrue(manifest.update(D2, [_rec("B", 70000)]))
+        self.assertEqual(set(load_availability(self.store)), {D1, D2})
+        self.assertTrue(manifest.update(D2, []))
+        self.assertEqual(set(load_availability(self.store)), {D1})
+
+    def test_endpoints_read_the_manifest_once_per_generation(self):
+        import app
+        AvailabilityManifest(self.store).update(D1, [_rec("A", 90000), _rec("B", 80000)])
+        ChangeFeed(self.store).publish(D1, {"x": ("inserted", 1)})
+        with patch.object(app, "db", None), patch.object(app, "PRICE_CACHE", PriceCache(head_sec=0)), \
+                patch.object(app, "_AVAILABILITY", {"generation": None, "dates": None}), \
+                patch.object(app, "open_storage", return_value=self.store), \
+                patch.object(self.store, "has_tee_times", side_effect=AssertionError("per-date query")):
+            with app.app.test_request_context():
+                self.assertEqual(app.get_available_dates().get_json(), [D1])
+                with patch("app.load_availability", side_effect=AssertionError("manifest re-read")):
+                    self.assertEqual(app.get_availability().get_json(),
+                                     {D1: {"count": 2, "min_price": 80000, "clubs": 2}})
+
+    def test_missing_manifest_falls_back_to_queries(self):
+        import app
+        bw = self.store.writer("seed")
+        bw.set("tee_times", "t", {"club_name": "A", "date": D2, "time": "08:00", "hour": 8, "price": 1})
+        bw.close()
+        with patch.object(app, "db", None), patch.object(app, "PRICE_CACHE", PriceCache()), \
+                patch.object(app, "_AVAILABILITY", {"generation": None, "dates": None}), \
+                patch.object(app, "open_storage", return_value=self.store):
+            with app.app.test_request_context():
+                self.assertEqual(app.get_available_dates().get_json(), [D2])
+
+if __name__ == '__main__':
+    unittest.main()
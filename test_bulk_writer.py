@@ -0,0 +1,89 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from google.api_core import exceptions as gexc
+import bulk_writer
+from bulk_writer import BulkWriter
+
+class _Ref:
+    def __init__(self, path):
+        self.path = path
+
+class _FakeDb:
+    """db.batch() stand-in that records committed ops; commit() can fail on demand."""
+
+    def __init__(self, failures=0, fail_with=gexc.Aborted):
+        self.committed = []
+        self.failures = failures
+        self.fail_with = fail_with
+        self.lock = threading.Lock()
+
+    def batch(self):
+        db, ops = self, []
+        batch = MagicMock()
+        batch.set.side_effect = lambda ref, data, **kw: ops.append(("set", ref.path, data))
+        batch.delete.side_effect = lambda ref: ops.append(("delete", ref.path, None))
+
+        def commit():
+            with db.lock:
+                if db.failures:
+                    db.failures -= 1
+                    raise db.fail_with("contention")
+                db.committed.append(list(ops))
+        batch.commit.side_effect = commit
+        return batch
+
+class TestBulkWriter(unittest.TestCase):
+    def test_splits_at_op_limit(self):
+        db = _FakeDb()
+        with BulkWriter(db, max_ops=400, verbose=False) as bw:
+            for i in range(1001):
+                bw.set(_Ref(f"c/{i}"), {"i": i})
+        self.assertEqual(sorted(len(b) for b in db.committed), [201, 400, 400])
+        self.assertEqual(bw.stats["ops"], 1001)
+        self.assertEqual(bw.stats["commits"], 3)
+
+    def test_splits_at_byte_limit(self):
+        db = _FakeDb()
+        bw = BulkWriter(db, max_ops=400, max_bytes=1000, verbose=False)
+        for i in range(10):
+            bw.set(_Ref(f"c/{i}"), {"blob": "x" * 300})
+        bw.close()
+        self.assertTrue(all(len(b) <= 2 for b in db.committed))
+        self.assertEqual(sum(len(b) for b in db.committed), 10)
+
+    @patch.object(bulk_writer, "RETRY_BASE_SEC", 0.0)
+    def test_retries_contention(self):
+        db = _FakeDb(failures=2)
+        bw = BulkWriter(db, verbose=False)
+        bw.set(_Ref("c/a"), {"v": 1})
+        stats = bw.close()
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(len(db.committed), 1)
+
+    @patch.object(bulk_writer, "RETRY_BASE_SEC", 0.0)
+    def test_gives_up_after_retries(self):
+        db = _FakeDb(failures=10)
+        bw = BulkWriter(db, retries=1, verbose=False)
+        bw.set(_Ref("c/a"), {"v": 1})
+        with self.assertRaises(gexc.Aborted):
+            bw.close()
+
+    def test_non_retryable_error_is_raised(self):
+        db = _FakeDb(failures=1, fail_with=gexc.PermissionDenied)
+        bw = BulkWriter(db, verbose=False)
+        bw.delete(_Ref("c/a"))
+        with self.assertRaises(gexc.PermissionDenied):
+            bw.close()
+        self.assertEqual(bw.stats["retries"], 0)
+
+    def test_same_document_commits_in_order(self):
+        db = _FakeDb()
+        bw = BulkWriter(db, max_ops=1, verbose=False)
+        for v in range(20):
+            bw.set(_Ref("c/same"), {"v": v})
+        bw.close()
+        self.assertEqual([b[0][2]["v"] for b in db.committed], list(range(20)))
+
+if __name__ == '__main__':
+    unittest.main()
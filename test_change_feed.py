@@ -0,0 +1,77 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import change_feed
+from change_feed import ChangeFeed, read_changes, read_head
+from ingest_data import TeeTimeWriter
+from storage import SQLiteStorage
+
+DATE = (datetime.date.today() + datetime.timedelta(days=3)).isoformat()
+PAST = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+        self.feed = ChangeFeed(self.store, run="run1")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_publish_and_read_deltas(self):
+        self.assertIsNone(self.feed.publish(DATE, {}))
+        g1 = self.feed.publish(DATE, {"a": ("inserted", 100), "b": ("deleted", None)})
+        g2 = self.feed.publish(PAST, {"c": ("repriced", 90)})
+        self.assertEqual((g1, g2), (1, 2))
+
+        gen, entries = read_changes(self.store, since=0)
+        self.assertEqual(gen, 2)
+        self.assertEqual(entries[0]["inserted"], [["a", 100]])
+        self.assertEqual(entries[0]["deleted"], ["b"])
+        self.assertEqual(entries[0]["run"], "run1")
+        self.assertEqual(entries[1]["repriced"], [["c", 90]])
+        self.assertEqual(read_changes(self.store, since=1)[1][0]["date"], PAST)
+        self.assertEqual(read_changes(self.store, since=2), (2, []))
+
+        self.feed.publish(DATE, {"a": ("repriced", 80)})
+        # Dates that already passed drop out of the head
+        head = read_head(self.store)
+        self.assertEqual((head["generation"], head["dates"]), (3, {DATE: 3}))
+        self.assertIsInstance(head["published_at"], float)
+
+    def test_large_changes_are_truncated(self):
+        with patch.object(change_feed, "CHANGE_FEED_MAX_ITEMS", 2):
+            self.feed.publish(DATE, {s: ("inserted", 1) for s in "abc"})
+        entry = read_changes(self.store)[1][0]
+        self.assertTrue(entry["truncated"])
+        self.assertNotIn("inserted", entry)
+        self.assertEqual(entry["counts"]["inserted"], 3)
+
+    def test_old_generations_are_pruned(self):
+        with patch.object(change_feed, "CHANGE_FEED_KEEP", 2):
+            for i in range(4):
+                self.feed.publish(DATE, {"a": ("repriced", i)})
+            self.assertIsNone(read_changes(self.store, since=1)[1])
+            self.assertEqual([e["generation"] for e in read_changes(self.store, since=2)[1]], [3, 4])
+        self.assertIsNone(self.store.get_meta("change_feed", "0000000002"))
+
+    def test_writer_reports_slot_changes(self):
+        bw = self.store.writer("seed")
+        for doc_id, price in (("20251225_ClubA_0800", 10000), ("20251225_ClubD_1100", 40000)):
+            bw.set("tee_times", doc_id, {"club_name": doc_id[9:14], "date": "2025-12-25", "time": "00:00", "price": price})
+        bw.close()
+        writer = TeeTimeWriter(self.store, "2025-12-25").start()
+        writer.put([{"golf": "ClubA", "date": "2025-12-25", "time": "08:00", "hour_num": 8, "price": 9000},
+                    {"golf": "ClubB", "date": "2025-12-25", "time": "09:00", "hour_num": 9, "price": 20000}])
+        writer.close()
+        self.assertEqual(writer.changes, {
+            "20251225_ClubA_0800": ("repriced", 9000),
+            "20251225_ClubB_0900": ("inserted", 20000),
+            "20251225_ClubD_1100": ("deleted", None),
+        })
+
+if __name__ == '__main__':
+    unittest.main()
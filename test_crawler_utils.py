@@ -0,0 +1,211 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import requests
+import crawler_utils
+import rate_limiter
+from crawler_utils import crawl_teescan
+
+
+class TestTeescanConcurrency(unittest.TestCase):
+    def test_crawl_teescan_keeps_sequential_order_and_format(self):
+        print("\nTesting concurrent crawl_teescan output...")
+        clubs = [
+            {"name": "ClubA", "seq": "1"},
+            {"name": "ClubB", "seq": "2"},
+            {"name": "ClubA", "seq": "9"},   # duplicate name → skipped
+            {"name": "ClubC"},               # no seq → skipped
+        ]
+        responses = {
+            "1": [{"price": "120000", "teetime_time": "07:10"}, {"price": "500", "teetime_time": "08:00"}],
+            "2": [{"price": 90000, "teetime_time": "13:40"}, {"price": "문의", "teetime_time": "14:00"}],
+        }
+
+        def fake_get(s, seq, date_str):
+            return responses.get(seq, [])
+
+        with patch.object(crawler_utils, "GOLF_CLUBS", clubs), \
+             patch.object(crawler_utils, "get_teescan_times", side_effect=fake_get):
+            res = crawl_teescan("2025-12-25", [], max_workers=4)
+
+        self.assertEqual([(r["golf"], r["time"], r["price"]) for r in res],
+                         [("ClubA", "07:10", 120000), ("ClubB", "13:40", 90000)])
+        self.assertEqual(res[0], {
+            "golf": "ClubA", "date": "2025-12-25",
+            "hour": "07시대", "hour_num": 7,
+            "price": 120000, "benefit": "",
+            "time": "07:10",
+            "url": "https://www.teescanner.com/", "source": "teescan",
+        })
+
+
+class TestGolfpangSessionPool(unittest.TestCase):
+    def test_bootstraps_once_per_sector_and_rebootstraps_once_per_generation(self):
+        print("\nTesting GolfpangSessionPool reuse...")
+        pool = crawler_utils.GolfpangSessionPool()
+        with patch.object(crawler_utils, "_bootstrap_gp_session") as boot:
+            s1, gen1 = pool.get(5, "2025-12-25")
+            s2, gen2 = pool.get(5, "2025-12-26")
+            pool.get(4, "2025-12-25")
+            self.assertIs(s1, s2)
+            self.assertEqual(gen1, gen2)
+            self.assertEqual(boot.call_count, 2, "One bootstrap per sector")
+
+            # Two workers hit maintenance on the same generation → only one re-bootstrap
+            s3, gen3 = pool.rebootstrap(5, "2025-12-25", gen1)
+            s4, gen4 = pool.rebootstrap(5, "2025-12-25", gen1)
+            self.assertIs(s3, s1)
+            self.assertEqual(gen3, gen4)
+            self.assertEqual(boot.call_count, 3)
+        pool.close()
+
+
+class TestGolfpangParser(unittest.TestCase):
+    def test_lxml_parser_matches_beautifulsoup_baseline(self):
+        print("\nTesting parse_gp_rows against BeautifulSoup baseline...")
+        from benchmark_parsing import load_fixtures, parse_bs4
+        pages = load_fixtures()
+        self.assertTrue(pages)
+        for html in pages:
+            for target in ("2025-12-25", None):
+                self.assertEqual(crawler_utils.parse_gp_rows(html, target), parse_bs4(html, target))
+
+    def test_target_date_filter_and_empty_page(self):
+        html = (
+            '<tr id="tr_1"><td>1</td><td>12월 25일 (목)</td><td>07:10</td><td>-</td>'
+            '<td>태광</td><td><span class="price">120,000</span>원</td></tr>'
+            '<tr id="tr_2"><td>2</td><td>12월 26일 (금)</td><td>08:00</td><td>-</td>'
+            '<td>세현</td><td>95,000원</td></tr>'
+        )
+        rows, tr_count = crawler_utils.parse_gp_rows(html, "2025-12-25")
+        self.assertEqual(rows, [("12-25", "07:10", "태광", 120000)])
+        self.assertEqual(tr_count, 2)
+        self.assertEqual(crawler_utils.parse_gp_rows("", "2025-12-25"), ([], 0))
+
+
+class TestClubNameMatcher(unittest.TestCase):
+    def linear(self, targets, site_txt):
+        for t in targets:
+            if crawler_utils._name_match(site_txt, t["gp"]):
+                return t
+        return None
+
+    def test_matches_linear_scan(self):
+        print("\nTesting ClubNameMatcher against linear _name_match scan...")
+        targets = [{"name": c["name"], "gp": c["Golpang_code"]}
+                   for c in crawler_utils.GOLF_CLUBS if c.get("Golpang_code")]
+        targets += [{"name": "한림용인", "gp": "한림용인"},
+                    {"name": "레이크", "gp": "레이크"},
+                    {"name": "레이크사이드", "gp": "레이크사이드"}]
+        matcher = crawler_utils.ClubNameMatcher(targets)
+        samples = [t["gp"] for t in targets] + [
+            "한림용인(퍼블릭)", "레이크사이드 C.C", "레이크사이드CC", "세현 CC",
+            "오크밸리(회원제)", "알 수 없는 구장", "", "파인크리크-CC",
+        ]
+        for txt in samples:
+            self.assertIs(matcher.match(txt), self.linear(targets, txt), txt)
+            self.assertIs(matcher.match(txt), self.linear(targets, txt), txt)  # memo hit
+
+    def test_does_not_match_name_to_parenthesized_variant(self):
+        matcher = crawler_utils.ClubNameMatcher([{"name": "A", "gp": "한림용인"}])
+        self.assertIsNone(matcher.match("한림용인(퍼블릭)"))
+        self.assertEqual(matcher.match("한림용인 CC")["name"], "A")
+
+
+def _gp_row(i, day, time_txt, club, price):
+    return (f'<tr id="tr_{i}"><td>{i}</td><td>{day}</td><td>{time_txt}</td><td>-</td>'
+            f'<td>{club}</td><td><span class="price">{price:,}</span>원</td></tr>')
+
+
+class TestGolfpangMultiDate(unittest.TestCase):
+    CLUBS = [{"name": "ClubA", "Golpang_code": "클럽A"}, {"name": "ClubB", "Golpang_code": "클럽B"}]
+
+    def fake_post(self, pages):
+        calls = []
+
+        def _post(sector, rd_date, form):
+            calls.append((rd_date, form["pageNum"]))
+            r = MagicMock()
+            r.text = pages.get(form["pageNum"], "")
+            return r
+        return _post, calls
+
+    def test_single_sweep_fills_neighbor_date_buckets(self):
+        print("\nTesting multi-date Golfpang harvesting...")
+        pages = {
+            1: _gp_row(1, "12월 25일 (목)", "07:10", "클럽A", 120000)
+               + _gp_row(2, "12월 26일 (금)", "08:20", "클럽B", 90000),
+            2: _gp_row(3, "12월 26일 (금)", "09:30", "클럽A", 80000),
+        }
+        post, calls = self.fake_post(pages)
+        with patch.object(crawler_utils, "GOLF_CLUBS", self.CLUBS), \
+             patch.object(crawler_utils, "GPANG_PAGE_WINDOW", 1), \
+             patch.object(crawler_utils, "_post_tbllist", side_effect=post):
+            by_date, stats = crawler_utils.crawl_golfpang_dates(["2025-12-25", "2025-12-26"], [], [5])
+
+        self.assertEqual([(r["golf"], r["time"]) for r in by_date["2025-12-25"]], [("ClubA", "07:10")])
+        self.assertEqual([(r["golf"], r["time"]) for r in by_date["2025-12-26"]],
+                         [("ClubB", "08:20"), ("ClubA", "09:30")])
+        self.assertEqual({rd for rd, _ in calls}, {"2025-12-25"}, "Neighbor date must not be re-swept")
+        self.assertEqual(stats["sweeps"], 1)
+        self.assertEqual(stats["saved_sweeps"], 1)
+        self.assertEqual(stats["saved_pages_est"], 3)
+
+    def test_per_date_mode_sweeps_every_date(self):
+        pages = {1: _gp_row(1, "12월 25일 (목)", "07:10", "클럽A", 120000)}
+        post, calls = self.fake_post(pages)
+        with patch.object(crawler_utils, "GOLF_CLUBS", self.CLUBS), \
+             patch.object(crawler_utils, "_post_tbllist", side_effect=post):
+            by_date, stats = crawler_utils.crawl_golfpang_dates(["2025-12-25", "2025-12-26"], [], [5], multi=False)
+        self.assertEqual(stats["sweeps"], 2)
+        self.assertEqual(stats["saved_sweeps"], 0)
+        self.assertEqual(len(by_date["2025-12-25"]), 1)
+        self.assertEqual(by_date["2025-12-26"], [])
+
+
+class TestGolfpangPagePrefetch(unittest.TestCase):
+    def test_window_matches_serial_and_applies_stop_rules_in_order(self):
+        print("\nTesting sliding-window page prefetch...")
+        hit = _gp_row(1, "12월 25일 (목)", "07:10", "클럽A", 120000)
+        miss = _gp_row(2, "12월 25일 (목)", "08:00", "모르는구장", 90000)
+        # page 2..4 have no matches → stop after page 4; page 6 match must never be used
+        pages = {1: hit, 2: miss, 3: miss, 4: miss, 5: miss,
+                 6: _gp_row(3, "12월 25일 (목)", "09:00", "클럽B", 70000)}
+
+        def post(sector, rd_date, form):
+            r = MagicMock()
+            r.text = pages.get(form["pageNum"], "")
+            return r
+
+        matcher = crawler_utils.ClubNameMatcher([{"name": "ClubA", "gp": "클럽A"}, {"name": "ClubB", "gp": "클럽B"}])
+        results = []
+        for window in (1, 4):
+            with patch.object(crawler_utils, "GPANG_PAGE_WINDOW", window), \
+                 patch.object(crawler_utils, "_post_tbllist", side_effect=post):
+                results.append(crawler_utils._sweep_gp_sector(5, "2025-12-25", {"12-25": "2025-12-25"}, matcher))
+
+        (serial, serial_st), (windowed, windowed_st) = results
+        self.assertEqual(serial, windowed)
+        self.assertEqual([r["golf"] for r in windowed["2025-12-25"]], ["ClubA"])
+        self.assertFalse(windowed_st["exhausted"])
+        self.assertEqual(serial_st["pages"], 4)
+        self.assertLessEqual(windowed_st["pages"], 4 + 4)
+
+    def test_every_page_request_takes_a_golfpang_limiter_token(self):
+        # The window has no sleep of its own: page pacing comes from the host limiter on the sector session
+        empty = requests.Response()
+        empty.status_code, empty._content, empty.encoding = 200, b"", "utf-8"
+        limiter = rate_limiter.get_limiter("www.golfpang.com")
+        before = limiter.stats["requests"]
+        matcher = crawler_utils.ClubNameMatcher([{"name": "ClubA", "gp": "클럽A"}])
+        with patch.object(crawler_utils, "GPANG_PAGE_WINDOW", 1), \
+             patch.object(crawler_utils, "GP_SESSION_POOL", crawler_utils.GolfpangSessionPool()), \
+             patch.object(crawler_utils, "_bootstrap_gp_session", return_value=True), \
+             patch.object(requests.adapters.HTTPAdapter, "send", return_value=empty) as send:
+            _, st = crawler_utils._sweep_gp_sector(5, "2025-12-25", {"12-25": "2025-12-25"}, matcher)
+        self.assertTrue(st["exhausted"])
+        self.assertEqual(limiter.stats["requests"] - before, send.call_count)
+        self.assertEqual(send.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
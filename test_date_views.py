@@ -0,0 +1,91 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import date_views
+from date_views import VIEW_COLLECTION, load_baseline, load_view, pack_view, publish_view, unpack_view
+from history_aggregator import HistoryAggregator
+from price_cache import PriceCache
+from storage import SQLiteStorage
+
+DATE = "2025-12-25"
+
+def _tee(club, time, price, source="Golfpang"):
+    return {"club_name": club, "date": DATE, "time": time, "hour": int(time[:2]), "price": price, "source": source,
+            "prices": {source: price}, "sources": [source]}
+
+class TestDateViews(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+        self.tee_times = [_tee(f"Club{i % 40}", f"{6 + i % 12:02d}:{i % 60:02d}", 80000 + i * 10,
+                               "teescan" if i % 3 else "Golfpang") for i in range(600)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_pack_roundtrip(self):
+        baseline = [{"club_name": "Club1", "hour": 7, "min_price": 70000}]
+        items, history = unpack_view(pack_view(DATE, self.tee_times, baseline))
+        self.assertEqual(items, self.tee_times)
+        self.assertEqual(history[("Club1", 7)], 70000)
+        self.assertEqual(history[("Club1", "7")], 70000)
+
+    def test_per_source_prices_roundtrip(self):
+        tee = {**_tee("Club1", "07:10", 90000, "golfpang"), "prices": {"golfpang": 90000, "teescan": 95000},
+               "sources": ["golfpang", "teescan"]}
+        items, _ = unpack_view(pack_view(DATE, [tee], []))
+        self.assertEqual(items, [tee])
+
+    def test_publish_is_skipped_when_unchanged(self):
+        self.assertTrue(publish_view(self.store, DATE, self.tee_times))
+        self.assertFalse(publish_view(self.store, DATE, self.tee_times))
+        self.assertTrue(publish_view(self.store, DATE, self.tee_times[:-1]))
+        self.assertEqual(load_view(self.store, DATE)[0], self.tee_times[:-1])
+
+    def test_large_views_are_chunked_and_shrunk(self):
+        with patch.object(date_views, "VIEW_CHUNK_CHARS", 1000):
+            publish_view(self.store, DATE, self.tee_times)
+            head = self.store.get_meta(VIEW_COLLECTION, DATE)
+            self.assertGreater(head["chunks"], 2)
+            self.assertEqual(load_view(self.store, DATE)[0], self.tee_times)
+
+            publish_view(self.store, DATE, self.tee_times[:5])
+            self.assertEqual(self.store.get_meta(VIEW_COLLECTION, DATE)["chunks"], 1)
+            self.assertIsNone(self.store.get_meta(VIEW_COLLECTION, f"{DATE}~{head['chunks'] - 1}"))
+
+    def test_mismatched_chunk_falls_back(self):
+        with patch.object(date_views, "VIEW_CHUNK_CHARS", 1000):
+            publish_view(self.store, DATE, self.tee_times)
+        self.store.put_meta(VIEW_COLLECTION, f"{DATE}~1", {"digest": "other", "data": ""})
+        self.assertIsNone(load_view(self.store, DATE))
+        self.assertIsNone(load_view(self.store, "2030-01-01"))
+
+    def test_baseline_comes_from_history_state(self):
+        base_date = "2025-12-18"
+        HistoryAggregator(self.store, datetime.datetime(2025, 12, 18, 9)).apply(
+            base_date, [{"golf": "Club1", "date": base_date, "hour_num": 7, "price": 70000}])
+        self.assertEqual(load_baseline(self.store, DATE), [{"club_name": "Club1", "hour": 7, "min_price": 70000}])
+
+    def test_open_baseline_date_is_not_used(self):
+        base = datetime.date.today()
+        date = (base + datetime.timedelta(days=date_views.BASELINE_DAYS)).strftime("%Y-%m-%d")
+        HistoryAggregator(self.store).apply(base.strftime("%Y-%m-%d"), [
+            {"golf": "Club1", "date": base.strftime("%Y-%m-%d"), "hour_num": 7, "price": 70000}])
+        self.assertEqual(load_baseline(self.store, date), [])
+
+    def test_get_prices_reads_the_view(self):
+        import app
+        publish_view(self.store, DATE, self.tee_times)
+        with patch.object(app, "db", None), patch.object(app, "PRICE_CACHE", PriceCache()), \
+                patch.object(app, "open_storage", return_value=self.store), \
+                patch.object(self.store, "tee_times", side_effect=AssertionError("tee_times scanned")):
+            with app.app.test_request_context(json={"dates": [DATE], "clubs": ["Club1"], "times": ["07"]}):
+                items = app.get_prices().get_json()
+        expected = sorted(t["price"] for t in self.tee_times if t["club_name"] == "Club1" and t["hour"] == 7)
+        self.assertEqual([i["price"] for i in items], expected)
+
+if __name__ == '__main__':
+    unittest.main()
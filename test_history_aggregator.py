@@ -0,0 +1,182 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from history_aggregator import (HISTORY_STATE_COLLECTION, HistoryAggregator, daily_add, daily_merge,
+                                doc_group, group_stats, record_hour, sketch_quantile)
+from archive_history import aggregate_daily_stats
+from storage import SQLiteStorage
+from ingest_data import TeeTimeWriter
+
+DATE = "2025-12-25"
+T0 = datetime.datetime(2025, 12, 20, 10, 0)
+
+def _rec(club, time, price):
+    # Same shape as crawler_utils output: "hour" is the Korean display label, hour_num the integer hour
+    h = int(time[:2])
+    return {"golf": club, "date": DATE, "hour": f"{h:02d}시대", "hour_num": h, "price": price, "benefit": "",
+            "time": time, "url": "https://www.golfpang.com/", "source": "golfpang"}
+
+class TestGroupStats(unittest.TestCase):
+    def test_matches_python_groupby(self):
+        rng = np.random.default_rng(7)
+        keys = rng.integers(0, 50, 2000)
+        prices = rng.integers(50000, 300000, 2000)
+        uniq, mins, sums, counts = group_stats(keys, prices)
+        for k, mn, sm, c in zip(uniq, mins, sums, counts):
+            sel = prices[keys == k]
+            self.assertEqual((mn, sm, c), (sel.min(), sel.sum(), len(sel)))
+
+    def test_record_hour_reads_every_record_shape(self):
+        self.assertEqual(record_hour(_rec("ClubA", "07:40", 1)), 7)
+        self.assertEqual(record_hour({"club_name": "ClubA", "hour": 9, "time": "09:10"}), 9)
+        self.assertEqual(record_hour({"golf": "ClubA", "hour": "06시대", "time": "06:05"}), 6)
+        self.assertIsNone(record_hour({"golf": "ClubA", "hour": "-1시대", "hour_num": -1, "time": "미정"}))
+
+    def test_doc_group(self):
+        self.assertEqual(doc_group("20251225_Club_A_0812"), ("Club_A", 8))
+        self.assertIsNone(doc_group("bad"))
+
+class TestDailyAggregate(unittest.TestCase):
+    def test_merge_is_order_independent(self):
+        prices = [90000, 120000, 100000, 150000, 110000, 95000]
+        whole = None
+        for p in prices:
+            whole = daily_add(whole, p)
+        left = right = None
+        for p in prices[:2]:
+            left = daily_add(left, p)
+        for p in prices[2:]:
+            right = daily_add(right, p)
+        self.assertEqual(daily_merge(right, left), whole)
+        self.assertEqual((whole["min"], whole["sum"], whole["count"]), (90000, sum(prices), 6))
+
+    def test_sketch_quantile_relative_error(self):
+        rng = np.random.default_rng(3)
+        prices = rng.integers(60000, 250000, 500).tolist()
+        agg = None
+        for p in prices:
+            agg = daily_add(agg, p)
+        for q in (0.25, 0.5, 0.75):
+            exact = float(np.quantile(prices, q, method="lower"))
+            self.assertLess(abs(sketch_quantile(agg["sketch"], q) - exact) / exact, 0.02)
+        self.assertIsNone(sketch_quantile({}, 0.5))
+
+class TestHistoryAggregator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+        self.data = [_rec("ClubA", "08:00", 100000), _rec("ClubA", "08:30", 120000),
+                     _rec("ClubA", "09:10", 90000), _rec("ClubB", "08:00", 150000)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _history(self):
+        return {(d["club_name"], d["hour"], d["snapshot_at"]): d["stats"] for _, d in self.store.price_history(DATE)}
+
+    def test_first_run_writes_every_group(self):
+        st = HistoryAggregator(self.store, T0).apply(DATE, self.data, changed=set())
+        self.assertEqual(st["written"], 3)   # no state yet → full recompute
+        hist = self._history()
+        self.assertEqual(hist[("ClubA", 8, T0.isoformat())], {"min": 100000, "avg": 110000.0, "count": 2})
+
+    def test_only_moved_groups_are_written(self):
+        HistoryAggregator(self.store, T0).apply(DATE, self.data)
+        t1 = T0 + datetime.timedelta(hours=1)
+        self.assertEqual(HistoryAggregator(self.store, t1).apply(DATE, self.data, set())["written"], 0)
+
+        self.data[1]["price"] = 80000   # ClubA 08시 changed
+        st = HistoryAggregator(self.store, t1).apply(DATE, self.data, {("ClubA", 8)})
+        self.assertEqual((st["recomputed"], st["written"]), (1, 1))
+        self.assertEqual(self._history()[("ClubA", 8, t1.isoformat())]["min"], 80000)
+
+        # Same price again in a changed group (e.g. source flip) → recomputed but not written
+        st = HistoryAggregator(self.store, t1).apply(DATE, self.data, {("ClubA", 8)})
+        self.assertEqual((st["recomputed"], st["written"]), (1, 0))
+
+    def test_emptied_group_is_dropped(self):
+        HistoryAggregator(self.store, T0).apply(DATE, self.data)
+        remaining = [r for r in self.data if r["golf"] != "ClubB"]
+        st = HistoryAggregator(self.store, T0).apply(DATE, remaining, {("ClubB", 8)})
+        self.assertEqual(st["dropped"], 1)
+        self.assertNotIn("ClubB|8", self.store.get_meta(HISTORY_STATE_COLLECTION, DATE)["groups"])
+
+    def test_unchanged_groups_are_refreshed_before_ttl(self):
+        HistoryAggregator(self.store, T0).apply(DATE, self.data)
+        later = T0 + datetime.timedelta(days=4)
+        self.assertEqual(HistoryAggregator(self.store, later).apply(DATE, self.data, set())["written"], 3)
+
+    def test_invalidate_forces_full_recompute(self):
+        agg = HistoryAggregator(self.store, T0)
+        agg.apply(DATE, self.data)
+        agg.invalidate(DATE)
+        self.assertEqual(HistoryAggregator(self.store, T0).apply(DATE, self.data, set())["recomputed"], 3)
+
+    def test_daily_stats_follow_every_snapshot(self):
+        HistoryAggregator(self.store, T0).apply(DATE, self.data)
+        self.data[1]["price"] = 80000
+        HistoryAggregator(self.store, T0 + datetime.timedelta(hours=1)).apply(DATE, self.data, {("ClubA", 8)})
+        self.assertEqual(dict(self.store.daily_stats(DATE)), {}, "running aggregates stay in history_state")
+        HistoryAggregator(self.store).flush_daily(DATE)
+        daily = dict(self.store.daily_stats(DATE))["20251225_ClubA_8"]
+        self.assertEqual((daily["min_price"], daily["snapshot_count"], daily["avg_price"]), (80000, 2, 90000.0))
+        self.assertIn(daily["p50_price"], range(78000, 102000))
+
+    def test_unchanged_snapshots_still_count_in_daily_stats(self):
+        # Three runs, only the first writes snapshots: every run still counts as one snapshot per group
+        for h in range(3):
+            HistoryAggregator(self.store, T0 + datetime.timedelta(hours=h)).apply(DATE, self.data, set())
+        daily = self.store.get_meta(HISTORY_STATE_COLLECTION, DATE)["daily"]["ClubB|8"]
+        self.assertEqual((daily["count"], daily["sum"]), (3, 450000))
+
+        updated, _ = HistoryAggregator(self.store).flush_daily(DATE)
+        self.assertEqual(updated, 3)
+        doc = dict(self.store.daily_stats(DATE))["20251225_ClubB_8"]
+        self.assertEqual((doc["snapshot_count"], doc["avg_price"]), (3, 150000.0))
+        self.assertEqual(HistoryAggregator(self.store).flush_daily(DATE), (0, 3))
+
+    def test_repeated_apply_for_one_snapshot_counts_once(self):
+        HistoryAggregator(self.store, T0).apply(DATE, self.data)
+        HistoryAggregator(self.store, T0).apply(DATE, self.data, set())
+        self.assertEqual(self.store.get_meta(HISTORY_STATE_COLLECTION, DATE)["daily"]["ClubA|8"]["count"], 1)
+
+    def test_daily_stats_survive_lost_state(self):
+        HistoryAggregator(self.store, T0).apply(DATE, self.data)
+        HistoryAggregator(self.store, T0).invalidate(DATE)
+        HistoryAggregator(self.store, T0 + datetime.timedelta(hours=1)).apply(DATE, self.data)
+        self.assertEqual(self.store.get_meta(HISTORY_STATE_COLLECTION, DATE)["daily"]["ClubA|8"]["count"], 2)
+
+    def test_open_dates_get_no_daily_stats(self):
+        # An open date's running min would show up as another date's "7 days ago" baseline
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        HistoryAggregator(self.store).apply(today, [dict(r, date=today) for r in self.data])
+        self.assertEqual(HistoryAggregator(self.store).flush_daily(today), (0, 0))
+        self.assertEqual(dict(self.store.daily_stats(today)), {})
+
+    def test_end_of_day_rollup_matches_rebuild(self):
+        yesterday = (datetime.date.today() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+        HistoryAggregator(self.store, T0).apply(yesterday, [dict(r, date=yesterday) for r in self.data])
+        self.assertEqual(dict(self.store.daily_stats(yesterday)), {})
+        aggregate_daily_stats(self.store)
+        before = dict(self.store.daily_stats(yesterday))
+        self.assertEqual(len(before), 3)
+        aggregate_daily_stats(self.store, rebuild=True)   # recompute from price_history: same values
+        after = dict(self.store.daily_stats(yesterday))
+        for doc_id, d in before.items():
+            self.assertEqual((after[doc_id]["min_price"], after[doc_id]["snapshot_count"]),
+                             (d["min_price"], d["snapshot_count"]))
+
+    def test_tee_time_writer_reports_changed_groups(self):
+        w = TeeTimeWriter(self.store, DATE).start()
+        w.put(self.data)
+        w.close()
+        w = TeeTimeWriter(self.store, DATE).start()
+        w.put([_rec("ClubA", "08:00", 100000), _rec("ClubA", "08:30", 99000), _rec("ClubA", "09:10", 90000)])
+        w.close()
+        self.assertEqual(w.changed_groups, {("ClubA", 8), ("ClubB", 8)})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,246 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import ANY, MagicMock, patch
+import ingest_data
+import shadow_index
+from date_views import load_view
+from history_aggregator import HISTORY_STATE_COLLECTION, HistoryAggregator
+from ingest_data import GolfpangFeed, TeeTimeWriter, process_date
+from response_cache import ResponseCache
+from shadow_index import ShadowIndex
+from storage import SQLiteStorage
+
+DATE = "2025-12-25"
+
+def _rec(club, time, price, source="Golfpang", date=DATE):
+    return {"golf": club, "date": date, "time": time, "hour_num": int(time[:2]), "price": price, "source": source}
+
+def _doc(club, time, price):
+    doc = MagicMock()
+    doc.id = f"{DATE.replace('-', '')}_{club}_{time.replace(':', '')}"
+    doc.to_dict.return_value = {"club_name": club, "date": DATE, "time": time, "price": price}
+    return doc
+
+class TestTeeTimeWriter(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.batch = MagicMock()
+        self.db.batch.return_value = self.batch
+        self.collection = MagicMock()
+        self.db.collection.return_value = self.collection
+        self.collection.where.return_value.stream.return_value = [
+            _doc("ClubA", "08:00", 10000), _doc("ClubD", "11:00", 40000)]
+
+    def test_streamed_batches_diff_against_one_read(self):
+        writer = TeeTimeWriter(self.db, DATE, queue_size=1).start()
+        writer.put([_rec("ClubA", "08:00", 10000)])
+        writer.put([_rec("ClubB", "09:00", 20000)], unchanged=True)
+        writer.put([_rec("ClubC", "10:00", 30000, "Teescan")])
+        stats = writer.close()
+
+        self.assertEqual(self.collection.where.call_count, 1)
+        self.assertEqual(stats["upserts"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats["deletes"], 1)
+        self.assertTrue(stats["synced"])
+
+    def test_abort_keeps_upserts_and_skips_deletes(self):
+        writer = TeeTimeWriter(self.db, DATE).start()
+        writer.put([_rec("ClubB", "09:00", 20000)])
+        writer.abort()
+
+        self.assertEqual(self.batch.set.call_count, 1)
+        self.batch.delete.assert_not_called()
+        self.assertFalse(writer.stats["synced"])
+
+    def test_unchanged_date_skips_firestore(self):
+        writer = TeeTimeWriter(self.db, DATE).start()
+        writer.put([_rec("ClubA", "08:00", 10000)], unchanged=True)
+        stats = writer.close(skip_if_unchanged=True)
+
+        self.collection.where.assert_not_called()
+        self.batch.commit.assert_not_called()
+        self.assertFalse(stats["synced"])
+
+    def test_unchanged_batches_still_sync_when_not_skipped(self):
+        writer = TeeTimeWriter(self.db, DATE).start()
+        writer.put([_rec("ClubA", "08:00", 10000)], unchanged=True)
+        stats = writer.close()
+
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats["deletes"], 1)
+
+    def test_sources_listing_the_same_slot_are_written_once(self):
+        writer = TeeTimeWriter(self.db, DATE, sources=("golfpang", "teescan")).start()
+        writer.put([_rec("ClubB", "09:00", 20000, "golfpang"), _rec("ClubB", "09:00", 18000, "golfpang")])
+        writer.put([_rec("ClubB", "09:00", 19000, "teescan")])
+        writer.put([_rec("ClubC", "10:00", 30000, "golfpang")])
+        writer.source_done("golfpang")
+        writer.source_done("teescan")
+        stats = writer.close()
+
+        self.assertEqual(stats["upserts"], 2)
+        docs = {call[0][1]["club_name"]: call[0][1] for call in self.batch.set.call_args_list}
+        self.assertEqual(len(self.batch.set.call_args_list), 2)
+        self.assertEqual(docs["ClubB"]["price"], 18000)
+        self.assertEqual(docs["ClubB"]["prices"], {"golfpang": 18000, "teescan": 19000})
+        self.assertEqual(docs["ClubB"]["sources"], ["golfpang", "teescan"])
+
+class TestShadowIndexDiff(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+        self.shadow = ShadowIndex(self.store)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _sync(self, records):
+        writer = TeeTimeWriter(self.store, DATE, shadow=self.shadow).start()
+        writer.put(records)
+        return writer.close()
+
+    def _manifest(self):
+        return self.store.get_meta(shadow_index.MANIFEST_COLLECTION, DATE)
+
+    def test_second_sync_reads_only_the_manifest(self):
+        records = [_rec("ClubA", "08:00", 10000), _rec("ClubB", "09:00", 20000)]
+        first = self._sync(records)
+        self.assertEqual(first["index"], "scan")
+        generation = self._manifest()["generation"]
+        self.assertEqual(self.shadow.load(DATE), {"20251225_ClubA_0800": ANY, "20251225_ClubB_0900": ANY})
+
+        with patch.object(self.store, "tee_times", side_effect=AssertionError("full tee_times scan")):
+            second = self._sync(records)
+        self.assertEqual(second["index"], "shadow")
+        self.assertEqual((second["upserts"], second["deletes"]), (0, 0))
+        self.assertEqual(self._manifest()["generation"], generation)
+
+    def test_changes_against_the_index_bump_the_generation(self):
+        self._sync([_rec("ClubA", "08:00", 10000), _rec("ClubB", "09:00", 20000)])
+        generation = self._manifest()["generation"]
+
+        stats = self._sync([_rec("ClubA", "08:00", 12000)])
+        self.assertEqual(stats["index"], "shadow")
+        self.assertEqual((stats["upserts"], stats["deletes"]), (1, 1))
+        self.assertNotEqual(self._manifest()["generation"], generation)
+        self.assertEqual(set(self.shadow.load(DATE)), {"20251225_ClubA_0800"})
+        self.assertEqual([d["price"] for _, d in self.store.tee_times(DATE)], [12000])
+
+    def test_large_index_is_chunked_and_a_mismatched_chunk_falls_back_to_scan(self):
+        records = [_rec(f"Club{i}", "08:00", 10000 + i) for i in range(50)]
+        with patch.object(shadow_index, "SHADOW_CHUNK_CHARS", 100):
+            self._sync(records)
+            self.assertGreater(self._manifest()["chunks"], 1)
+            self.assertEqual(len(self.shadow.load(DATE)), 50)
+            self.store.put_meta(shadow_index.MANIFEST_COLLECTION, f"{DATE}~1",
+                                {**self.store.get_meta(shadow_index.MANIFEST_COLLECTION, f"{DATE}~1"), "generation": "other"})
+            self.assertEqual(self._sync(records)["index"], "scan")
+
+    def test_aborted_write_drops_the_index(self):
+        self._sync([_rec("ClubA", "08:00", 10000)])
+        writer = TeeTimeWriter(self.store, DATE, shadow=self.shadow).start()
+        writer.put([_rec("ClubA", "08:00", 11000)])
+        writer.abort()
+        self.assertIsNone(self.shadow.load(DATE))
+
+    def test_prune_drops_dates_before_the_window(self):
+        self._sync([_rec("ClubA", "08:00", 10000)])
+        self.shadow.prune(["2025-12-26", "2025-12-27"])
+        self.assertIsNone(self._manifest())
+        self._sync([_rec("ClubA", "08:00", 10000)])
+        self.shadow.prune([DATE])
+        self.assertIsNotNone(self._manifest())
+
+class TestProcessDateGolfpangInput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+        self.cache = ResponseCache(os.path.join(self.tmp, "cache"))
+        self.gp = [_rec("ClubA", "08:00", 10000, "golfpang")]
+        self.ts = [_rec("ClubB", "09:00", 20000, "teescan")]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _teescan(self, date, favorite, cache=None, emit=None):
+        cache.mark(date, "teescan", True)
+        emit(self.ts, True)
+        return self.ts
+
+    def _run(self, **kwargs):
+        with patch.object(ingest_data, "crawl_teescan", side_effect=self._teescan):
+            return process_date(DATE, self.store, cache=self.cache, **kwargs)
+
+    def test_pre_harvested_unchanged_golfpang_skips_the_sync(self):
+        self.cache.mark(DATE, "golfpang", True)
+        with patch.object(self.store, "tee_times", side_effect=AssertionError("full tee_times scan")):
+            self.assertEqual(self._run(data_gp=self.gp), 2)
+        self.assertEqual(list(self.store.tee_times(DATE)), [])
+
+    def test_pre_harvested_changed_golfpang_is_synced(self):
+        self.cache.mark(DATE, "golfpang", False)
+        self.assertEqual(self._run(data_gp=self.gp), 2)
+        self.assertEqual(sorted(d["club_name"] for _, d in self.store.tee_times(DATE)), ["ClubA", "ClubB"])
+
+    def test_feed_batches_are_streamed_into_the_writer(self):
+        feed = GolfpangFeed([DATE])
+        feed.emit(self.gp + [_rec("ClubC", "10:00", 30000, "golfpang", date="2025-12-26")], False)
+        feed.finish({DATE: self.gp})
+        with patch.object(TeeTimeWriter, "put", autospec=True, side_effect=TeeTimeWriter.put) as put:
+            self.assertEqual(self._run(gp_feed=feed), 2)
+        self.assertIn(((ANY, self.gp, False), {}), [(c.args, c.kwargs) for c in put.call_args_list],
+                      "the sector batch reaches the writer with its own unchanged flag, other dates filtered out")
+        self.assertEqual(sorted(d["club_name"] for _, d in self.store.tee_times(DATE)), ["ClubA", "ClubB"])
+
+    def test_change_feed_publish_is_retried(self):
+        feed = MagicMock()
+        feed.publish.side_effect = [RuntimeError("unavailable"), 7]
+        with patch.object(ingest_data.time, "sleep"):
+            self.assertEqual(self._run(data_gp=self.gp, feed=feed), 2)
+        self.assertEqual(feed.publish.call_count, 2)
+
+    def test_change_feed_failure_fails_the_date(self):
+        feed = MagicMock()
+        feed.publish.side_effect = RuntimeError("unavailable")
+        with patch.object(ingest_data.time, "sleep"), self.assertRaises(RuntimeError):
+            self._run(data_gp=self.gp, feed=feed)
+        self.assertEqual(feed.publish.call_count, ingest_data.CHANGE_FEED_ATTEMPTS)
+        self.assertFalse(self.cache.unchanged(DATE), "cache hits of the failed date are dropped")
+
+    def test_sync_aborted_after_upserts_recomputes_history(self):
+        history = HistoryAggregator(self.store)
+        repriced = [_rec("ClubA", "08:00", 12000, "golfpang")]
+        self._run(data_gp=self.gp, history=history)
+
+        def golfpang(date, favorite, cache=None, emit=None):
+            emit(repriced, False)
+            raise RuntimeError("golfpang down")
+        with patch.object(ingest_data, "crawl_golfpang", side_effect=golfpang):
+            self.assertEqual(self._run(history=history), 0)
+        self.assertIn(12000, [d["price"] for _, d in self.store.tee_times(DATE)], "upserts before the abort are kept")
+
+        self._run(data_gp=repriced, history=history)
+        groups = self.store.get_meta(HISTORY_STATE_COLLECTION, DATE)["groups"]
+        self.assertEqual({st["club"]: st["min"] for st in groups.values()}, {"ClubA": 12000, "ClubB": 20000})
+
+    def test_sync_aborted_after_upserts_drops_the_date_view(self):
+        self._run(data_gp=self.gp, views=True)
+        self.assertIsNotNone(load_view(self.store, DATE))
+
+        def golfpang(date, favorite, cache=None, emit=None):
+            emit([_rec("ClubA", "08:00", 12000, "golfpang")], False)
+            raise RuntimeError("golfpang down")
+        with patch.object(ingest_data, "crawl_golfpang", side_effect=golfpang):
+            self.assertEqual(self._run(views=True), 0)
+        self.assertIsNone(load_view(self.store, DATE), "readers fall back to tee_times")
+
+    def test_failed_harvest_aborts_the_date(self):
+        feed = GolfpangFeed([DATE])
+        feed.finish(None)
+        self.assertEqual(self._run(gp_feed=feed), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -131,6 +131,9 @@ class TestOptimization(unittest.TestCase):
             
             mock_daily_stats.where.return_value.stream.return_value = [hist_doc]
             mock_tee_times.where.return_value.stream.return_value = [curr_doc]
+            # A small club selection is pushed down: where('date').where('club_name', 'in', ...).select(fields)
+            mock_daily_stats.where.return_value.where.return_value.select.return_value.stream.return_value = [hist_doc]
+            mock_tee_times.where.return_value.where.return_value.select.return_value.stream.return_value = [curr_doc]
             
             # Run
             from app import get_prices
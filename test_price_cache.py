@@ -0,0 +1,96 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from change_feed import ChangeFeed
+from price_cache import PriceCache
+from storage import SQLiteStorage
+
+DATE = (datetime.date.today() + datetime.timedelta(days=8)).isoformat()
+BASE = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+
+class TestPriceCache(unittest.TestCase):
+    def test_entries_follow_the_stamp(self):
+        cache = PriceCache()
+        cache.put(DATE, (3, 1), [{"price": 1}], {})
+        self.assertEqual(cache.get(DATE, (3, 1)), ([{"price": 1}], {}))
+        self.assertIsNone(cache.get(DATE, (4, 1)))
+        self.assertIsNone(cache.get(DATE, (3, 2)))
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (1, 2))
+
+    def test_rows_bound_evicts_least_recently_used(self):
+        cache = PriceCache(max_rows=25)
+        cache.put("d1", (1, 0), [{}] * 10, {})
+        cache.put("d2", (1, 0), [{}] * 10, {})
+        cache.get("d1", (1, 0))
+        cache.put("d3", (1, 0), [{}] * 10, {})
+        self.assertIsNotNone(cache.get("d1", (1, 0)))
+        self.assertIsNone(cache.get("d2", (1, 0)))
+        self.assertEqual(cache.stats["evictions"], 1)
+        cache.put("huge", (1, 0), [{}] * 100, {})
+        self.assertIsNone(cache.get("huge", (1, 0)))
+
+    def test_without_feed_entries_expire(self):
+        cache = PriceCache(fallback_ttl=10)
+        with patch("price_cache.time.monotonic", return_value=100.0):
+            cache.put(DATE, None, [], {})
+            self.assertIsNotNone(cache.get(DATE, None))
+        with patch("price_cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get(DATE, None))
+
+    def test_stamped_entries_expire_after_max_age(self):
+        # A generation that stops moving (failed feed publish) must not pin old prices forever
+        cache = PriceCache(max_age=300)
+        with patch("price_cache.time.monotonic", return_value=100.0):
+            cache.put(DATE, (3, 1), [], {})
+        with patch("price_cache.time.monotonic", return_value=399.0):
+            self.assertIsNotNone(cache.get(DATE, (3, 1)))
+        with patch("price_cache.time.monotonic", return_value=401.0):
+            self.assertIsNone(cache.get(DATE, (3, 1)))
+
+class TestAppCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+        bw = self.store.writer("seed")
+        bw.set("tee_times", "t1", {"club_name": "ClubA", "date": DATE, "time": "08:00", "hour": 8, "price": 10000, "source": "golfpang"})
+        bw.set("daily_stats", "s1", {"club_name": "ClubA", "date": BASE, "hour": 8, "min_price": 9000})
+        bw.close()
+        self.feed = ChangeFeed(self.store)
+        self.feed.publish(DATE, {"t1": ("inserted", 10000)})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _prices(self, app):
+        with app.app.test_request_context(json={"dates": [DATE], "clubs": ["ClubA"], "times": []}):
+            return [(i["price"], i["history_price"]) for i in app.get_prices().get_json()]
+
+    def test_repeat_queries_skip_storage_until_the_generation_moves(self):
+        import app
+        cache = PriceCache(head_sec=0)
+        with patch.object(app, "db", None), patch.object(app, "PRICE_CACHE", cache), \
+                patch.object(app, "open_storage", return_value=self.store):
+            self.assertEqual(self._prices(app), [(10000, 9000)])
+            with patch.object(self.store, "tee_times", side_effect=AssertionError("tee_times read")):
+                self.assertEqual(self._prices(app), [(10000, 9000)])
+
+            bw = self.store.writer("update")
+            bw.set("tee_times", "t1", {"club_name": "ClubA", "date": DATE, "time": "08:00", "hour": 8, "price": 9500, "source": "golfpang"})
+            bw.close()
+            self.assertEqual(self._prices(app), [(10000, 9000)])
+            self.feed.publish(DATE, {"t1": ("repriced", 9500)})
+            self.assertEqual(self._prices(app), [(9500, 9000)])
+
+            # A change to the baseline date also invalidates the date that compares against it
+            bw = self.store.writer("baseline")
+            bw.set("daily_stats", "s1", {"club_name": "ClubA", "date": BASE, "hour": 8, "min_price": 8000})
+            bw.close()
+            self.feed.publish(BASE, {"x": ("inserted", 1)})
+            self.assertEqual(self._prices(app), [(9500, 8000)])
+        self.assertEqual(cache.stats["hits"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import time
+import unittest
+from unittest.mock import patch
+import requests
+import rate_limiter
+from rate_limiter import HostLimiter, LimitedHTTPAdapter, get_limiter
+
+
+def _response(status):
+    r = requests.Response()
+    r.status_code, r._content, r.raw = status, b"", io.BytesIO()
+    return r
+
+
+class TestHostLimiter(unittest.TestCase):
+    def test_token_bucket_paces_requests(self):
+        print("\nTesting HostLimiter pacing...")
+        lim = HostLimiter("example.com", rate=50, max_inflight=4, burst=1)
+        start = time.monotonic()
+        for _ in range(11):
+            with lim.slot():
+                pass
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.18, "10 refills at 50 req/s take ~0.2s")
+        self.assertEqual(lim.stats["requests"], 11)
+
+    def test_backs_off_on_throttle_and_recovers(self):
+        lim = HostLimiter("example.com", rate=20, max_inflight=4)
+        lim.feedback(429)
+        lim.feedback(503)
+        self.assertEqual(lim.rate, 5)
+        self.assertEqual(lim.stats["throttled"], 2)
+        for _ in range(40):
+            lim.feedback(200)
+        self.assertEqual(lim.rate, 20)
+
+    def test_subdomains_share_one_limiter(self):
+        self.assertIs(get_limiter("www.golfpang.com"), get_limiter("golfpang.com"))
+        self.assertIs(get_limiter("foapi.teescanner.com"), get_limiter("www.teescanner.com"))
+        self.assertIsNot(get_limiter("www.golfpang.com"), get_limiter("foapi.teescanner.com"))
+
+
+class TestLimitedHTTPAdapter(unittest.TestCase):
+    def test_each_retry_takes_a_token_and_reports_its_status(self):
+        lim = HostLimiter("retry.example", rate=1000, max_inflight=4)
+        session = requests.Session()
+        session.mount("http://", LimitedHTTPAdapter(retries=3))
+        with patch.object(rate_limiter, "get_limiter", return_value=lim), \
+             patch.object(requests.adapters.HTTPAdapter, "send", side_effect=[_response(429), _response(200)]) as send:
+            resp = session.get("http://retry.example/x")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(lim.stats["requests"], 2)
+        self.assertEqual(lim.stats["throttled"], 1, "the 429 must slow the host down even though the retry succeeded")
+        self.assertLess(lim.rate, lim.max_rate)
+
+    def test_last_attempt_status_is_returned(self):
+        lim = HostLimiter("retry.example", rate=1000, max_inflight=4)
+        session = requests.Session()
+        session.mount("http://", LimitedHTTPAdapter(retries=1))
+        with patch.object(rate_limiter, "get_limiter", return_value=lim), \
+             patch.object(requests.adapters.HTTPAdapter, "send", side_effect=[_response(503), _response(503)]):
+            self.assertEqual(session.get("http://retry.example/x").status_code, 503)
+        self.assertEqual(lim.stats["requests"], 2)
+
+    def test_timeouts_are_retried_without_slowing_the_host(self):
+        lim = HostLimiter("retry.example", rate=1000, max_inflight=4)
+        session = requests.Session()
+        session.mount("http://", LimitedHTTPAdapter(retries=3))
+        with patch.object(rate_limiter, "get_limiter", return_value=lim), \
+             patch.object(requests.adapters.HTTPAdapter, "send",
+                          side_effect=[requests.exceptions.ReadTimeout(), requests.exceptions.ConnectionError(),
+                                       _response(500), _response(200)]):
+            self.assertEqual(session.get("http://retry.example/x").status_code, 200)
+        self.assertEqual(lim.stats["requests"], 4)
+        self.assertEqual(lim.stats["throttled"], 0)
+        self.assertEqual(lim.rate, lim.max_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import base64
+import tempfile
+import unittest
+from unittest.mock import patch
+import requests
+import crawler_utils
+from replay_server import ReplayServer, fixture_key
+
+
+class TestReplayServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = (crawler_utils.GPANG_API_BASE, crawler_utils.TEESCAN_API_BASE)
+
+    def tearDown(self):
+        crawler_utils.set_endpoints(*self.saved)
+        self.tmp.cleanup()
+
+    def add_teescan_fixture(self, server, seq, date, body):
+        path = "/v1/booking/getTeeTimeListbyGolfclub"
+        query = f"golfclub_seq={seq}&roundDay={date}&orderType="
+        server.store.put(f"teescan-{fixture_key('GET', path, query, b'')}", {
+            "site": "teescan", "method": "GET", "path": path, "query": query, "body": "",
+            "status": 200, "content_type": "application/json",
+            "content_b64": base64.b64encode(body).decode("ascii"),
+        })
+
+    def test_crawler_runs_against_replayed_fixtures(self):
+        print("\nTesting crawl_teescan against replay server...")
+        clubs = [{"name": "ClubA", "seq": "1"}, {"name": "ClubB", "seq": "2"}]
+        with ReplayServer(self.tmp.name, latency_ms=5, jitter_ms=2, seed=1) as server:
+            self.add_teescan_fixture(server, "1", "2025-12-25",
+                                     b'{"data": {"teeTimeList": [{"price": 120000, "teetime_time": "07:10"}]}}')
+            crawler_utils.set_endpoints(teescan_base=server.teescan_base)
+            with patch.object(crawler_utils, "GOLF_CLUBS", clubs):
+                res = crawler_utils.crawl_teescan("2025-12-25", [])
+            self.assertEqual([(r["golf"], r["price"]) for r in res], [("ClubA", 120000)])
+            self.assertEqual(res[0]["url"], "https://www.teescanner.com/")
+            self.assertEqual(server.stats["served"], 1)
+            self.assertEqual(server.stats["missing"], 1, "ClubB has no fixture → 404")
+
+    def test_error_injection_and_unknown_prefix(self):
+        with ReplayServer(self.tmp.name, error_rate=1.0, seed=1) as server:
+            r = requests.get(server.teescan_base + "/v1/booking/getTeeTimeListbyGolfclub?golfclub_seq=1")
+            self.assertEqual(r.status_code, 503)
+            self.assertEqual(requests.get(server.base_url + "/other/x").status_code, 404)
+            self.assertEqual(server.stats["injected_errors"], 1)
+
+    def test_fixture_key_ignores_parameter_order(self):
+        self.assertEqual(fixture_key("POST", "/p", "", b"a=1&b=2"), fixture_key("post", "/p", "", b"b=2&a=1"))
+        self.assertNotEqual(fixture_key("POST", "/p", "", b"a=1"), fixture_key("POST", "/p", "", b"a=2"))
+
+
+if __name__ == '__main__':
+    unittest.main()
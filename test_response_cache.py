@@ -0,0 +1,55 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+import crawler_utils
+from response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    CLUBS = [{"name": "ClubA", "seq": "1"}, {"name": "ClubB", "seq": "2"}]
+
+    def run_teescan(self, cache, bodies):
+        with patch.object(crawler_utils, "GOLF_CLUBS", self.CLUBS), \
+             patch.object(crawler_utils, "_fetch_teescan", side_effect=lambda s, seq, d: bodies[seq]):
+            return crawler_utils.crawl_teescan("2025-12-25", [], cache=cache)
+
+    def test_unchanged_responses_reuse_records_and_mark_date(self):
+        print("\nTesting content-hash response cache...")
+        bodies = {
+            "1": b'{"data": {"teeTimeList": [{"price": 120000, "teetime_time": "07:10"}]}}',
+            "2": b'{"data": {"teeTimeList": []}}',
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            first = ResponseCache(tmp)
+            records = self.run_teescan(first, bodies)
+            first.mark("2025-12-25", "golfpang", True)
+            self.assertFalse(first.unchanged("2025-12-25"), "First run has nothing to compare against")
+            first.save()
+
+            second = ResponseCache(tmp)
+            with patch.object(crawler_utils, "_teescan_records", side_effect=AssertionError("parsed again")):
+                self.assertEqual(self.run_teescan(second, bodies), records)
+            second.mark("2025-12-25", "golfpang", True)
+            self.assertTrue(second.unchanged("2025-12-25"))
+            self.assertEqual(second.stats, {"hits": 2, "misses": 0})
+
+            # A failed sync must force the next run to resync the date
+            second.invalidate("2025-12-25")
+            second.save()
+            third = ResponseCache(tmp)
+            self.run_teescan(third, bodies)
+            third.mark("2025-12-25", "golfpang", True)
+            self.assertFalse(third.unchanged("2025-12-25"))
+
+    def test_changed_body_is_a_miss(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = ResponseCache(tmp)
+            first.put("teescan", "2025-12-25", "1", "aaa", [])
+            first.save()
+            second = ResponseCache(tmp)
+            self.assertIsNone(second.get("teescan", "2025-12-25", "1", "bbb"))
+            self.assertEqual(second.get("teescan", "2025-12-25", "1", "aaa"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import run_journal
+from run_journal import JOURNAL_COLLECTION, RunJournal
+from storage import SQLiteStorage
+
+DATES = ["2025-12-25", "2025-12-26"]
+
+
+class TestRunJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "t.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_interrupted_run_resumes_only_unfinished_units(self):
+        print("\nTesting resumable ingest journal...")
+        first = RunJournal.open(self.store, DATES)
+        self.assertFalse(first.resumed)
+        first.complete("2025-12-25", "golfpang", [{"golf": "ClubA", "price": 100000}])
+        first.complete("2025-12-25", "teescan", [])
+        first.complete("2025-12-25", "sync")
+        first.complete("2025-12-26", "golfpang", [{"golf": "ClubB", "price": 90000}])
+        # job dies here — finish() never called; the next job only shares the storage
+
+        second = RunJournal.open(self.store, DATES)
+        self.assertTrue(second.resumed)
+        self.assertEqual(second.state["run_id"], first.state["run_id"])
+        self.assertTrue(second.done("2025-12-25", "sync"))
+        self.assertTrue(second.done("2025-12-26", "golfpang"))
+        self.assertFalse(second.done("2025-12-26", "teescan"))
+        self.assertEqual(second.records("2025-12-26", "golfpang"), [{"golf": "ClubB", "price": 90000}])
+
+        second.finish()
+        self.assertIsNone(self.store.get_meta(JOURNAL_COLLECTION, "2025-12-26_golfpang"), "spool is cleared")
+        third = RunJournal.open(self.store, DATES)
+        self.assertFalse(third.resumed)
+        self.assertFalse(third.done("2025-12-25", "sync"))
+        self.assertIsNone(third.records("2025-12-26", "golfpang"))
+
+    def test_large_records_are_chunked(self):
+        recs = [{"golf": f"Club{i}", "time": f"{i % 24:02d}:00", "price": 100000 + i} for i in range(2000)]
+        with patch.object(run_journal, "JOURNAL_CHUNK_CHARS", 1000):
+            first = RunJournal.open(self.store, DATES)
+            first.complete("2025-12-25", "teescan", recs)
+        self.assertGreater(self.store.get_meta(JOURNAL_COLLECTION, "2025-12-25_teescan")["chunks"], 1)
+        self.assertEqual(RunJournal.open(self.store, DATES).records("2025-12-25", "teescan"), recs)
+        self.store.delete_meta(JOURNAL_COLLECTION, "2025-12-25_teescan~1")
+        self.assertIsNone(first.records("2025-12-25", "teescan"), "a missing chunk reads as no spool")
+
+    def test_units_outside_freshness_window_start_a_new_run(self):
+        first = RunJournal.open(self.store, DATES)
+        first.complete("2025-12-25", "golfpang", [{"golf": "ClubA", "price": 100000}])
+        stale = RunJournal.open(self.store, DATES, window_minutes=-1)
+        self.assertFalse(stale.resumed)
+        self.assertNotEqual(stale.state["run_id"], first.state["run_id"])
+        self.assertFalse(stale.done("2025-12-25", "golfpang"))
+        self.assertIsNone(stale.records("2025-12-25", "golfpang"))
+
+    def test_run_started_before_the_window_is_not_resumed(self):
+        # A date that keeps failing never finishes the run; fresh units must not keep its run id alive forever
+        start = datetime.datetime(2025, 12, 20, 6, 0)
+        with patch.object(run_journal, "_now", return_value=start):
+            first = RunJournal.open(self.store, DATES)
+        with patch.object(run_journal, "_now", return_value=start + datetime.timedelta(hours=2)):
+            first.complete("2025-12-25", "sync")
+            again = RunJournal.open(self.store, DATES)
+        self.assertFalse(again.resumed)
+        self.assertNotEqual(again.state["run_id"], first.state["run_id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
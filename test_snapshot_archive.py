@@ -0,0 +1,68 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from snapshot_archive import COLUMNS, SnapshotArchive, day_number, day_to_date, minutes_to_datetime
+
+def _rec(club, date, time, price, source="Golfpang"):
+    return {"golf": club, "date": date, "time": time, "hour_num": int(time[:2]), "price": price, "source": source}
+
+class TestSnapshotArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.archive = SnapshotArchive(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_append_and_memmap_roundtrip(self):
+        t1 = datetime.datetime(2026, 10, 1, 9, 30)
+        self.archive.append([_rec("ClubA", "2026-10-03", "07:12", 120000),
+                             _rec("ClubB", "2026-10-04", "13:40", 95000, "Teescan")], snapshot_at=t1, run="r1", key="d1")
+        self.archive.append([_rec("ClubA", "2026-10-03", "07:12", 110000)], snapshot_at=t1, run="r2", key="d1")
+
+        reader = SnapshotArchive(self.tmp)
+        cols = reader.load("2026-10")
+        self.assertIsInstance(cols["price"], np.memmap)
+        self.assertEqual(cols["price"].tolist(), [120000, 95000, 110000])
+        self.assertEqual(cols["hour"].tolist(), [7, 13, 7])
+        self.assertEqual(cols["minute"].tolist(), [12, 40, 12])
+        self.assertEqual([day_to_date(d) for d in cols["day"]], ["2026-10-03", "2026-10-04", "2026-10-03"])
+        self.assertEqual(reader.decode("club", cols["club"]), ["ClubA", "ClubB", "ClubA"])
+        self.assertEqual(reader.decode("source", cols["source"]), ["Golfpang", "Teescan", "Golfpang"])
+        self.assertEqual(minutes_to_datetime(cols["snap"][0]), t1)
+        for name, dtype in COLUMNS.items():
+            self.assertEqual(cols[name].dtype, dtype)
+
+        # Vectorised query: ClubA on 2026-10-03, cheapest price across snapshots
+        club_a = reader.dictionary()["club"].index("ClubA")
+        mask = (cols["club"] == club_a) & (cols["day"] == day_number("2026-10-03"))
+        self.assertEqual(int(cols["price"][mask].min()), 110000)
+
+    def test_same_run_and_key_is_appended_once(self):
+        t = datetime.datetime(2026, 10, 1)
+        self.assertEqual(self.archive.append([_rec("ClubA", "2026-10-03", "07:00", 1)], t, "r1", "d1"), 1)
+        self.assertEqual(self.archive.append([_rec("ClubA", "2026-10-03", "07:00", 1)], t, "r1", "d1"), 0)
+        self.assertEqual(len(self.archive.runs("2026-10")), 1)
+
+    def test_uncommitted_tail_is_ignored_and_truncated(self):
+        t = datetime.datetime(2026, 10, 1)
+        self.archive.append([_rec("ClubA", "2026-10-03", "07:00", 100)], t, "r1")
+        with open(os.path.join(self.tmp, "2026-10", "price.bin"), "ab") as f:
+            f.write(b"\xff" * 6)   # crash mid-append
+        self.assertEqual(SnapshotArchive(self.tmp).load("2026-10")["price"].tolist(), [100])
+        self.archive.append([_rec("ClubA", "2026-10-03", "07:00", 200)], t, "r2")
+        self.assertEqual(SnapshotArchive(self.tmp).load("2026-10")["price"].tolist(), [100, 200])
+
+    def test_scan_spans_month_partitions(self):
+        self.archive.append([_rec("ClubA", "2026-09-30", "07:00", 100)], datetime.datetime(2026, 9, 30), "r1")
+        self.archive.append([_rec("ClubA", "2026-10-01", "07:00", 200)], datetime.datetime(2026, 10, 1), "r2")
+        self.assertEqual(self.archive.months(), ["2026-09", "2026-10"])
+        self.assertEqual(self.archive.scan()["price"].tolist(), [100, 200])
+        self.assertEqual(self.archive.scan("2026-10")["price"].tolist(), [200])
+        self.assertEqual(self.archive.scan("2027-01")["price"].tolist(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from google.cloud import firestore
+from price_cache import PriceCache
+from storage import SERVER_TIMESTAMP, FirestoreStorage, SQLiteStorage, Storage, as_storage, open_storage
+from ingest_data import TeeTimeWriter
+from shadow_index import ShadowIndex
+
+def _tee(club, date, time, price):
+    return {"club_name": club, "date": date, "time": time, "hour": int(time[:2]), "price": price, "source": "Test"}
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = SQLiteStorage(os.path.join(self.tmp, "teetime.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_wal_and_indexes(self):
+        conn = self.store._conn()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("tee_times_date_club_hour", names)
+        self.assertIn("daily_stats_date_club_hour", names)
+
+    def test_upsert_delete_and_scans(self):
+        bw = self.store.writer("test")
+        bw.set("tee_times", "a", _tee("ClubA", "2025-12-25", "08:00", 10000))
+        bw.set("tee_times", "b", _tee("ClubB", "2025-12-26", "09:00", 20000))
+        bw.set("tee_times", "c", {**_tee("ClubC", "2025-12-27", "10:00", 30000), "crawled_at": SERVER_TIMESTAMP})
+        bw.set("tee_times", "a", _tee("ClubA", "2025-12-25", "08:00", 11000))
+        bw.delete("tee_times", "b")
+        stats = bw.close()
+        self.assertEqual(stats["ops"], 5)
+
+        self.assertEqual([(i, d["price"]) for i, d in self.store.tee_times("2025-12-25")], [("a", 11000)])
+        self.assertFalse(self.store.has_tee_times("2025-12-26"))
+        self.assertTrue(self.store.has_tee_times("2025-12-27"))
+        self.assertEqual(sorted(i for i, _ in self.store.tee_times_range("2025-12-25")), ["a", "c"])
+        self.assertEqual([i for i, _ in self.store.tee_times_range("2025-12-25", "2025-12-26")], ["a"])
+        crawled_at = dict(self.store.tee_times("2025-12-27"))["c"]["crawled_at"]
+        self.assertIsInstance(crawled_at, str)
+
+    def test_merge_set_keeps_other_fields(self):
+        bw = self.store.writer("test")
+        bw.set("daily_stats", "d1", {"club_name": "ClubA", "date": "2025-12-24", "hour": 8, "min_price": 9000})
+        bw.set("daily_stats", "d1", {"avg_price": 9500}, merge=True)
+        bw.close()
+        self.assertEqual(dict(self.store.daily_stats("2025-12-24"))["d1"],
+                         {"club_name": "ClubA", "date": "2025-12-24", "hour": 8, "min_price": 9000, "avg_price": 9500})
+
+    def test_meta_roundtrip(self):
+        self.assertIsNone(self.store.get_meta("sync_manifest", "2025-12-25"))
+        self.store.put_meta("sync_manifest", "2025-12-25", {"generation": "g1", "updated_at": SERVER_TIMESTAMP})
+        self.assertEqual(self.store.get_meta("sync_manifest", "2025-12-25")["generation"], "g1")
+
+    def test_find_pushes_filters_and_projects(self):
+        bw = self.store.writer("test")
+        bw.set("tee_times", "a", _tee("ClubA", "2025-12-25", "08:00", 10000))
+        bw.set("tee_times", "b", _tee("ClubB", "2025-12-25", "09:00", 20000))
+        bw.set("tee_times", "c", _tee("ClubA", "2025-12-25", "10:00", 30000))
+        bw.set("tee_times", "d", _tee("ClubA", "2025-12-26", "08:00", 40000))
+        bw.close()
+        found = dict(self.store.find("tee_times", "2025-12-25", {"ClubA"}, {8, 9}, ["price"]))
+        self.assertEqual(found, {"a": {"price": 10000}})
+        self.assertEqual(len(list(self.store.find("tee_times", "2025-12-25"))), 3)
+        self.assertEqual(list(self.store.find("tee_times", "2025-12-25", clubs=[])), [])
+
+    def test_next_sequence_counts_up_across_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            values = list(ex.map(lambda _: self.store.next_sequence("counters", "seq"), range(20)))
+        self.assertEqual(sorted(values), list(range(1, 21)))
+
+    def test_rejects_unsafe_collection_names(self):
+        bw = self.store.writer("test")
+        bw.set("tee_times; DROP TABLE meta", "x", {})
+        with self.assertRaises(ValueError):
+            bw.close()
+
+    def test_tee_time_writer_end_to_end(self):
+        shadow = ShadowIndex(self.store)
+        rec = {"golf": "ClubA", "date": "2025-12-25", "time": "08:00", "hour_num": 8, "price": 10000}
+        for _ in range(2):
+            writer = TeeTimeWriter(self.store, "2025-12-25", shadow=shadow).start()
+            writer.put([rec])
+            stats = writer.close()
+        self.assertEqual((stats["index"], stats["upserts"], stats["skipped"]), ("shadow", 0, 1))
+        self.assertEqual(len(list(self.store.tee_times("2025-12-25"))), 1)
+
+    def test_app_serves_from_sqlite(self):
+        import app
+        bw = self.store.writer("test")
+        bw.set("tee_times", "t1", _tee("ClubA", "2025-12-25", "08:00", 10000))
+        bw.set("daily_stats", "s1", {"club_name": "ClubA", "date": "2025-12-18", "hour": 8, "min_price": 9000})
+        bw.close()
+        with patch.object(app, "db", None), patch.object(app, "PRICE_CACHE", PriceCache()), \
+                patch.object(app, "open_storage", return_value=self.store):
+            with app.app.test_request_context(json={"dates": ["2025-12-25"], "clubs": ["ClubA"], "times": []}):
+                items = app.get_prices().get_json()
+        self.assertEqual([(i["price"], i["history_price"], i["diff"]) for i in items], [(10000, 9000, 1000)])
+
+class TestFirestoreStorage(unittest.TestCase):
+    def test_find_chunks_in_queries(self):
+        db = MagicMock()
+        base = db.collection.return_value.where.return_value
+        hour_q = base.where.return_value
+        doc = MagicMock()
+        doc.id = "a"
+        doc.to_dict.return_value = {"club_name": "C1", "hour": 8, "price": 1}
+        hour_q.where.return_value.select.return_value.stream.return_value = [doc]
+        with patch("storage.FIRESTORE_IN_LIMIT", 2):
+            found = list(FirestoreStorage(db).find("tee_times", "2025-12-25", ["C3", "C1", "C2"], [8], ["price"]))
+        self.assertEqual(found, [("a", doc.to_dict.return_value)] * 2)
+        db.collection.return_value.where.assert_called_once_with('date', '==', '2025-12-25')
+        base.where.assert_called_once_with('hour', '==', 8)
+        self.assertEqual([c.args for c in hour_q.where.call_args_list],
+                         [('club_name', 'in', ['C1', 'C2']), ('club_name', 'in', ['C3'])])
+        hour_q.where.return_value.select.assert_called_with(["price"])
+
+    def test_server_timestamp_is_translated(self):
+        db = MagicMock()
+        batch = MagicMock()
+        db.batch.return_value = batch
+        bw = FirestoreStorage(db).writer("test")
+        bw.set("tee_times", "a", {"price": 1, "crawled_at": SERVER_TIMESTAMP})
+        bw.close()
+        data = batch.set.call_args[0][1]
+        self.assertIs(data["crawled_at"], firestore.SERVER_TIMESTAMP)
+        db.collection.assert_called_with("tee_times")
+
+    def test_as_storage_and_open_storage(self):
+        db = MagicMock()
+        self.assertIsInstance(as_storage(db), FirestoreStorage)
+        store = SQLiteStorage.__new__(SQLiteStorage)
+        self.assertIs(as_storage(store), store)
+        self.assertIs(open_storage("firestore", lambda: db).db, db)
+        with self.assertRaises(ValueError):
+            open_storage("mongo")
+
+    def test_incomplete_backend_fails_at_construction(self):
+        class MetaOnly(Storage):
+            def get_meta(self, collection, key):
+                return None
+        with self.assertRaises(TypeError):
+            MetaOnly()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from tee_merge import SlotMerger, merge_records, slot_id
+
+DATE = "2025-12-25"
+
+def _rec(club, time, price, source):
+    return {"golf": club, "date": DATE, "time": time, "hour_num": int(time.split(":")[0]), "price": price, "source": source}
+
+class TestMergeRecords(unittest.TestCase):
+    def test_same_slot_is_merged_across_sources(self):
+        merged = merge_records([
+            _rec("Club A", "08:00", 100000, "golfpang"),
+            _rec("Club A", "08:00", 90000, "golfpang"),
+            _rec("Club A", "8:00", 95000, "teescan"),
+            _rec("Club B", "09:00", 80000, "teescan"),
+        ])
+        self.assertEqual(len(merged), 2)
+        a = merged[0]
+        self.assertEqual(a["time"], "08:00")
+        self.assertEqual((a["price"], a["source"]), (90000, "golfpang"))
+        self.assertEqual(a["prices"], {"golfpang": 90000, "teescan": 95000})
+        self.assertEqual(a["sources"], ["golfpang", "teescan"])
+        self.assertEqual(slot_id(a), "20251225_ClubA_0800")
+        self.assertEqual(merged[1]["prices"], {"teescan": 80000})
+
+    def test_records_without_price_are_dropped(self):
+        self.assertEqual(merge_records([_rec("ClubA", "08:00", 0, "golfpang")]), [])
+
+class TestSlotMerger(unittest.TestCase):
+    def test_club_waits_for_every_source(self):
+        m = SlotMerger(("golfpang", "teescan"))
+        m.add([_rec("ClubA", "08:00", 100000, "golfpang"), _rec("ClubB", "09:00", 70000, "golfpang")])
+        self.assertEqual(m.ready(), [])
+
+        m.add([_rec("ClubA", "08:00", 95000, "teescan")])
+        ready = m.ready()
+        self.assertEqual([sid for sid, _ in ready], ["20251225_ClubA_0800"])
+        self.assertEqual(ready[0][1]["prices"], {"golfpang": 100000, "teescan": 95000})
+
+        m.source_done("teescan")
+        self.assertEqual([sid for sid, _ in m.ready()], ["20251225_ClubB_0900"])
+        self.assertEqual(m.drain(), [])
+        self.assertEqual(m.ids, {"20251225_ClubA_0800", "20251225_ClubB_0900"})
+
+    def test_slot_changed_after_emit_is_emitted_again(self):
+        m = SlotMerger()
+        m.add([_rec("ClubA", "08:00", 100000, "golfpang")])
+        self.assertEqual(len(m.ready()), 1)
+        m.add([_rec("ClubA", "08:00", 90000, "golfpang")])
+        self.assertEqual(m.ready()[0][1]["price"], 90000)
+
+if __name__ == '__main__':
+    unittest.main()